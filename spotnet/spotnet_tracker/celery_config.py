@@ -33,12 +33,31 @@ app = Celery(
     main="spotnet",
     broker=CELERY_BROKER_URL,
     backend=CELERY_BROKER_URL,
+    include=["spotnet_tracker.tasks"],
 )
 
 app.conf.beat_schedule = {
+    # Positions are only recomputed when their inputs changed or their risk tier
+    # interval elapsed, so the monitor runs at the critical tier cadence.
+    "monitor_users_health_ratio": {
+        "task": "monitor_users_health_ratio",
+        "schedule": float(os.environ.get("HEALTH_MONITOR_INTERVAL", "15")),
+    },
+    # Full sweep of every position, sharded across the workers
     "check_users_health_ratio": {
         "task": "check_users_health_ratio",
-        "schedule": 60,
+        "schedule": float(os.environ.get("HEALTH_SWEEP_INTERVAL", "3600")),
+    },
+    "rollup_health_ratio_history": {
+        "task": "rollup_health_ratio_history",
+        "schedule": float(os.environ.get("HEALTH_HISTORY_ROLLUP_INTERVAL", "60")),
+    },
+    # Corrects the leaderboard counters and open position totals, should they drift
+    "reconcile_position_aggregates": {
+        "task": "reconcile_position_aggregates",
+        "schedule": float(
+            os.environ.get("POSITION_AGGREGATES_RECONCILE_INTERVAL", "3600")
+        ),
     },
 }
 
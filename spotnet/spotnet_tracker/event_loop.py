@@ -0,0 +1,123 @@
+"""
+This module keeps a single event loop per Celery worker process.
+
+Async tasks run on it instead of creating a loop with `asyncio.run` on every call,
+so the HTTP sessions and clients bound to the loop are reused across task runs.
+The loop is created when the worker process starts and closed, together with
+the clients, when it shuts down. The database pools inherited from the parent
+process are reset at the same time.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Coroutine
+
+from celery.signals import worker_process_init, worker_process_shutdown
+from redis.asyncio import Redis
+
+from web_app.contract_tools.api_request import APIRequest
+from web_app.db.database import dispose_engines
+from web_app.telegram import bot
+from web_app.telegram.dispatcher import RedisAlertHistory
+from web_app.telegram.notifications import ALERT_DISPATCHER
+
+from .celery_config import CELERY_BROKER_URL
+
+logger = logging.getLogger(__name__)
+
+# Redis holding the state shared by the workers, the broker one by default
+REDIS_URL = os.environ.get("REDIS_URL") or CELERY_BROKER_URL
+
+_loop: asyncio.AbstractEventLoop | None = None
+_redis: Redis | None = None
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the event loop of the worker process, creating it if needed.
+
+    :return: asyncio.AbstractEventLoop
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(coroutine: Coroutine) -> Any:
+    """
+    Run a coroutine to completion on the event loop of the worker process.
+
+    :param coroutine: The coroutine to run.
+    :return: The result of the coroutine.
+    """
+    return get_event_loop().run_until_complete(coroutine)
+
+
+def get_redis() -> Redis:
+    """
+    Get the Redis client of the worker process. Its connections are bound
+    to the worker event loop.
+
+    :return: Redis
+    """
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(REDIS_URL, decode_responses=True)
+    return _redis
+
+
+# Alerts sent are shared by the workers, so each one suppresses repeated alerts
+ALERT_DISPATCHER.history = RedisAlertHistory(get_redis)
+
+
+async def _close_clients() -> None:
+    """
+    Close the sessions opened on the worker event loop.
+    """
+    global _redis
+    await APIRequest.close_session()
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+    if bot is not None:
+        await bot.session.close()
+
+
+@worker_process_init.connect
+def init_event_loop(**_kwargs) -> None:
+    """
+    Create a fresh event loop in a new worker process, rather than reusing
+    one inherited from the parent process.
+    """
+    global _loop, _redis
+    _loop, _redis = None, None
+    get_event_loop()
+
+
+@worker_process_init.connect
+def reset_database_pools(**_kwargs) -> None:
+    """
+    Drop the database connections inherited from the parent process, without
+    closing them, so the worker process opens its own.
+    """
+    dispose_engines(close=False)
+
+
+@worker_process_shutdown.connect
+def close_event_loop(**_kwargs) -> None:
+    """
+    Close the clients and the event loop of a worker process on shutdown.
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+    try:
+        _loop.run_until_complete(_close_clients())
+    except Exception as e:
+        logger.warning(f"Failed to close clients of the worker event loop: {e}")
+    finally:
+        _loop.close()
+        _loop = None
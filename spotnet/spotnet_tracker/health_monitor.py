@@ -0,0 +1,369 @@
+"""
+This module monitors the health ratio of open positions incrementally.
+
+A position is only recomputed when one of its inputs changed since its last check:
+- the price of one of its tokens moved by more than the price epsilon of its tier,
+- a zkLend event (deposit, withdrawal, borrowing, repayment, liquidation)
+  touched its contract,
+- or its last check is older than the interval of its tier, to account for
+  interest accrual.
+
+Tiers are assigned from the last health ratio, see `spotnet_tracker.risk_tiers`.
+
+The last state of each position is kept in Redis so every worker shares it.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, replace
+from decimal import Decimal
+
+from redis.asyncio import Redis
+
+from web_app.contract_tools.blockchain_call import CLIENT
+from web_app.contract_tools.constants import TokenParams
+from web_app.contract_tools.mixins.alert import ALERT_THRESHOLD, AlertMixin
+from web_app.contract_tools.mixins.health_ratio import (
+    HealthRatioInputs,
+    HealthRatioMixin,
+)
+from web_app.db.crud import UserDBConnector
+
+from .risk_tiers import RiskTier, RiskTiers
+
+logger = logging.getLogger(__name__)
+
+ZKLEND_EVENT_NAMES = ["Deposit", "Withdrawal", "Borrowing", "Repayment", "Liquidation"]
+
+
+@dataclass
+class PositionState:
+    """
+    Class to hold the last computed health ratio of a position and the prices
+    of its tokens at that time.
+    """
+
+    health_ratio: str
+    prices: dict[str, str]
+    checked_at: float
+
+    def to_json(self) -> str:
+        """
+        Serialize the state.
+
+        :return: str
+        """
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, value: str) -> "PositionState":
+        """
+        Deserialize a state.
+
+        :param value: The serialized state.
+        :return: PositionState
+        """
+        return cls(**json.loads(value))
+
+
+class MonitorState:
+    """
+    Position states and last processed block, stored in Redis.
+    """
+
+    POSITIONS_KEY = "health_monitor:positions"
+    LAST_BLOCK_KEY = "health_monitor:last_block"
+
+    def __init__(self, redis: Redis):
+        """
+        :param redis: Redis client decoding responses.
+        """
+        self.redis = redis
+
+    async def load_positions(
+        self, contract_addresses: list[str]
+    ) -> dict[str, PositionState]:
+        """
+        Load the states of positions.
+
+        :param contract_addresses: The contract addresses of the positions.
+        :return: The states of the positions that have one.
+        """
+        if not contract_addresses:
+            return {}
+        values = await self.redis.hmget(self.POSITIONS_KEY, contract_addresses)
+        return {
+            address: PositionState.from_json(value)
+            for address, value in zip(contract_addresses, values)
+            if value is not None
+        }
+
+    async def save_positions(self, states: dict[str, PositionState]) -> None:
+        """
+        Save the states of positions.
+
+        :param states: States by contract address.
+        """
+        if states:
+            await self.redis.hset(
+                self.POSITIONS_KEY,
+                mapping={address: state.to_json() for address, state in states.items()},
+            )
+
+    async def get_last_block(self) -> int | None:
+        """
+        Get the last block whose events were processed.
+
+        :return: The block number, None before the first run.
+        """
+        value = await self.redis.get(self.LAST_BLOCK_KEY)
+        return int(value) if value is not None else None
+
+    async def set_last_block(self, block_number: int) -> None:
+        """
+        Set the last block whose events were processed.
+
+        :param block_number: The block number.
+        """
+        await self.redis.set(self.LAST_BLOCK_KEY, block_number)
+
+
+class HealthMonitor:
+    """
+    Recomputes the health ratio of the positions whose inputs changed
+    and notifies the users whose health ratio is below the alert threshold.
+    """
+
+    def __init__(
+        self,
+        state: MonitorState,
+        tiers: RiskTiers = None,
+        max_event_blocks: int = None,
+    ):
+        """
+        :param state: The shared monitor state.
+        :param tiers: The risk tiers setting how often positions are checked.
+         Defaults to tiers configured from the environment.
+        :param max_event_blocks: Largest block range scanned for zkLend events,
+         beyond which every position is recomputed instead.
+         Defaults to `HEALTH_MONITOR_MAX_EVENT_BLOCKS`.
+        """
+        self.state = state
+        self.tiers = tiers if tiers is not None else RiskTiers()
+        self.max_event_blocks = (
+            max_event_blocks
+            if max_event_blocks is not None
+            else int(os.getenv("HEALTH_MONITOR_MAX_EVENT_BLOCKS", "1000"))
+        )
+
+    async def _get_touched_addresses(
+        self, last_block: int | None, latest_block: int
+    ) -> set[int] | None:
+        """
+        Get the addresses involved in zkLend events since the last processed block.
+
+        :param last_block: The last processed block, None before the first run.
+        :param latest_block: The latest block.
+        :return: The addresses, None when they can't be known and every position
+         has to be recomputed.
+        """
+        if last_block is None or latest_block - last_block > self.max_event_blocks:
+            return None
+        if latest_block <= last_block:
+            return set()
+        try:
+            events = await CLIENT.get_zklend_events(
+                ZKLEND_EVENT_NAMES, last_block + 1, latest_block
+            )
+        except Exception as e:
+            logger.warning(f"Failed to get zkLend events, recomputing all: {e}")
+            return None
+        # The user is the first or, for repayments and liquidations, second field
+        return {address for event in events for address in event.data[:2]}
+
+    @staticmethod
+    def _price_moved(
+        state: PositionState, prices: dict[str, Decimal], price_epsilon: Decimal
+    ) -> bool:
+        """
+        Check whether the price of a token of a position moved beyond the epsilon.
+
+        :param state: The last state of the position.
+        :param prices: The current prices.
+        :param price_epsilon: The relative price move tolerated.
+        :return: bool
+        """
+        for token, last_price in state.prices.items():
+            last_price = Decimal(last_price)
+            if token not in prices or last_price == 0:
+                return True
+            if abs(prices[token] - last_price) / last_price > price_epsilon:
+                return True
+        return False
+
+    def is_due(
+        self,
+        contract_address: str,
+        state: PositionState | None,
+        touched: set[int] | None,
+        prices: dict[str, Decimal],
+        now: float,
+    ) -> bool:
+        """
+        Check whether a position has to be recomputed.
+
+        :param contract_address: The contract address of the position.
+        :param state: The last state of the position, None if never computed.
+        :param touched: Addresses involved in zkLend events, None if unknown.
+        :param prices: The current prices.
+        :param now: The current timestamp.
+        :return: bool
+        """
+        if state is None or touched is None or int(contract_address, 16) in touched:
+            return True
+        schedule = self.tiers.schedule(state.health_ratio)
+        return now - state.checked_at >= schedule.interval or self._price_moved(
+            state, prices, schedule.price_epsilon
+        )
+
+    @staticmethod
+    def _build_state(
+        health_ratio: str,
+        inputs: HealthRatioInputs,
+        prices: dict[str, Decimal],
+        now: float,
+    ) -> PositionState:
+        """
+        Build the state of a recomputed position.
+
+        :param health_ratio: The computed health ratio.
+        :param inputs: The inputs the health ratio was computed from.
+        :param prices: The current prices.
+        :param now: The current timestamp.
+        :return: PositionState
+        """
+        tokens = set(inputs.deposits) | {inputs.borrowed_token}
+        return PositionState(
+            health_ratio=health_ratio,
+            prices={token: str(prices[token]) for token in sorted(tokens)},
+            checked_at=now,
+        )
+
+    def _log_tier_change(
+        self, contract_address: str, state: PositionState | None, health_ratio: str
+    ) -> None:
+        """
+        Log a position moving to another risk tier.
+
+        :param contract_address: The contract address of the position.
+        :param state: The last state of the position, None if never computed.
+        :param health_ratio: The new health ratio of the position.
+        """
+        if state is None:
+            return
+        old_tier = self.tiers.classify(state.health_ratio)
+        new_tier = self.tiers.classify(health_ratio)
+        if old_tier != new_tier:
+            logger.info(
+                f"Position {contract_address} moved from the {old_tier.value} "
+                f"to the {new_tier.value} tier with health ratio {health_ratio}"
+            )
+
+    async def run(self) -> dict:
+        """
+        Recompute the positions whose inputs changed and send the alerts.
+
+        :return: Counts of the positions monitored, recomputed, failed and alerted,
+         of the notifications dispatched, of the health ratio samples stored
+         and of the positions in each risk tier.
+        """
+        users_data = UserDBConnector().get_users_for_notifications()
+        telegram_ids = defaultdict(list)
+        for contract_address, telegram_id in users_data:
+            telegram_ids[contract_address].append(telegram_id)
+        contract_addresses = list(telegram_ids)
+
+        latest_block, last_block = await asyncio.gather(
+            CLIENT.get_block_number(), self.state.get_last_block()
+        )
+        touched, prices, states = await asyncio.gather(
+            self._get_touched_addresses(last_block, latest_block),
+            HealthRatioMixin._get_pragma_prices(
+                {token.name for token in TokenParams.tokens()}
+            ),
+            self.state.load_positions(contract_addresses),
+        )
+
+        now = time.time()
+        due = [
+            address
+            for address in contract_addresses
+            if self.is_due(address, states.get(address), touched, prices, now)
+        ]
+
+        inputs = {}
+        new_states = {}
+        alerts = 0
+        failed = 0
+        async for (
+            contract_address,
+            health_ratio,
+        ) in HealthRatioMixin.iter_health_ratios_and_tvl(due, inputs=inputs):
+            if isinstance(health_ratio, Exception):
+                failed += 1
+                logger.error(
+                    f"Failed to get health ratio for {contract_address}: "
+                    f"{health_ratio!r}"
+                )
+                if isinstance(health_ratio, (IndexError, ArithmeticError)):
+                    # No debt or no deposit: wait for an event instead of retrying
+                    new_states[contract_address] = PositionState("", {}, now)
+                elif contract_address in states:
+                    # Transient failure: the events are consumed with the block,
+                    # so keep the position due until it is recomputed
+                    new_states[contract_address] = replace(
+                        states[contract_address], checked_at=0
+                    )
+                continue
+
+            health_ratio_level, _ = health_ratio
+            new_states[contract_address] = self._build_state(
+                health_ratio_level, inputs[contract_address], prices, now
+            )
+            self._log_tier_change(
+                contract_address, states.get(contract_address), health_ratio_level
+            )
+            if float(health_ratio_level) < ALERT_THRESHOLD:
+                for telegram_id in telegram_ids[contract_address]:
+                    AlertMixin.send_notification(telegram_id, health_ratio_level)
+                    alerts += 1
+
+        await self.state.save_positions(new_states)
+        await self.state.set_last_block(latest_block)
+        notifications = await AlertMixin.flush_notifications()
+        samples = HealthRatioMixin.record_health_history(
+            {
+                address: inputs[address]
+                for address, state in new_states.items()
+                if state.health_ratio and address in inputs
+            },
+            prices,
+        )
+
+        states.update(new_states)
+        tiers = Counter(
+            self.tiers.classify(state.health_ratio).value for state in states.values()
+        )
+        return {
+            "positions": len(contract_addresses),
+            "recomputed": len(due),
+            "failed": failed,
+            "alerts": alerts,
+            "notifications": notifications,
+            "samples": samples,
+            "tiers": {tier.value: tiers[tier.value] for tier in RiskTier},
+        }
@@ -0,0 +1,114 @@
+"""
+This module buckets positions into risk tiers by the distance of their last
+health ratio from `ALERT_THRESHOLD`.
+
+Each tier has its own check interval and price move tolerance, so positions
+close to liquidation are checked often while safe ones are left alone until
+a large price move, a zkLend event or their interval forces a new check.
+A position moves between tiers every time its health ratio is recomputed.
+"""
+
+import os
+from dataclasses import dataclass
+from decimal import Decimal
+from enum import Enum
+
+from web_app.contract_tools.mixins.alert import ALERT_THRESHOLD
+
+
+class RiskTier(Enum):
+    """
+    Risk tiers, from the closest to the alert threshold to the farthest.
+    """
+
+    CRITICAL = "critical"
+    WATCH = "watch"
+    SAFE = "safe"
+
+
+@dataclass(frozen=True)
+class TierSchedule:
+    """
+    Class to hold how often the positions of a tier are checked.
+    """
+
+    # Seconds after which a position of the tier is recomputed anyway
+    interval: float
+    # Relative price move of one of its tokens that triggers a recomputation
+    price_epsilon: Decimal
+
+
+DEFAULT_TIER_BOUNDS = {RiskTier.CRITICAL: "1.25", RiskTier.WATCH: "2"}
+DEFAULT_TIER_SCHEDULES = {
+    RiskTier.CRITICAL: ("15", "0.002"),
+    RiskTier.WATCH: ("60", "0.005"),
+    RiskTier.SAFE: ("600", "0.05"),
+}
+
+
+class RiskTiers:
+    """
+    Classifies health ratios into risk tiers and gives the schedule of each tier.
+    """
+
+    def __init__(
+        self,
+        bounds: dict[RiskTier, float] = None,
+        schedules: dict[RiskTier, TierSchedule] = None,
+        alert_threshold: float = ALERT_THRESHOLD,
+    ):
+        """
+        :param bounds: Upper bound of the critical and watch tiers, as a multiple
+         of the alert threshold. Defaults to `HEALTH_TIER_<TIER>_BOUND`.
+        :param schedules: Schedule of each tier.
+         Defaults to `HEALTH_TIER_<TIER>_INTERVAL` and `HEALTH_TIER_<TIER>_PRICE_EPSILON`.
+        :param alert_threshold: The health ratio below which users are alerted.
+        """
+        if bounds is None:
+            bounds = {
+                tier: float(os.getenv(f"HEALTH_TIER_{tier.name}_BOUND", default))
+                for tier, default in DEFAULT_TIER_BOUNDS.items()
+            }
+        if schedules is None:
+            schedules = {
+                tier: TierSchedule(
+                    interval=float(
+                        os.getenv(f"HEALTH_TIER_{tier.name}_INTERVAL", interval)
+                    ),
+                    price_epsilon=Decimal(
+                        os.getenv(f"HEALTH_TIER_{tier.name}_PRICE_EPSILON", epsilon)
+                    ),
+                )
+                for tier, (interval, epsilon) in DEFAULT_TIER_SCHEDULES.items()
+            }
+        if bounds[RiskTier.CRITICAL] > bounds[RiskTier.WATCH]:
+            raise ValueError("The critical tier bound can't exceed the watch one")
+        self.bounds = bounds
+        self.schedules = schedules
+        self.alert_threshold = alert_threshold
+
+    def classify(self, health_ratio: str) -> RiskTier:
+        """
+        Get the risk tier of a health ratio.
+
+        :param health_ratio: The last computed health ratio, empty if it couldn't be.
+        :return: RiskTier
+        """
+        # Positions without debt or deposit wait for a zkLend event to be checked
+        if not health_ratio or float(health_ratio) <= 0:
+            return RiskTier.SAFE
+        distance = float(health_ratio) / self.alert_threshold
+        if distance < self.bounds[RiskTier.CRITICAL]:
+            return RiskTier.CRITICAL
+        if distance < self.bounds[RiskTier.WATCH]:
+            return RiskTier.WATCH
+        return RiskTier.SAFE
+
+    def schedule(self, health_ratio: str) -> TierSchedule:
+        """
+        Get the schedule of the tier of a health ratio.
+
+        :param health_ratio: The last computed health ratio.
+        :return: TierSchedule
+        """
+        return self.schedules[self.classify(health_ratio)]
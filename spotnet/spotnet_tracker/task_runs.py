@@ -0,0 +1,180 @@
+"""
+This module prevents overlapping runs of the scheduled tasks and records
+the telemetry of every run.
+
+A run takes a Redis lock named after its task. When beat enqueues a task while
+its previous run still holds the lock, the new run is skipped instead of
+competing with it for the same node. Every run, skipped ones included, is stored
+in the `task_run` table so a task falling behind its schedule shows up there.
+"""
+
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable
+
+from redis import Redis
+
+from web_app.contract_tools.blockchain_call import CLIENT
+from web_app.db.crud import TaskRunDBConnector
+from web_app.db.models import TaskRunStatus
+
+from .event_loop import REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+_redis: Redis | None = None
+
+
+def get_lock_redis() -> Redis:
+    """
+    Get the Redis client holding the task locks. Unlike the worker one,
+    it is synchronous so locks can be taken outside the event loop.
+
+    :return: Redis
+    """
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(REDIS_URL, decode_responses=True)
+    return _redis
+
+
+class TaskLock:
+    """
+    Redis lock of a task. It expires after its timeout, so a crashed run
+    can't block the task forever, and is only released by its owner.
+    """
+
+    KEY_PREFIX = "task_lock:"
+    # Delete the key only if it still holds the token of the owner
+    RELEASE_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(
+        self, task_name: str, timeout: float, token: str = None, redis: Redis = None
+    ):
+        """
+        :param task_name: Name of the task the lock protects.
+        :param timeout: Seconds after which the lock expires.
+        :param token: Token of an acquired lock, to release it from another task.
+        :param redis: Redis client, defaults to the one of the worker process.
+        """
+        self.key = f"{self.KEY_PREFIX}{task_name}"
+        self.timeout = timeout
+        self.token = token or uuid.uuid4().hex
+        self.redis = redis or get_lock_redis()
+
+    def acquire(self) -> bool:
+        """
+        Take the lock if it is free.
+
+        :return: Whether the lock was taken.
+        """
+        return bool(
+            self.redis.set(self.key, self.token, nx=True, ex=max(1, int(self.timeout)))
+        )
+
+    def release(self) -> bool:
+        """
+        Release the lock if it is still owned.
+
+        :return: Whether the lock was released.
+        """
+        return bool(self.redis.eval(self.RELEASE_SCRIPT, 1, self.key, self.token))
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    """
+    Convert a timestamp to a naive UTC datetime, as stored in the database.
+
+    :param timestamp: The timestamp.
+    :return: datetime
+    """
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def record_task_run(
+    task_name: str,
+    status: TaskRunStatus,
+    started_at: float,
+    finished_at: float = None,
+    positions: int = None,
+    rpc_calls: int = None,
+    details: dict = None,
+) -> None:
+    """
+    Store the telemetry of a run. Failures to store it are only logged.
+
+    :param task_name: Name of the task.
+    :param status: Status of the run.
+    :param started_at: Timestamp the run started at.
+    :param finished_at: Timestamp the run finished at, None if it was skipped.
+    :param positions: Number of positions processed.
+    :param rpc_calls: Number of RPC calls made.
+    :param details: Summary returned by the task, or the error.
+    """
+    try:
+        TaskRunDBConnector().create_task_run(
+            task_name=task_name,
+            status=status,
+            started_at=_to_datetime(started_at),
+            finished_at=_to_datetime(finished_at) if finished_at else None,
+            positions=positions,
+            rpc_calls=rpc_calls,
+            details=details,
+        )
+    except Exception as e:
+        logger.error(f"Failed to record the run of task {task_name}: {e}")
+
+
+def run_exclusively(
+    task_name: str, lock_timeout: float, func: Callable[[], dict]
+) -> dict | None:
+    """
+    Run a task unless a previous run still holds its lock, and record the run.
+
+    :param task_name: Name of the task.
+    :param lock_timeout: Seconds after which the lock expires.
+    :param func: Runs the task and returns its summary, with the number of
+     positions processed under `positions`.
+    :return: The summary of the run, None if it was skipped.
+    :raises Exception: Any exception raised by the task, once recorded.
+    """
+    started_at = time.time()
+    lock = TaskLock(task_name, lock_timeout)
+    if not lock.acquire():
+        logger.warning(f"Skipping {task_name}: its previous run is still in progress")
+        record_task_run(task_name, TaskRunStatus.SKIPPED, started_at)
+        return None
+
+    rpc_requests = CLIENT.metrics.total_requests()
+    try:
+        summary = func()
+    except Exception as e:
+        record_task_run(
+            task_name,
+            TaskRunStatus.FAILED,
+            started_at,
+            finished_at=time.time(),
+            rpc_calls=CLIENT.metrics.total_requests() - rpc_requests,
+            details={"error": str(e)},
+        )
+        raise
+    finally:
+        lock.release()
+
+    record_task_run(
+        task_name,
+        TaskRunStatus.SUCCEEDED,
+        started_at,
+        finished_at=time.time(),
+        positions=summary.get("positions"),
+        rpc_calls=CLIENT.metrics.total_requests() - rpc_requests,
+        details=summary,
+    )
+    return summary
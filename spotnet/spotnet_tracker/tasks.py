@@ -5,34 +5,326 @@ It imports the logging module to facilitate logging operations and the
 Celery app instance from the `celery_config` module.
 
 Tasks:
-- test_task: A simple test task that logs a confirmation message.
+- check_users_health_ratio: Splits the users into shards checked by
+  `check_users_health_ratio_shard` tasks on every worker, whose results are
+  aggregated by `aggregate_health_ratio_sweep`, or `fail_health_ratio_sweep`
+  when the chord fails.
+- monitor_users_health_ratio: Recomputes the health ratios whose inputs changed.
+- rollup_health_ratio_history: Downsamples the health ratio history and applies
+  its retention periods.
+- reconcile_position_aggregates: Corrects the leaderboard counters and the open
+  position totals from the positions.
+- claim_airdrop_task: Claims user airdrops.
 """
 
-import asyncio
 import logging
+import os
 import time
+from collections import Counter, defaultdict
 
+from celery import chord
+
+from web_app.contract_tools.blockchain_call import CLIENT
 from web_app.contract_tools.mixins.alert import AlertMixin
+from web_app.db.crud import (
+    HealthHistoryDBConnector,
+    PositionDBConnector,
+    UserDBConnector,
+)
+from web_app.db.crud.leaderboard import LeaderboardDBConnector
+from web_app.db.models import TaskRunStatus
 from web_app.tasks.claim_airdrops import AirdropClaimer
 
 from .celery_config import app
+from .event_loop import get_redis, run_async
+from .health_monitor import HealthMonitor, MonitorState
+from .task_runs import TaskLock, record_task_run, run_exclusively
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Number of positions checked by one shard of the health ratio sweep
+HEALTH_SWEEP_SHARD_SIZE = int(os.getenv("HEALTH_SWEEP_SHARD_SIZE", "200"))
+# Seconds after which the lock of a run expires, should it never be released
+HEALTH_SWEEP_LOCK_TIMEOUT = float(os.getenv("HEALTH_SWEEP_LOCK_TIMEOUT", "1800"))
+HEALTH_MONITOR_LOCK_TIMEOUT = float(os.getenv("HEALTH_MONITOR_LOCK_TIMEOUT", "300"))
+HEALTH_HISTORY_LOCK_TIMEOUT = float(os.getenv("HEALTH_HISTORY_LOCK_TIMEOUT", "300"))
+POSITION_AGGREGATES_LOCK_TIMEOUT = float(
+    os.getenv("POSITION_AGGREGATES_LOCK_TIMEOUT", "600")
+)
+
+
+def split_into_shards(
+    users_data: list[tuple[str, str]], shard_size: int
+) -> list[list[tuple[str, str]]]:
+    """
+    Split the users into shards of at most `shard_size` positions. All the
+    telegram IDs of a position go to the same shard.
+
+    :param users_data: (contract address, telegram ID) pairs.
+    :param shard_size: Maximum number of positions per shard.
+    :return: The shards of (contract address, telegram ID) pairs.
+    """
+    telegram_ids = defaultdict(list)
+    for contract_address, telegram_id in users_data:
+        telegram_ids[contract_address].append(telegram_id)
+    contract_addresses = list(telegram_ids)
+    return [
+        [
+            (contract_address, telegram_id)
+            for contract_address in contract_addresses[start : start + shard_size]
+            for telegram_id in telegram_ids[contract_address]
+        ]
+        for start in range(0, len(contract_addresses), shard_size)
+    ]
+
 
 @app.task(name="check_users_health_ratio")
 def check_users_health_ratio() -> None:
     """
     Background task to check health ratio levels for users with opened positions.
+    The users are split into shards checked in parallel by the workers.
+    The sweep is skipped while the previous one is still running: its lock is
+    only released once the shards are aggregated, or once the chord failed.
+
+    :return: None
+    """
+    task_name = "check_users_health_ratio"
+    started_at = time.time()
+    lock = TaskLock(task_name, HEALTH_SWEEP_LOCK_TIMEOUT)
+    locked = False
+    try:
+        locked = lock.acquire()
+        if not locked:
+            logger.warning(f"Skipping {task_name}: the previous sweep is in progress")
+            record_task_run(task_name, TaskRunStatus.SKIPPED, started_at)
+            return
+
+        users_data = UserDBConnector().get_users_for_notifications()
+        shards = split_into_shards(users_data, HEALTH_SWEEP_SHARD_SIZE)
+        if not shards:
+            logger.info("No users to check the health ratio of")
+            aggregate_health_ratio_sweep([], started_at, lock.token)
+            return
+        callback = aggregate_health_ratio_sweep.s(started_at, lock.token)
+        callback.on_error(fail_health_ratio_sweep.s(started_at, lock.token))
+        chord(check_users_health_ratio_shard.s(shard) for shard in shards)(callback)
+        logger.info(
+            f"Dispatched the health ratio sweep of {len(users_data)} users "
+            f"in {len(shards)} shards"
+        )
+    except Exception as e:
+        logger.error(f"Error in {task_name} task: {e}")
+        if locked:
+            lock.release()
+        record_task_run(
+            task_name,
+            TaskRunStatus.FAILED,
+            started_at,
+            finished_at=time.time(),
+            details={"error": str(e)},
+        )
+
+
+@app.task(name="check_users_health_ratio_shard")
+def check_users_health_ratio_shard(users_data: list[list[str]]) -> dict:
+    """
+    Background task to check the health ratio levels of a shard of the users.
+
+    :param users_data: (contract address, telegram ID) pairs of the shard.
+    :return: Counts of the positions checked, failed and alerted, of the
+     notifications dispatched and of the RPC calls made, and the shard duration
+     in seconds.
+    """
+    started_at = time.monotonic()
+    rpc_requests = CLIENT.metrics.total_requests()
+    try:
+        summary = run_async(
+            AlertMixin.check_users_health_ratio_level(
+                [tuple(user_data) for user_data in users_data]
+            )
+        )
+    except Exception as e:
+        # Return a summary rather than raising, so the chord still aggregates
+        logger.error(f"Error in check_users_health_ratio_shard task: {e}")
+        positions = len({contract_address for contract_address, _ in users_data})
+        summary = {
+            "positions": positions,
+            "failed": positions,
+            "alerts": 0,
+            "notifications": {},
+            "error": str(e),
+        }
+    summary["rpc_calls"] = CLIENT.metrics.total_requests() - rpc_requests
+    summary["duration"] = round(time.monotonic() - started_at, 3)
+    return summary
+
+
+@app.task(name="aggregate_health_ratio_sweep")
+def aggregate_health_ratio_sweep(
+    summaries: list[dict], started_at: float, lock_token: str = None
+) -> dict:
+    """
+    Background task to aggregate the results of the shards of a health ratio sweep,
+    record the sweep and release its lock.
+
+    :param summaries: The summaries returned by the shards.
+    :param started_at: Timestamp at which the sweep was dispatched.
+    :param lock_token: Token of the lock taken by the sweep.
+    :return: The totals of the sweep.
+    """
+    notifications = Counter()
+    for summary in summaries:
+        notifications.update(summary["notifications"])
+    result = {
+        "shards": len(summaries),
+        "failed_shards": sum("error" in summary for summary in summaries),
+        "positions": sum(summary["positions"] for summary in summaries),
+        "failed": sum(summary["failed"] for summary in summaries),
+        "alerts": sum(summary["alerts"] for summary in summaries),
+        "rpc_calls": sum(summary.get("rpc_calls", 0) for summary in summaries),
+        "samples": sum(summary.get("samples", 0) for summary in summaries),
+        "notifications": dict(notifications),
+        "slowest_shard": max((summary["duration"] for summary in summaries), default=0),
+        "duration": round(time.time() - started_at, 3),
+    }
+    logger.info(f"Health ratio sweep: {result}")
+    if lock_token is not None:
+        TaskLock(
+            "check_users_health_ratio", HEALTH_SWEEP_LOCK_TIMEOUT, token=lock_token
+        ).release()
+    record_task_run(
+        "check_users_health_ratio",
+        TaskRunStatus.SUCCEEDED,
+        started_at,
+        finished_at=time.time(),
+        positions=result["positions"],
+        rpc_calls=result["rpc_calls"],
+        details=result,
+    )
+    return result
+
+
+@app.task(name="fail_health_ratio_sweep")
+def fail_health_ratio_sweep(
+    request, exc: Exception, traceback: str, started_at: float, lock_token: str
+) -> None:
+    """
+    Error callback of the health ratio sweep, called when a shard or the
+    aggregation failed, e.g. a shard was revoked or its worker was lost.
+    Records the failed sweep and releases its lock, so the next sweep isn't
+    skipped until the lock expires.
+
+    :param request: Request of the failed task.
+    :param exc: The raised exception.
+    :param traceback: Traceback of the exception.
+    :param started_at: Timestamp at which the sweep was dispatched.
+    :param lock_token: Token of the lock taken by the sweep.
+    :return: None
+    """
+    logger.error(f"Health ratio sweep failed in task {request.id}: {exc}")
+    TaskLock(
+        "check_users_health_ratio", HEALTH_SWEEP_LOCK_TIMEOUT, token=lock_token
+    ).release()
+    record_task_run(
+        "check_users_health_ratio",
+        TaskRunStatus.FAILED,
+        started_at,
+        finished_at=time.time(),
+        details={"error": str(exc)},
+    )
+
+
+@app.task(name="monitor_users_health_ratio")
+def monitor_users_health_ratio() -> None:
+    """
+    Background task to recompute the health ratio of the positions whose
+    prices or zkLend state changed since their last check.
+    The run is skipped while the previous one is still in progress.
+
+    :return: None
+    """
+    try:
+        summary = run_exclusively(
+            "monitor_users_health_ratio",
+            HEALTH_MONITOR_LOCK_TIMEOUT,
+            lambda: run_async(HealthMonitor(MonitorState(get_redis())).run()),
+        )
+        if summary is not None:
+            logger.info(f"Health monitor run: {summary}")
+    except Exception as e:
+        logger.error(f"Error in monitor_users_health_ratio task: {e}")
+
+
+def rollup_health_history() -> dict:
+    """
+    Roll the health ratio history up into 1 minute, 1 hour and 1 day buckets,
+    each from the previous resolution, then delete the expired rows.
+
+    :return: Number of buckets written per resolution and of rows deleted.
+    """
+    health_history_db = HealthHistoryDBConnector()
+    summary = {
+        resolution: health_history_db.rollup(resolution)
+        for resolution in ("1m", "1h", "1d")
+    }
+    summary["deleted"] = health_history_db.delete_expired()
+    return summary
+
+
+@app.task(name="rollup_health_ratio_history")
+def rollup_health_ratio_history() -> None:
+    """
+    Background task to downsample the health ratio history.
+
+    :return: None
+    """
+    try:
+        summary = run_exclusively(
+            "rollup_health_ratio_history",
+            HEALTH_HISTORY_LOCK_TIMEOUT,
+            rollup_health_history,
+        )
+        if summary is not None:
+            logger.info(f"Health ratio history rollup: {summary}")
+    except Exception as e:
+        logger.error(f"Error in rollup_health_ratio_history task: {e}")
+
+
+def reconcile_aggregates() -> dict:
+    """
+    Reconcile the leaderboard counters with the positions and rebuild the
+    open position totals.
+
+    :return: Number of corrected counters and of tokens with a total.
+    """
+    corrected = LeaderboardDBConnector().reconcile_position_counts()
+    totals = PositionDBConnector().rebuild_open_position_totals()
+    return {
+        "user_counts": corrected["users"],
+        "token_counts": corrected["tokens"],
+        "open_totals": len(totals),
+    }
+
+
+@app.task(name="reconcile_position_aggregates")
+def reconcile_position_aggregates() -> None:
+    """
+    Background task to correct the drift of the aggregates maintained as
+    positions are opened and closed.
 
     :return: None
     """
     try:
-        alert_mixin = AlertMixin()
-        alert_mixin.check_users_health_ratio_level()
+        summary = run_exclusively(
+            "reconcile_position_aggregates",
+            POSITION_AGGREGATES_LOCK_TIMEOUT,
+            reconcile_aggregates,
+        )
+        if summary is not None:
+            logger.info(f"Position aggregates reconciliation: {summary}")
     except Exception as e:
-        logger.error(f"Error in check_users_health_ratio task: {e}")
+        logger.error(f"Error in reconcile_position_aggregates task: {e}")
 
 
 @app.task(name="claim_airdrop_task")
@@ -45,8 +337,7 @@ def claim_airdrop_task() -> None:
     try:
         logger.info("Running claim_airdrop_task.")
         logger.info("Task started at: ", time.strftime("%a, %d %b %Y %H:%M:%S"))
-        airdrop_claimer = AirdropClaimer()
-        asyncio.run(airdrop_claimer.claim_airdrops())
+        run_async(AirdropClaimer().claim_airdrops())
         logger.info("Task started at: ", time.strftime("%a, %d %b %Y %H:%M:%S"))
     except Exception as e:
         logger.error(f"Error in claiming airdrop task: {e}")
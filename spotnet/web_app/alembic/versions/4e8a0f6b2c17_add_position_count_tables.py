@@ -0,0 +1,74 @@
+"""add position count tables
+
+Revision ID: 4e8a0f6b2c17
+Revises: b7c3e9a41d25
+Create Date: 2026-10-18 17:46:31.902144
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4e8a0f6b2c17"
+down_revision = "b7c3e9a41d25"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Creates the user_position_count and token_position_count tables counting
+    the opened and closed positions of the leaderboard, and fills them from
+    the positions.
+    """
+    op.create_table(
+        "user_position_count",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("positions_number", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index(
+        op.f("ix_user_position_count_positions_number"),
+        "user_position_count",
+        ["positions_number"],
+        unique=False,
+    )
+    op.create_table(
+        "token_position_count",
+        sa.Column("token_symbol", sa.String(), nullable=False),
+        sa.Column("total_positions", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("token_symbol"),
+    )
+    op.execute(
+        """
+        INSERT INTO user_position_count (user_id, positions_number)
+        SELECT user_id, COUNT(id)
+        FROM position
+        WHERE status IN ('opened', 'closed')
+        GROUP BY user_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO token_position_count (token_symbol, total_positions)
+        SELECT token_symbol, COUNT(id)
+        FROM position
+        WHERE status IN ('opened', 'closed')
+        GROUP BY token_symbol
+        """
+    )
+
+
+def downgrade() -> None:
+    """
+    Removes the user_position_count and token_position_count tables.
+    """
+    op.drop_table("token_position_count")
+    op.drop_index(
+        op.f("ix_user_position_count_positions_number"),
+        table_name="user_position_count",
+    )
+    op.drop_table("user_position_count")
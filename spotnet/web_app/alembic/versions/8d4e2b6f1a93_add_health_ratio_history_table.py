@@ -0,0 +1,66 @@
+"""add health ratio history table
+
+Revision ID: 8d4e2b6f1a93
+Revises: f3a1c7d92b60
+Create Date: 2026-10-18 11:02:17.540913
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8d4e2b6f1a93"
+down_revision = "f3a1c7d92b60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Creates the health_ratio_history table storing the health ratio samples
+    of deposit contracts and their rollups, with indexes for the history of
+    a contract and for the rollups and retention of a resolution.
+    """
+    op.create_table(
+        "health_ratio_history",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("contract_address", sa.String(), nullable=False),
+        sa.Column("resolution", sa.String(length=4), nullable=False),
+        sa.Column("timestamp", sa.BigInteger(), nullable=False),
+        sa.Column("health_ratio", sa.Float(), nullable=False),
+        sa.Column("min_health_ratio", sa.Float(), nullable=False),
+        sa.Column("ltv", sa.Float(), nullable=False),
+        sa.Column("collateral_usd", sa.Float(), nullable=False),
+        sa.Column("debt_usd", sa.Float(), nullable=False),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_health_ratio_history_contract_resolution_timestamp",
+        "health_ratio_history",
+        ["contract_address", "resolution", "timestamp"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_health_ratio_history_resolution_timestamp",
+        "health_ratio_history",
+        ["resolution", "timestamp"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """
+    Removes the health_ratio_history table and its indexes.
+    """
+    op.drop_index(
+        "ix_health_ratio_history_resolution_timestamp",
+        table_name="health_ratio_history",
+    )
+    op.drop_index(
+        "ix_health_ratio_history_contract_resolution_timestamp",
+        table_name="health_ratio_history",
+    )
+    op.drop_table("health_ratio_history")
@@ -0,0 +1,82 @@
+"""numeric amounts and open position total table
+
+Revision ID: b7c3e9a41d25
+Revises: 8d4e2b6f1a93
+Create Date: 2026-10-18 15:24:08.318620
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7c3e9a41d25"
+down_revision = "8d4e2b6f1a93"
+branch_labels = None
+depends_on = None
+
+AMOUNT_COLUMNS = [
+    ("position", False),
+    ("extra_deposits", False),
+    ("vault", True),
+]
+
+
+def upgrade() -> None:
+    """
+    Converts the amounts of the position, extra_deposits and vault tables
+    to NUMERIC, then creates the open_position_total table and fills it with
+    the totals of the opened positions and their extra deposits.
+    """
+    for table_name, nullable in AMOUNT_COLUMNS:
+        op.alter_column(
+            table_name,
+            "amount",
+            existing_type=sa.String(),
+            type_=sa.NUMERIC(),
+            existing_nullable=nullable,
+            postgresql_using="amount::numeric",
+        )
+
+    op.create_table(
+        "open_position_total",
+        sa.Column("token_symbol", sa.String(), nullable=False),
+        sa.Column("amount", sa.NUMERIC(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("token_symbol"),
+    )
+    op.execute(
+        """
+        INSERT INTO open_position_total (token_symbol, amount, updated_at)
+        SELECT token_symbol, SUM(amount), now()
+        FROM (
+            SELECT token_symbol, amount
+            FROM position
+            WHERE status = 'opened'
+            UNION ALL
+            SELECT extra_deposits.token_symbol, extra_deposits.amount
+            FROM extra_deposits
+            JOIN position ON position.id = extra_deposits.position_id
+            WHERE position.status = 'opened'
+        ) AS amounts
+        GROUP BY token_symbol
+        """
+    )
+
+
+def downgrade() -> None:
+    """
+    Removes the open_position_total table and converts the amounts back to strings.
+    """
+    op.drop_table("open_position_total")
+
+    for table_name, nullable in AMOUNT_COLUMNS:
+        op.alter_column(
+            table_name,
+            "amount",
+            existing_type=sa.NUMERIC(),
+            type_=sa.String(),
+            existing_nullable=nullable,
+            postgresql_using="amount::text",
+        )
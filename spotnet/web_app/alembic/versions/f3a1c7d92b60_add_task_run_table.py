@@ -0,0 +1,56 @@
+"""add task run table
+
+Revision ID: f3a1c7d92b60
+Revises: c045e432555c
+Create Date: 2026-10-18 10:12:44.318207
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "f3a1c7d92b60"
+down_revision = "c045e432555c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Creates the task_run table storing the telemetry of the scheduled tasks,
+    with indexes on task_name and started_at.
+    """
+    op.create_table(
+        "task_run",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("task_name", sa.String(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("succeeded", "failed", "skipped", name="task_run_status_enum"),
+            nullable=False,
+        ),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("duration", sa.Float(), nullable=True),
+        sa.Column("positions", sa.Integer(), nullable=True),
+        sa.Column("rpc_calls", sa.Integer(), nullable=True),
+        sa.Column("details", sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_task_run_task_name"), "task_run", ["task_name"], unique=False
+    )
+    op.create_index(
+        op.f("ix_task_run_started_at"), "task_run", ["started_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """
+    Removes the task_run table, its indexes and the task_run_status_enum type.
+    """
+    op.drop_index(op.f("ix_task_run_started_at"), table_name="task_run")
+    op.drop_index(op.f("ix_task_run_task_name"), table_name="task_run")
+    op.drop_table("task_run")
+    sa.Enum(name="task_run_status_enum").drop(op.get_bind(), checkfirst=True)
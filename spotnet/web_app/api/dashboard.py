@@ -2,17 +2,23 @@
 This module handles dashboard-related API endpoints.
 """
 
-import collections
+from datetime import datetime, timezone
 from decimal import Decimal, DivisionByZero
+from typing import Literal
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
-from web_app.api.serializers.dashboard import DashboardResponse
+from web_app.api.serializers.dashboard import DashboardResponse, HealthRatioHistoryItem
 from web_app.contract_tools.mixins import DashboardMixin, HealthRatioMixin
-from web_app.db.crud import PositionDBConnector
+from web_app.db.crud import (
+    HealthHistoryDBConnector,
+    PositionDBConnector,
+    run_in_db_executor,
+)
 
 router = APIRouter()
 position_db_connector = PositionDBConnector()
+health_history_db_connector = HealthHistoryDBConnector()
 
 
 @router.get(
@@ -39,8 +45,8 @@ async def get_dashboard(wallet_id: str) -> DashboardResponse:
     - **deposit_data**: Deposit data including token and amount.
 
     """
-    contract_address = position_db_connector.get_contract_address_by_wallet_id(
-        wallet_id
+    snapshot = await run_in_db_executor(
+        position_db_connector.get_dashboard_snapshot, wallet_id
     )
     default_dashboard_response = DashboardResponse(
         health_ratio="0",
@@ -53,18 +59,12 @@ async def get_dashboard(wallet_id: str) -> DashboardResponse:
         position_id="0",
         deposit_data=[],
     )
+    contract_address = snapshot.contract_address
     if not contract_address:
         return default_dashboard_response
 
-    # Fetching first 10 positions at the moment
-    opened_positions = position_db_connector.get_positions_by_wallet_id(wallet_id)
-
     # At the moment, we only support one position per wallet
-    first_opened_position = (
-        opened_positions[0]
-        if opened_positions
-        else collections.defaultdict(lambda: None)
-    )
+    first_opened_position = snapshot.position
     if not first_opened_position:
         return default_dashboard_response
     try:
@@ -78,25 +78,21 @@ async def get_dashboard(wallet_id: str) -> DashboardResponse:
     position_multiplier = first_opened_position["multiplier"]
     position_amount = first_opened_position["amount"]
 
-    current_sum = await DashboardMixin.get_current_position_sum(first_opened_position)
+    current_sum = await DashboardMixin.get_current_position_sum(
+        first_opened_position, snapshot.extra_deposits
+    )
     start_sum = await DashboardMixin.get_start_position_sum(
         first_opened_position["start_price"],
         position_amount,
         position_multiplier,
     )
-    position_balance = await DashboardMixin.get_position_balance(
-        first_opened_position["id"]
-    )
     total_position_balance = await DashboardMixin.calculate_position_balance(
-        position_balance, position_multiplier
+        position_amount, position_multiplier
     )
     token_symbol = first_opened_position["token_symbol"]
-    extra_deposits = position_db_connector.get_extra_deposits_by_position_id(
-        first_opened_position["id"]
-    )
     deposit_data = [
         {"token": deposit.token_symbol, "amount": deposit.amount}
-        for deposit in extra_deposits
+        for deposit in snapshot.extra_deposits
     ]
 
     return DashboardResponse(
@@ -110,3 +106,57 @@ async def get_dashboard(wallet_id: str) -> DashboardResponse:
         position_id=first_opened_position["id"],
         deposit_data=deposit_data,
     )
+
+
+@router.get(
+    "/api/health-ratio-history",
+    tags=["Dashboard Operations"],
+    summary="Get the health ratio history of a user",
+    response_model=list[HealthRatioHistoryItem],
+    response_description="Returns the health ratio history of the user's position.",
+)
+async def get_health_ratio_history(
+    wallet_id: str,
+    resolution: Literal["raw", "1m", "1h", "1d"] = "1h",
+    since: datetime | None = None,
+    limit: int = Query(500, ge=1, le=5000),
+) -> list[HealthRatioHistoryItem]:
+    """
+    This endpoint fetches the stored health ratio history of the user's position,
+    without any on-chain call.
+
+    ### Parameters:
+    - **wallet_id**: User's wallet ID
+    - **resolution**: Samples ("raw") or 1 minute, 1 hour or 1 day buckets
+    - **since**: Only entries from this time are returned
+    - **limit**: Maximum number of entries, the latest ones are returned
+
+    ### Returns:
+    The entries in chronological order, an empty list without a position.
+    """
+    contract_address = await run_in_db_executor(
+        position_db_connector.get_contract_address_by_wallet_id, wallet_id
+    )
+    if not contract_address:
+        return []
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    rows = await run_in_db_executor(
+        health_history_db_connector.get_history,
+        contract_address,
+        resolution,
+        since=int(since.timestamp()) if since is not None else None,
+        limit=limit,
+    )
+    return [
+        HealthRatioHistoryItem(
+            timestamp=datetime.fromtimestamp(row.timestamp, timezone.utc),
+            health_ratio=row.health_ratio,
+            min_health_ratio=row.min_health_ratio,
+            ltv=row.ltv,
+            collateral_usd=row.collateral_usd,
+            debt_usd=row.debt_usd,
+            samples=row.samples,
+        )
+        for row in rows
+    ]
@@ -2,6 +2,7 @@
 This module handles leaderboard-related API endpoints.
 """
 from fastapi import APIRouter
+from web_app.db.crud import run_in_db_executor
 from web_app.db.crud.leaderboard import LeaderboardDBConnector
 from web_app.api.serializers.leaderboard import UserLeaderboardItem, TokenPositionStatistic
 
@@ -19,7 +20,9 @@ async def get_user_leaderboard() -> list[UserLeaderboardItem]:
     """
     Get the top 10 users ordered by closed/opened positions.
     """
-    leaderboard_data = leaderboard_db_connector.get_top_users_by_positions()
+    leaderboard_data = await run_in_db_executor(
+        leaderboard_db_connector.get_top_users_by_positions
+    )
     return leaderboard_data
 
 
@@ -35,4 +38,6 @@ async def get_position_tokens_statistic() -> list[TokenPositionStatistic]:
     This endpoint retrieves statistics about positions grouped by token symbol.
     Returns counts of opened and closed positions for each token.
     """
-    return leaderboard_db_connector.get_position_token_statistics()
+    return await run_in_db_executor(
+        leaderboard_db_connector.get_position_token_statistics
+    )
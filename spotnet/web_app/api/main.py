@@ -20,6 +20,9 @@ from web_app.api.telegram import router as telegram_router
 from web_app.api.user import router as user_router
 from web_app.api.vault import router as vault_router
 from web_app.api.leaderboard import router as leaderboard_router
+from web_app.api.metrics import router as metrics_router
+from web_app.contract_tools.abi_cache import ABI_CACHE
+from web_app.contract_tools.api_request import APIRequest
 from web_app.contract_tools.blockchain_call import CLIENT
 from web_app.contract_tools.constants import EKUBO_MAINNET_ADDRESS
 
@@ -57,14 +60,36 @@ app.add_middleware(
 )
 
 
+def set_ekubo_contract(contract: Contract) -> None:
+    """
+    Replace the Ekubo contract instance, e.g. after the contract was upgraded.
+    :param contract: The new contract instance
+    """
+    app.state.ekubo_contract = contract
+    CLIENT.pool_price_oracle.ekubo_contract = contract
+
+
 @app.on_event("startup")
 async def startup_event():
     """
-    Initialize the Ekubo contract instance on startup.
+    Initialize the Ekubo contract instance from its cached ABI and the shared
+    HTTP session on startup, then start refreshing the Ekubo pool prices
+    in the background.
     """
-    app.state.ekubo_contract = await Contract.from_address(
-        EKUBO_MAINNET_ADDRESS, provider=CLIENT.client
+    await APIRequest.start_session()
+    app.state.ekubo_contract = await ABI_CACHE.get_contract(
+        EKUBO_MAINNET_ADDRESS, provider=CLIENT.client, on_update=set_ekubo_contract
     )
+    CLIENT.pool_price_oracle.start(app.state.ekubo_contract)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Stop the Ekubo pool price refresh and close the shared HTTP session on shutdown.
+    """
+    await CLIENT.pool_price_oracle.stop()
+    await APIRequest.close_session()
 
 
 # Include the form and login routers
@@ -74,3 +99,4 @@ app.include_router(user_router)
 app.include_router(telegram_router)
 app.include_router(vault_router)
 app.include_router(leaderboard_router)
+app.include_router(metrics_router)
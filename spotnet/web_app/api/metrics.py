@@ -0,0 +1,26 @@
+"""
+This module handles the metrics API endpoint.
+"""
+
+from fastapi import APIRouter
+
+from web_app.api.serializers.metrics import MetricsResponse
+from web_app.contract_tools.blockchain_call import CLIENT
+from web_app.db.database import get_pool_metrics
+
+router = APIRouter()
+
+
+@router.get(
+    "/api/metrics",
+    tags=["Metrics"],
+    response_model=MetricsResponse,
+    summary="Get the metrics of the API process",
+    response_description="Returns the retry counters and latency histograms "
+    "of the RPC calls, and the usage of the database connection pools.",
+)
+async def get_metrics() -> MetricsResponse:
+    """
+    Get the metrics collected by this API process since it started.
+    """
+    return MetricsResponse(rpc=CLIENT.metrics.snapshot(), db=get_pool_metrics())
@@ -22,7 +22,11 @@ from web_app.api.serializers.transaction import (
 )
 from web_app.contract_tools.constants import TokenMultipliers, TokenParams
 from web_app.contract_tools.mixins import DashboardMixin, DepositMixin, PositionMixin
-from web_app.db.crud import PositionDBConnector, TransactionDBConnector
+from web_app.db.crud import (
+    PositionDBConnector,
+    TransactionDBConnector,
+    run_in_db_executor,
+)
 from web_app.db.models import TransactionStatus
 
 router = APIRouter()  # Initialize the router
@@ -78,7 +82,8 @@ async def create_position_with_transaction_data(
     The created position's details and transaction data.
     """
     # Create a new position in the database
-    position = position_db_connector.create_position(
+    position = await run_in_db_executor(
+        position_db_connector.create_position,
         form_data.wallet_id,
         form_data.token_symbol,
         form_data.amount,
@@ -97,8 +102,8 @@ async def create_position_with_transaction_data(
         borrowing_token,
         request.app.state.ekubo_contract,
     )
-    deposit_data["contract_address"] = (
-        position_db_connector.get_contract_address_by_wallet_id(form_data.wallet_id)
+    deposit_data["contract_address"] = await run_in_db_executor(
+        position_db_connector.get_contract_address_by_wallet_id, form_data.wallet_id
     )
     deposit_data["position_id"] = str(position.id)
     return LoopLiquidityData(**deposit_data)
@@ -125,8 +130,8 @@ async def get_repay_data(
     if not wallet_id:
         raise HTTPException(status_code=404, detail="Wallet not found")
 
-    contract_address, position_id, token_symbol = position_db_connector.get_repay_data(
-        wallet_id
+    contract_address, position_id, token_symbol = await run_in_db_executor(
+        position_db_connector.get_repay_data, wallet_id
     )
     is_opened_position = await PositionMixin.is_opened_position(contract_address)
     if not is_opened_position:
@@ -160,9 +165,14 @@ async def close_position(position_id: UUID, transaction_hash: str) -> str:
     if position_id is None or position_id == "undefined":
         raise HTTPException(status_code=404, detail="Position not Found")
 
-    position_status = position_db_connector.close_position(str(position_id))
-    position_db_connector.save_transaction(
-        position_id=position_id, status="closed", transaction_hash=transaction_hash
+    position_status = await run_in_db_executor(
+        position_db_connector.close_position, str(position_id)
+    )
+    await run_in_db_executor(
+        position_db_connector.save_transaction,
+        position_id=position_id,
+        status="closed",
+        transaction_hash=transaction_hash,
     )
     return position_status
 
@@ -187,11 +197,16 @@ async def open_position(position_id: str, transaction_hash: str) -> str:
         raise HTTPException(status_code=404, detail="Position not found")
 
     current_prices = await DashboardMixin.get_current_prices()
-    position_status = position_db_connector.open_position(position_id, current_prices)
+    position_status = await run_in_db_executor(
+        position_db_connector.open_position, position_id, current_prices
+    )
 
     if transaction_hash:
-        transaction_db_connector.create_transaction(
-            position_id, transaction_hash, status=TransactionStatus.OPENED.value
+        await run_in_db_executor(
+            transaction_db_connector.create_transaction,
+            position_id,
+            transaction_hash,
+            status=TransactionStatus.OPENED.value,
         )
 
     return position_status
@@ -212,8 +227,8 @@ async def get_withdraw_data(wallet_id: str, request: Request) -> WithdrawAllData
     :param request: request object
     :return: Dict containing repay data with list of token addresses
     """
-    contract_address, position_id, token_symbol = position_db_connector.get_repay_data(
-        wallet_id
+    contract_address, position_id, token_symbol = await run_in_db_executor(
+        position_db_connector.get_repay_data, wallet_id
     )
     if not await PositionMixin.is_opened_position(contract_address):
         raise HTTPException(status_code=400, detail="Position was closed")
@@ -223,7 +238,11 @@ async def get_withdraw_data(wallet_id: str, request: Request) -> WithdrawAllData
     repay_data = await DepositMixin.get_repay_data(
         token_symbol, request.app.state.ekubo_contract
     )
-    extra_tokens = position_db_connector.get_extra_deposits_data(position_id).keys()
+    extra_tokens = (
+        await run_in_db_executor(
+            position_db_connector.get_extra_deposits_data, position_id
+        )
+    ).keys()
     repay_data["position_id"] = str(position_id)
     repay_data["contract_address"] = contract_address
 
@@ -259,7 +278,9 @@ async def get_add_deposit_data(position_id: UUID, amount: str, token_symbol: str
     if not token_symbol:
         raise HTTPException(status_code=400, detail="Token symbol is required")
 
-    position = position_db_connector.get_position_by_id(position_id)
+    position = await run_in_db_executor(
+        position_db_connector.get_position_by_id, position_id
+    )
     if not position:
         raise HTTPException(status_code=404, detail="Position not found")
 
@@ -293,16 +314,24 @@ async def add_extra_deposit(position_id: UUID, data: AddPositionDepositData):
     if not data.transaction_hash:
         raise HTTPException(status_code=400, detail="Transaction hash is required")
 
-    position = position_db_connector.get_position_by_id(position_id)
+    position = await run_in_db_executor(
+        position_db_connector.get_position_by_id, position_id
+    )
     if not position:
         raise HTTPException(status_code=404, detail="Position not found")
 
-    position_db_connector.add_extra_deposit_to_position(
-        position, data.token_symbol, data.amount
+    await run_in_db_executor(
+        position_db_connector.add_extra_deposit_to_position,
+        position,
+        data.token_symbol,
+        data.amount,
     )
 
-    transaction_db_connector.create_transaction(
-        position_id, data.transaction_hash, status=TransactionStatus.EXTRA_DEPOSIT.value
+    await run_in_db_executor(
+        transaction_db_connector.create_transaction,
+        position_id,
+        data.transaction_hash,
+        status=TransactionStatus.EXTRA_DEPOSIT.value,
     )
 
     return {"detail": "Successfully added extra deposit"}
@@ -333,11 +362,16 @@ async def get_user_positions(
     if not wallet_id:
         raise HTTPException(status_code=400, detail="Wallet ID is required")
 
-    positions = position_db_connector.get_all_positions_by_wallet_id(
-        wallet_id, start=start, limit=limit
+    positions = await run_in_db_executor(
+        position_db_connector.get_all_positions_by_wallet_id,
+        wallet_id,
+        start=start,
+        limit=limit,
+    )
+    total_positions = await run_in_db_executor(
+        position_db_connector.get_count_positions_by_wallet_id, wallet_id
     )
-    total_positions = position_db_connector.get_count_positions_by_wallet_id(wallet_id)
-    
+
     return UserPositionHistoryResponse(
         positions=positions,
         total_count=total_positions
@@ -357,8 +391,10 @@ async def get_list_of_deposited_tokens(position_id: UUID):
     :param position_id: UUID of the position
     :return Dict containing main position and extra positions
     """
-    main_position = position_db_connector.get_position_by_id(position_id)
-    extra_deposits = position_db_connector.get_extra_deposits_by_position_id(
-        position_id
+    main_position = await run_in_db_executor(
+        position_db_connector.get_position_by_id, position_id
+    )
+    extra_deposits = await run_in_db_executor(
+        position_db_connector.get_extra_deposits_by_position_id, position_id
     )
     return {"main": main_position, "extra_deposits": extra_deposits}
@@ -58,3 +58,31 @@ class DashboardResponse(BaseModel):
         ],
         description="The deposit data including token and amount.",
     )
+
+
+class HealthRatioHistoryItem(BaseModel):
+    """
+    HealthRatioHistoryItem class for a sample or bucket of the health ratio history.
+    """
+
+    timestamp: datetime = Field(
+        ...,
+        example="2024-01-01T00:00:00",
+        description="The time of the sample, or the start of the bucket.",
+    )
+    health_ratio: float = Field(
+        ..., example=2.0, description="The health ratio, averaged over the bucket."
+    )
+    min_health_ratio: float = Field(
+        ..., example=1.8, description="The lowest health ratio of the bucket."
+    )
+    ltv: float = Field(..., example=0.5, description="The loan to value ratio.")
+    collateral_usd: float = Field(
+        ..., example=1000.0, description="The USD value of the deposits."
+    )
+    debt_usd: float = Field(
+        ..., example=500.0, description="The USD value of the debt."
+    )
+    samples: int = Field(
+        ..., example=60, description="The number of samples in the bucket."
+    )
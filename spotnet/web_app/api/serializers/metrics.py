@@ -0,0 +1,65 @@
+"""
+This module defines the serializers for the service metrics.
+"""
+
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class RpcMethodMetrics(BaseModel):
+    """
+    RpcMethodMetrics class for the retry counters and latency histogram
+    of an RPC method.
+    """
+
+    calls: int = Field(..., example=120, description="The number of calls made.")
+    retries: int = Field(
+        ..., example=3, description="The number of attempts retried after a failure."
+    )
+    failures: int = Field(
+        ..., example=1, description="The number of calls failed after all retries."
+    )
+    latency_sum: float = Field(
+        ..., example=14.2, description="The total duration of the calls, in seconds."
+    )
+    latency_buckets: Dict[str, int] = Field(
+        ...,
+        example={"0.05": 40, "0.1": 70, "inf": 0},
+        description="The number of calls by latency upper bound, in seconds.",
+    )
+
+
+class PoolMetrics(BaseModel):
+    """
+    PoolMetrics class for the usage of a database connection pool.
+    """
+
+    pool: str = Field(..., example="QueuePool", description="The pool class.")
+    size: Optional[int] = Field(
+        ..., example=10, description="The number of connections kept open."
+    )
+    checked_out: Optional[int] = Field(
+        ..., example=2, description="The number of connections in use."
+    )
+    checked_in: Optional[int] = Field(
+        ..., example=8, description="The number of idle connections."
+    )
+    overflow: Optional[int] = Field(
+        ...,
+        example=-8,
+        description="The number of connections opened beyond the pool size.",
+    )
+
+
+class MetricsResponse(BaseModel):
+    """
+    MetricsResponse class for the metrics of the API process.
+    """
+
+    rpc: Dict[str, RpcMethodMetrics] = Field(
+        ..., description="The RPC metrics by method name."
+    )
+    db: Dict[str, PoolMetrics] = Field(
+        ..., description="The connection pool usage by database URL."
+    )
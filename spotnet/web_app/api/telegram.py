@@ -15,7 +15,12 @@ from aiogram.utils.web_app import check_webapp_signature
 from fastapi import APIRouter, HTTPException, Request
 
 from web_app.api.serializers.telegram import TelegramUserAuth, TelegramUserCreate
-from web_app.db.crud import DBConnector, TelegramUserDBConnector, UserDBConnector
+from web_app.db.crud import (
+    DBConnector,
+    TelegramUserDBConnector,
+    UserDBConnector,
+    run_in_db_executor,
+)
 from web_app.telegram import TELEGRAM_TOKEN, bot, dp, logger
 from web_app.telegram.utils import (
     build_multipart_response,
@@ -47,7 +52,7 @@ async def generate_telegram_link(wallet_id: str):
     if not wallet_id:
         raise HTTPException(status_code=400, detail="Wallet ID is required")
 
-    user = user_db.get_user_by_wallet_id(wallet_id)
+    user = await run_in_db_executor(user_db.get_user_by_wallet_id, wallet_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -114,7 +119,9 @@ async def save_telegram_user(user: TelegramUserCreate):
         dict: A dictionary with a success message.
     """
     try:
-        telegram_user_db_connector.save_or_update_user(user.model_dump())
+        await run_in_db_executor(
+            telegram_user_db_connector.save_or_update_user, user.model_dump()
+        )
         return {"message": "Telegram user saved successfully"}
     except Exception as e:
         raise HTTPException(
@@ -146,5 +153,7 @@ async def get_wallet_id(telegram_auth: TelegramUserAuth, telegram_id: str):
     if not is_valid:
         raise HTTPException(400, "Telegram auth data is invalid.")
 
-    wallet_id = telegram_user_db_connector.get_wallet_id_by_telegram_id(telegram_id)
+    wallet_id = await run_in_db_executor(
+        telegram_user_db_connector.get_wallet_id_by_telegram_id, telegram_id
+    )
     return {"wallet_id": wallet_id}
@@ -24,6 +24,7 @@ from web_app.db.crud import (
     PositionDBConnector,
     TelegramUserDBConnector,
     UserDBConnector,
+    run_in_db_executor,
 )
 
 logger = logging.getLogger(__name__)
@@ -48,8 +49,12 @@ async def has_user_opened_position(wallet_id: str) -> dict:
     :raises: HTTPException
     """
     try:
-        has_position = position_db.has_opened_position(wallet_id)
-        contract_address = user_db.get_contract_address_by_wallet_id(wallet_id)
+        has_position = await run_in_db_executor(
+            position_db.has_opened_position, wallet_id
+        )
+        contract_address = await run_in_db_executor(
+            user_db.get_contract_address_by_wallet_id, wallet_id
+        )
         if contract_address is None:
             return {"has_opened_position": False}
         is_position_opened = await PositionMixin.is_opened_position(contract_address)
@@ -76,7 +81,7 @@ async def get_user_contract(wallet_id: str) -> str:
     :return: int
     :raises: HTTPException :return: Dict containing status code and detail
     """
-    user = user_db.get_user_by_wallet_id(wallet_id)
+    user = await run_in_db_executor(user_db.get_user_by_wallet_id, wallet_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     elif not user.is_contract_deployed:
@@ -104,11 +109,11 @@ async def check_user(wallet_id: str) -> CheckUserResponse:
     The contract deployment status
     """
 
-    user = user_db.get_user_by_wallet_id(wallet_id)
+    user = await run_in_db_executor(user_db.get_user_by_wallet_id, wallet_id)
     if user and not user.is_contract_deployed:
         return {"is_contract_deployed": False}
     elif not user:
-        user_db.create_user(wallet_id)
+        await run_in_db_executor(user_db.create_user, wallet_id)
         return {"is_contract_deployed": False}
     else:
         return {"is_contract_deployed": True}
@@ -135,9 +140,11 @@ async def update_user_contract(
     The contract deployment status
     """
 
-    user = user_db.get_user_by_wallet_id(data.wallet_id)
+    user = await run_in_db_executor(user_db.get_user_by_wallet_id, data.wallet_id)
     if user:
-        user_db.update_user_contract(user, data.contract_address)
+        await run_in_db_executor(
+            user_db.update_user_contract, user, data.contract_address
+        )
         return {"is_contract_deployed": True}
     else:
         return {"is_contract_deployed": False}
@@ -162,7 +169,7 @@ async def subscribe_to_notification(
     ### Returns:
     Success status of the subscription.
     """
-    user = user_db.get_user_by_wallet_id(data.wallet_id)
+    user = await run_in_db_executor(user_db.get_user_by_wallet_id, data.wallet_id)
     # Check if the user exists; if not, raise a 404 error
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -170,12 +177,16 @@ async def subscribe_to_notification(
     telegram_id = data.telegram_id
     # Is not provided, attempt to retrieve it from the database
     if not telegram_id:
-        tg_user = telegram_db.get_telegram_user_by_wallet_id(data.wallet_id)
+        tg_user = await run_in_db_executor(
+            telegram_db.get_telegram_user_by_wallet_id, data.wallet_id
+        )
         if tg_user:
             telegram_id = tg_user.telegram_id
     # Is found, set the notification preference for the user
     if telegram_id:
-        telegram_db.set_allow_notification(telegram_id, data.wallet_id)
+        await run_in_db_executor(
+            telegram_db.set_allow_notification, telegram_id, data.wallet_id
+        )
         return {"detail": "User subscribed to notifications successfully"}
 
     # If no Telegram ID is available, raise
@@ -202,7 +213,9 @@ async def get_user_contract_address(wallet_id: str) -> GetUserContractAddressRes
     The contract address or None if it does not exists.
     """
 
-    contract_address = user_db.get_contract_address_by_wallet_id(wallet_id)
+    contract_address = await run_in_db_executor(
+        user_db.get_contract_address_by_wallet_id, wallet_id
+    )
     if contract_address:
         return {"contract_address": contract_address}
     else:
@@ -228,7 +241,9 @@ async def get_stats() -> GetStatsResponse:
     """
     try:
         # Fetch open positions amounts by token
-        token_amounts = position_db.get_total_amounts_for_open_positions()
+        token_amounts = await run_in_db_executor(
+            position_db.get_total_amounts_for_open_positions
+        )
 
         # Fetch current prices
         current_prices = await DashboardMixin.get_current_prices()
@@ -252,7 +267,7 @@ async def get_stats() -> GetStatsResponse:
             usdc_equivalent = amount * Decimal(usdc_price)
             total_opened_amount += usdc_equivalent
 
-        unique_users = user_db.get_unique_users_count()
+        unique_users = await run_in_db_executor(user_db.get_unique_users_count)
         return GetStatsResponse(
             total_opened_amount=total_opened_amount, unique_users=unique_users
         )
@@ -0,0 +1,251 @@
+"""
+This module caches contract ABIs on disk, keyed by class hash, so contract
+instances can be built at startup without fetching their class from the chain.
+The ABIs of the contracts used by the API are committed in the `abi` directory,
+along with `contracts.json` mapping each contract address to its class hash.
+
+Usage:
+    # Refresh the committed ABIs of the contracts used by the API
+    python -m web_app.contract_tools.abi_cache
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Callable
+
+from starknet_py.contract import Contract
+from starknet_py.net.client import Client
+from starknet_py.net.client_models import SierraContractClass
+from starknet_py.net.models import AddressRepresentation, parse_address
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ABI_CACHE_DIR = os.path.join(os.path.dirname(__file__), "abi")
+
+
+class AbiCache:
+    """
+    On-disk cache of contract ABIs. Each ABI is stored under the class hash it
+    was read from, and is revalidated in the background when served.
+    """
+
+    CONTRACTS_FILE = "contracts.json"
+
+    def __init__(self, cache_dir: str | None = None):
+        """
+        :param cache_dir: Directory of the cached ABIs. Defaults to `ABI_CACHE_DIR`,
+         then to the `abi` directory bundled with this package.
+        """
+        self.cache_dir = (
+            cache_dir or os.getenv("ABI_CACHE_DIR") or DEFAULT_ABI_CACHE_DIR
+        )
+        self._tasks: set[asyncio.Task] = set()
+
+    def _path(self, class_hash: int) -> str:
+        """
+        Get the path of the cache file of a contract class.
+
+        :param class_hash: The class hash.
+        :return: str
+        """
+        return os.path.join(self.cache_dir, f"{class_hash:#066x}.json")
+
+    def _read_json(self, path: str):
+        """
+        Read a cache file.
+
+        :param path: The path of the file.
+        :return: The decoded content, None when the file is missing or unreadable.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable ABI cache file {path}: {e}")
+            return None
+
+    def _write_json(self, path: str, value) -> None:
+        """
+        Write a cache file. The file is replaced atomically so concurrent workers
+        never read a partial entry.
+
+        :param path: The path of the file.
+        :param value: The content to encode.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(value, file, indent=2)
+            file.write("\n")
+        os.replace(temporary_path, path)
+
+    def load(self, address: AddressRepresentation) -> dict | None:
+        """
+        Read the cached ABI of a contract.
+
+        :param address: The contract address.
+        :return: dict with the class hash, Cairo version and ABI, None when not cached.
+        """
+        contracts = self._read_json(os.path.join(self.cache_dir, self.CONTRACTS_FILE))
+        try:
+            class_hash = int(contracts[f"{parse_address(address):#066x}"], 16)
+        except (TypeError, KeyError, ValueError):
+            return None
+        entry = self._read_json(self._path(class_hash))
+        try:
+            return {
+                "class_hash": class_hash,
+                "cairo_version": entry["cairo_version"],
+                "abi": entry["abi"],
+            }
+        except (TypeError, KeyError):
+            return None
+
+    def store(
+        self,
+        address: AddressRepresentation,
+        class_hash: int,
+        cairo_version: int,
+        abi: list,
+    ) -> None:
+        """
+        Write the ABI of a class to the cache, then point the contract to it.
+
+        :param address: The contract address.
+        :param class_hash: Hash of the class the ABI was read from.
+        :param cairo_version: Cairo version of the class.
+        :param abi: The contract ABI.
+        """
+        self._write_json(
+            self._path(class_hash), {"cairo_version": cairo_version, "abi": abi}
+        )
+        contracts_path = os.path.join(self.cache_dir, self.CONTRACTS_FILE)
+        contracts = self._read_json(contracts_path) or {}
+        contracts[f"{parse_address(address):#066x}"] = f"{class_hash:#066x}"
+        self._write_json(contracts_path, dict(sorted(contracts.items())))
+
+    async def fetch(self, address: AddressRepresentation, client: Client) -> dict:
+        """
+        Read the ABI of a contract from the chain and store it in the cache.
+        The ABI is returned even if the cache can't be written.
+
+        :param address: The contract address.
+        :param client: The client to read the contract class with.
+        :return: dict with the class hash, Cairo version and ABI.
+        """
+        address = parse_address(address)
+        class_hash = await client.get_class_hash_at(contract_address=address)
+        contract_class = await client.get_class_by_hash(class_hash=class_hash)
+        if isinstance(contract_class, SierraContractClass):
+            cairo_version, abi = 1, json.loads(contract_class.abi)
+        else:
+            cairo_version, abi = 0, contract_class.abi
+        try:
+            self.store(address, class_hash, cairo_version, abi)
+        except OSError as e:
+            logger.error(f"Failed to write the ABI of {address:#x} to the cache: {e}")
+        return {"class_hash": class_hash, "cairo_version": cairo_version, "abi": abi}
+
+    async def revalidate(
+        self, address: AddressRepresentation, client: Client, class_hash: int
+    ) -> dict | None:
+        """
+        Check whether the class of a contract still matches its cached ABI,
+        refreshing the cache when the contract was upgraded.
+
+        :param address: The contract address.
+        :param client: The client to read the contract class with.
+        :param class_hash: Class hash of the cached ABI.
+        :return: The new cache entry if the class changed, None otherwise.
+        """
+        current_class_hash = await client.get_class_hash_at(
+            contract_address=parse_address(address)
+        )
+        if current_class_hash == class_hash:
+            return None
+        logger.info(
+            f"Class of contract {address} changed from {hex(class_hash)} "
+            f"to {hex(current_class_hash)}, refreshing its cached ABI"
+        )
+        return await self.fetch(address, client)
+
+    async def get_contract(
+        self,
+        address: AddressRepresentation,
+        provider: Client,
+        on_update: Callable[[Contract], None] | None = None,
+    ) -> Contract:
+        """
+        Build a contract instance from its cached ABI, fetching it only when it
+        isn't cached yet. A cached ABI is revalidated in the background.
+
+        :param address: The contract address.
+        :param provider: The client bound to the contract instance.
+        :param on_update: Called with a new contract instance when the background
+         revalidation finds that the contract class changed.
+        :return: Contract
+        """
+        entry = self.load(address)
+        if entry is None:
+            entry = await self.fetch(address, provider)
+        else:
+            task = asyncio.create_task(
+                self._revalidate_in_background(
+                    address, provider, entry["class_hash"], on_update
+                )
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        return Contract(
+            address=address,
+            abi=entry["abi"],
+            provider=provider,
+            cairo_version=entry["cairo_version"],
+        )
+
+    async def _revalidate_in_background(
+        self,
+        address: AddressRepresentation,
+        provider: Client,
+        class_hash: int,
+        on_update: Callable[[Contract], None] | None,
+    ) -> None:
+        """
+        Revalidate a cached ABI, logging instead of raising on failure.
+
+        :param address: The contract address.
+        :param provider: The client bound to the contract instance.
+        :param class_hash: Class hash of the cached ABI.
+        :param on_update: Called with a new contract instance if the class changed.
+        """
+        try:
+            entry = await self.revalidate(address, provider, class_hash)
+        except Exception as e:
+            logger.warning(f"Failed to revalidate the cached ABI of {address}: {e}")
+            return
+        if entry is not None and on_update is not None:
+            on_update(
+                Contract(
+                    address=address,
+                    abi=entry["abi"],
+                    provider=provider,
+                    cairo_version=entry["cairo_version"],
+                )
+            )
+
+
+ABI_CACHE = AbiCache()
+
+
+if __name__ == "__main__":
+    from web_app.contract_tools.blockchain_call import CLIENT
+    from web_app.contract_tools.constants import EKUBO_MAINNET_ADDRESS
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(ABI_CACHE.fetch(EKUBO_MAINNET_ADDRESS, CLIENT.client))
+    logger.info(f"Cached the Ekubo ABI in {ABI_CACHE.cache_dir}")
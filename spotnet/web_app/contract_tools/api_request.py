@@ -2,12 +2,20 @@
 This module handles API requests.
 """
 
+import asyncio
+import logging
+import os
+
 import aiohttp
 
+logger = logging.getLogger(__name__)
+
 
 class APIRequest:
     """
     A class to send asynchronous requests to an API.
+    All instances share a pooled, keep-alive `aiohttp.ClientSession`
+    per event loop, opened with `start_session` and closed with `close_session`.
     """
 
     DEFAULT_HEADER = {
@@ -15,9 +23,58 @@ class APIRequest:
         "Accept": "application/json",  # Ensure we expect a JSON response
     }
 
+    # Connection pool settings
+    CONNECTION_LIMIT = int(os.getenv("API_REQUEST_CONNECTION_LIMIT", "100"))
+    CONNECTION_LIMIT_PER_HOST = int(
+        os.getenv("API_REQUEST_CONNECTION_LIMIT_PER_HOST", "20")
+    )
+    KEEPALIVE_TIMEOUT = float(os.getenv("API_REQUEST_KEEPALIVE_TIMEOUT", "30"))
+    DNS_CACHE_TTL = int(os.getenv("API_REQUEST_DNS_CACHE_TTL", "300"))
+    REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", "10"))
+
+    _sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
     def __init__(self, base_url: str):
         self.base_url = base_url
 
+    @classmethod
+    async def start_session(cls) -> aiohttp.ClientSession:
+        """
+        Get the shared session of the running event loop, creating it if needed.
+        :return: aiohttp.ClientSession
+        """
+        loop = asyncio.get_running_loop()
+        session = cls._sessions.get(loop)
+        if session is not None and not session.closed:
+            return session
+
+        # Forget sessions of event loops which are already gone
+        for stale_loop in [item for item in cls._sessions if item.is_closed()]:
+            del cls._sessions[stale_loop]
+
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=cls.CONNECTION_LIMIT,
+                limit_per_host=cls.CONNECTION_LIMIT_PER_HOST,
+                keepalive_timeout=cls.KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=cls.DNS_CACHE_TTL,
+            ),
+            timeout=aiohttp.ClientTimeout(total=cls.REQUEST_TIMEOUT),
+        )
+        cls._sessions[loop] = session
+        logger.info("Opened shared API request session")
+        return session
+
+    @classmethod
+    async def close_session(cls) -> None:
+        """
+        Close the shared session of the running event loop.
+        """
+        session = cls._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+            logger.info("Closed shared API request session")
+
     async def fetch(self, endpoint: str, params: dict = None, headers: dict = None):
         """
         Send a GET request asynchronously with specific headers and query parameters.
@@ -32,14 +89,12 @@ class APIRequest:
         if headers:
             request_headers.update(headers)
 
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}{endpoint}"
-            async with session.get(
-                url, params=params, headers=request_headers
-            ) as response:
-                if response.ok:
-                    return await response.json()
-                return {}
+        session = await self.start_session()
+        url = f"{self.base_url}{endpoint}"
+        async with session.get(url, params=params, headers=request_headers) as response:
+            if response.ok:
+                return await response.json()
+            return {}
 
     async def post(self, endpoint: str, data: dict = None, headers: dict = None):
         """
@@ -50,11 +105,11 @@ class APIRequest:
         :param headers: Headers to include in the request.
         :return: The response from the API as JSON.
         """
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}{endpoint}"
-            async with session.post(url, json=data, headers=headers) as response:
-                response.raise_for_status()  # Raise an exception for bad status codes
-                return await response.json()
+        session = await self.start_session()
+        url = f"{self.base_url}{endpoint}"
+        async with session.post(url, json=data, headers=headers) as response:
+            response.raise_for_status()  # Raise an exception for bad status codes
+            return await response.json()
 
     async def fetch_text(
         self, endpoint: str, params: dict = None, headers: dict = None
@@ -67,11 +122,11 @@ class APIRequest:
         :param headers: Headers to include in the request.
         :return: The response from the API as text.
         """
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}{endpoint}"
-            async with session.get(url, params=params, headers=headers) as response:
-                response.raise_for_status()  # Raise an exception for bad status codes
-                return await response.text()
+        session = await self.start_session()
+        url = f"{self.base_url}{endpoint}"
+        async with session.get(url, params=params, headers=headers) as response:
+            response.raise_for_status()  # Raise an exception for bad status codes
+            return await response.text()
 
 
 # Example usage:
@@ -87,3 +142,4 @@ async def main():
         "/overview/0x020281104e6cb5884dabcdf3be376cf4ff7b680741a7bb20e5e07c26cd4870af"
     )
     print(response)
+    await APIRequest.close_session()
@@ -5,18 +5,27 @@ This module handles the blockchain calls.
 import asyncio
 import logging
 import os
-import time
 from decimal import Decimal
+from fractions import Fraction
 from math import floor
-from typing import Any, List
+from typing import Any, Awaitable, Callable, List
 
 import starknet_py.cairo.felt
 import starknet_py.hash.selector
 import starknet_py.net.client_models
 import starknet_py.net.networks
+from .cache import BlockScopedCache
 from .constants import MULTIPLIER_POWER, ZKLEND_MARKET_ADDRESS, TokenParams
+from .pool_price_oracle import EkuboPriceOracle
+from .price_math import get_debt_price, sqrt_ratio_to_price
+from .rpc_retry import RetryPolicy, RpcMetrics, call_with_retry
+from .rpc_router import RpcRouter
 from starknet_py.contract import Contract
+from starknet_py.net.client_errors import ClientError
+from starknet_py.net.client_models import EmittedEvent
+from starknet_py.net.client_utils import _to_rpc_felt
 from starknet_py.net.full_node_client import FullNodeClient
+from starknet_py.net.http_client import HttpMethod, RpcHttpClient, ServerError
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +38,130 @@ class RepayDataException(Exception):
     pass
 
 
+class RpcCallBatcher:
+    """
+    Collects `starknet_call` requests issued within a short window and sends them
+    to the node as a single JSON-RPC batch, then fans the results back out to
+    the awaiting callers.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[list[dict]], Awaitable[Any]],
+        window: float,
+        max_batch_size: int = 50,
+    ):
+        """
+        :param send_batch: Coroutine function posting a list of JSON-RPC payloads
+         and returning the decoded response.
+        :param window: Seconds to wait for more calls before sending the batch.
+        :param max_batch_size: Number of calls that triggers an immediate send.
+        """
+        self.send_batch = send_batch
+        self.window = window
+        self.max_batch_size = max_batch_size
+        # Pending calls and their flush timer, per event loop
+        self._pending: dict[asyncio.AbstractEventLoop, tuple[list, Any]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def _build_payload(call: starknet_py.net.client_models.Call) -> dict:
+        """
+        Build the JSON-RPC payload of a `starknet_call` request.
+
+        :param call: The contract call.
+        :return: The payload without an id.
+        """
+        return {
+            "jsonrpc": "2.0",
+            "method": "starknet_call",
+            "params": {
+                "request": {
+                    "contract_address": _to_rpc_felt(call.to_addr),
+                    "entry_point_selector": _to_rpc_felt(call.selector),
+                    "calldata": [_to_rpc_felt(value) for value in call.calldata],
+                },
+                # Same block as FullNodeClient.call_contract uses by default
+                "block_id": "pending",
+            },
+        }
+
+    async def call(self, call: starknet_py.net.client_models.Call) -> list[int]:
+        """
+        Queue a contract call into the current batch and wait for its result.
+
+        :param call: The contract call.
+        :return: The response from the contract call.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        if loop not in self._pending:
+            timer = loop.call_later(self.window, self._flush, loop)
+            self._pending[loop] = ([], timer)
+        entries, _ = self._pending[loop]
+        entries.append((self._build_payload(call), future))
+
+        if len(entries) >= self.max_batch_size:
+            self._flush(loop)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Send the calls collected so far for the given event loop.
+
+        :param loop: The event loop the calls were issued from.
+        """
+        if loop not in self._pending:
+            return
+        entries, timer = self._pending.pop(loop)
+        timer.cancel()
+
+        task = loop.create_task(self._send(entries))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, entries: list[tuple[dict, asyncio.Future]]) -> None:
+        """
+        Send a batch of calls and resolve the futures waiting for them.
+
+        :param entries: List of (payload, future) pairs.
+        """
+        payloads = [
+            {**payload, "id": index} for index, (payload, _) in enumerate(entries)
+        ]
+        try:
+            response = await self.send_batch(payloads)
+            if isinstance(response, dict):
+                # Nodes answer with a single error object when the whole batch is rejected
+                RpcHttpClient.handle_rpc_error(response)
+        except Exception as exc:
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        results = {item.get("id"): item for item in response}
+        for index, (_, future) in enumerate(entries):
+            if future.done():
+                continue
+            item = results.get(index)
+            if item is None:
+                future.set_exception(ServerError(body=response))
+            elif "result" in item:
+                future.set_result([int(value, 16) for value in item["result"]])
+            elif "error" in item:
+                future.set_exception(
+                    ClientError(
+                        code=item["error"]["code"],
+                        message=item["error"]["message"],
+                        data=item["error"].get("data"),
+                    )
+                )
+            else:
+                future.set_exception(ServerError(body=item))
+
+
 class StarknetClient:
     """
     A client to interact with the Starknet blockchain.
@@ -37,17 +170,64 @@ class StarknetClient:
     FEE = 0x20C49BA5E353F80000000000000000
     TICK_SPACING = 1000
     EXTENSION = 0
-    SLEEP_TIME = 10
 
-    def __init__(self):
+    def __init__(
+        self,
+        node_urls: list[str] | None = None,
+        batch_window: float | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ):
         """
-        Initializes the Starknet client with a given node URL.
+        Initializes the Starknet client with the given node URLs.
+
+        :param node_urls: URLs of the nodes to route calls between. Defaults to the
+         comma-separated `STARKNET_NODE_URLS`, then to `STARKNET_NODE_URL`.
+        :param batch_window: Seconds to collect contract calls into one JSON-RPC batch.
+         Defaults to `STARKNET_RPC_BATCH_WINDOW_MS`; batching is disabled when 0.
+        :param retry_policy: Retry policy of the RPC calls.
+         Defaults to the one configured by `STARKNET_RPC_*` environment variables.
         """
-        node_url = os.getenv("STARKNET_NODE_URL") or "http://51.195.57.196:6060/v0_7"
-        if not node_url:
-            raise ValueError("STARKNET_NODE_URL environment variable is not set")
-
-        self.client = FullNodeClient(node_url=node_url)
+        if not node_urls:
+            node_urls = [
+                url.strip()
+                for url in os.getenv("STARKNET_NODE_URLS", "").split(",")
+                if url.strip()
+            ] or [os.getenv("STARKNET_NODE_URL") or "http://51.195.57.196:6060/v0_7"]
+
+        self.router = RpcRouter(
+            node_urls,
+            hedge_percentile=float(os.getenv("STARKNET_RPC_HEDGE_PERCENTILE", "0.95")),
+            eject_after=int(os.getenv("STARKNET_RPC_EJECT_AFTER", "3")),
+            eject_for=float(os.getenv("STARKNET_RPC_EJECT_SECONDS", "30")),
+        )
+        # The first node serves the contract instances bound to a provider
+        self.client: FullNodeClient = self.router.nodes[0].client
+
+        if batch_window is None:
+            batch_window = float(os.getenv("STARKNET_RPC_BATCH_WINDOW_MS", "0")) / 1000
+        self.batcher = (
+            RpcCallBatcher(
+                self._send_batch,
+                window=batch_window,
+                max_batch_size=int(os.getenv("STARKNET_RPC_BATCH_MAX_SIZE", "50")),
+            )
+            if batch_window > 0
+            else None
+        )
+        self.retry_policy = retry_policy or RetryPolicy.from_env()
+        self.metrics = RpcMetrics()
+        # Reserve data changes at most once per block
+        self.reserve_cache = BlockScopedCache(
+            self.get_block_number,
+            ttl=float(os.getenv("STARKNET_RESERVE_CACHE_TTL", "30")),
+            block_poll_interval=float(os.getenv("STARKNET_BLOCK_POLL_INTERVAL", "2")),
+        )
+        # Ekubo pool prices, refreshed per block once started by the API
+        self.pool_price_oracle = EkuboPriceOracle(
+            self,
+            max_age=float(os.getenv("EKUBO_PRICE_MAX_AGE", "12")),
+            poll_interval=float(os.getenv("STARKNET_BLOCK_POLL_INTERVAL", "2")),
+        )
 
     @staticmethod
     def _convert_address(addr: str) -> int:
@@ -59,6 +239,43 @@ class StarknetClient:
         """
         return int(addr, base=16)
 
+    async def get_block_number(self) -> int:
+        """
+        Get the number of the latest block.
+
+        :return: The block number.
+        """
+        return await call_with_retry(
+            lambda: self.router.call(lambda client: client.get_block_number()),
+            self.retry_policy,
+            self.metrics,
+            label="get_block_number",
+        )
+
+    async def _send_batch(self, payloads: list[dict]) -> Any:
+        """
+        Post a list of JSON-RPC payloads to the node in a single HTTP request.
+
+        :param payloads: The JSON-RPC payloads.
+        :return: The decoded response of the node.
+        """
+        return await self.router.call(
+            lambda client: client._client.request(
+                address=client.url, http_method=HttpMethod.POST, payload=payloads
+            )
+        )
+
+    async def _call_contract(self, call: starknet_py.net.client_models.Call) -> Any:
+        """
+        Send a contract call, through the batcher when batching is enabled.
+
+        :param call: The contract call.
+        :return: The response from the contract call.
+        """
+        if self.batcher:
+            return await self.batcher.call(call)
+        return await self.router.call(lambda client: client.call_contract(call))
+
     async def _func_call(self, addr: int, selector: str, calldata: List[int]) -> Any:
         """
         Internal method to make a contract call on the Starknet blockchain.
@@ -74,12 +291,15 @@ class StarknetClient:
             calldata=calldata,
         )
         try:
-            res = await self.client.call_contract(call)
+            return await call_with_retry(
+                lambda: self._call_contract(call),
+                self.retry_policy,
+                self.metrics,
+                label=selector,
+            )
         except Exception as e:  # Catch and log any errors
             logger.error(f"Error making contract call: {e}")
-            time.sleep(self.SLEEP_TIME)
-            res = await self.client.call_contract(call)
-        return res
+            raise
 
     @staticmethod
     def _build_ekubo_pool_key(
@@ -112,19 +332,20 @@ class StarknetClient:
             "extension": extension,
         }
 
-    @staticmethod
     async def _get_pool_price(
-        pool_key, is_token1: bool, ekubo_contract: "Contract"
-    ) -> Decimal:
+        self, pool_key, is_token1: bool, ekubo_contract: "Contract"
+    ) -> Fraction:
         """
-        Calculate Ekubo pool price.
+        Calculate Ekubo pool price from the price oracle snapshot.
 
         :param pool_key: The pool key dictionary.
         :param is_token1: Boolean indicating if the token is token1.
         :param ekubo_contract: The Ekubo contract instance.
-        :return: The calculated pool price.
+        :return: The exact pool price.
         """
-        price_data = await ekubo_contract.functions["get_pool_price"].call(pool_key)
+        price_data = await self.pool_price_oracle.get_price_data(
+            pool_key, ekubo_contract
+        )
         underlying_token_0_address = TokenParams.add_underlying_address(
             str(hex(pool_key["token0"]))
         )
@@ -134,13 +355,8 @@ class StarknetClient:
 
         token_0_decimals = TokenParams.get_token_decimals(underlying_token_0_address)
         token_1_decimals = TokenParams.get_token_decimals(underlying_token_1_address)
-        price = Decimal(((price_data[0]["sqrt_ratio"] / 2**128) ** 2)) * (
-            10 ** abs(token_0_decimals - token_1_decimals)
-        )
-        return (
-            (1 / price) * 10**token_0_decimals
-            if is_token1
-            else price * 10**token_1_decimals
+        return sqrt_ratio_to_price(
+            price_data[0]["sqrt_ratio"], token_0_decimals, token_1_decimals, is_token1
         )
 
     async def _get_zklend_reserve(self, token_address: str) -> list[int]:
@@ -159,6 +375,19 @@ class StarknetClient:
     async def get_available_zklend_reserves(self) -> dict[str, list[int]]:
         """
         Get available ZkLend reserves for all tokens.
+        Served from a cache valid for the current block, concurrent callers
+        share a single fetch.
+
+        :return: A dictionary with token names as keys and reserve data as values.
+        """
+        reserves = await self.reserve_cache.get(
+            "zklend_reserves", self._fetch_zklend_reserves
+        )
+        return dict(reserves)
+
+    async def _fetch_zklend_reserves(self) -> dict[str, list[int]]:
+        """
+        Fetch ZkLend reserves for all tokens from the chain.
 
         :return: A dictionary with token names as keys and reserve data as values.
         """
@@ -181,6 +410,38 @@ class StarknetClient:
         reserves = await self.get_available_zklend_reserves()
         return {token: (reserve[1], reserve[2], reserve[4]) for token, reserve in reserves.items()}
 
+    async def get_zklend_events(
+        self, event_names: list[str], from_block: int, to_block: int
+    ) -> list[EmittedEvent]:
+        """
+        Get the events emitted by the ZkLend market within a block range.
+
+        :param event_names: Names of the events to get, e.g. "Deposit".
+        :param from_block: First block of the range.
+        :param to_block: Last block of the range.
+        :return: The emitted events.
+        """
+        selectors = [
+            starknet_py.hash.selector.get_selector_from_name(name)
+            for name in event_names
+        ]
+        chunk = await call_with_retry(
+            lambda: self.router.call(
+                lambda client: client.get_events(
+                    address=ZKLEND_MARKET_ADDRESS,
+                    keys=[selectors],
+                    from_block_number=from_block,
+                    to_block_number=to_block,
+                    follow_continuation_token=True,
+                    chunk_size=1000,
+                )
+            ),
+            self.retry_policy,
+            self.metrics,
+            label="get_events",
+        )
+        return chunk.events
+
     async def get_zklend_debt(self, user: str, token: str) -> list[int]:
         """
         Get ZkLend debt for a specific user and token.
@@ -302,7 +563,7 @@ class StarknetClient:
         )
 
         try:
-            debt_price = floor(Decimal((1 / supply_price)) * 10**decimals_sum)
+            debt_price = get_debt_price(supply_price, decimals_sum)
         except ZeroDivisionError:
             logger.error(
                 f"Error while getting repay data: {deposit_token=}, {borrowing_token=}"
@@ -361,16 +622,49 @@ class StarknetClient:
         :return: A dictionary containing dictionaries of available tokens in the contract address,
                 and the balance
         """
-        results = {}
+        portfolios = await self.fetch_portfolios([contract_address])
+        return portfolios[contract_address]
+
+    async def fetch_portfolios(
+        self, contract_addresses: list[str], concurrency: int | None = None
+    ) -> dict[str, dict]:
+        """
+        Fetches the portfolios of many contracts at once. The zkLend reserves are
+        looked up once for the whole batch and the balances are read concurrently.
+
+        :param contract_addresses: the contract addresses to fetch the portfolios from.
+        :param concurrency: maximum number of balance reads in flight.
+         Defaults to `STARKNET_PORTFOLIO_CONCURRENCY`.
+        :return: A dictionary with contract addresses as keys and portfolios
+                (as returned by `fetch_portfolio`) as values
+        """
+        if concurrency is None:
+            concurrency = int(os.getenv("STARKNET_PORTFOLIO_CONCURRENCY", "50"))
+        semaphore = asyncio.Semaphore(concurrency)
         z_addresses = await self.get_z_addresses()
 
-        for key, value in z_addresses.items():
-            decimals, z_address = value
-            balance: int = await self.get_balance(z_address, contract_address)
+        async def read_balance(z_address: int, contract_address: str) -> str:
+            async with semaphore:
+                return await self.get_balance(z_address, contract_address)
 
-            key = f"z{key}"
-            results[key] = {"balance": balance, "decimals": decimals}
+        keys = [
+            (contract_address, token)
+            for contract_address in contract_addresses
+            for token in z_addresses
+        ]
+        balances = await asyncio.gather(
+            *[
+                read_balance(z_addresses[token][1], contract_address)
+                for contract_address, token in keys
+            ]
+        )
 
+        results = {contract_address: {} for contract_address in contract_addresses}
+        for (contract_address, token), balance in zip(keys, balances):
+            results[contract_address][f"z{token}"] = {
+                "balance": balance,
+                "decimals": z_addresses[token][0],
+            }
         return results
 
 
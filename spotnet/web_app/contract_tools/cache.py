@@ -0,0 +1,158 @@
+"""
+This module contains caching helpers for on-chain reads.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent loads of the same key: the first caller runs the
+    loader, callers arriving while it is in flight share its result.
+    """
+
+    def __init__(self):
+        self._calls: dict[tuple, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `loader` unless a load of `key` is already in flight.
+
+        :param key: Key identifying the load.
+        :param loader: Coroutine function producing the value.
+        :return: The loaded value.
+        """
+        # Tasks can only be awaited from their own event loop
+        call_key = (asyncio.get_running_loop(), key)
+        task = self._calls.get(call_key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._calls[call_key] = task
+            task.add_done_callback(lambda _: self._calls.pop(call_key, None))
+        # Shield so a cancelled caller does not cancel the load shared with others
+        return await asyncio.shield(task)
+
+
+@dataclass
+class CacheEntry:
+    """
+    Class to hold a cached value with the block and time it was fetched at.
+    """
+
+    value: Any
+    block_number: int | None
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        """
+        Seconds elapsed since the value was fetched.
+        """
+        return time.monotonic() - self.fetched_at
+
+
+class BlockScopedCache:
+    """
+    Cache whose entries stay valid until a new block is produced.
+    When the block number can't be read, entries fall back to a TTL.
+    """
+
+    def __init__(
+        self,
+        get_block_number: Callable[[], Awaitable[int]],
+        ttl: float = 30.0,
+        block_poll_interval: float = 2.0,
+    ):
+        """
+        :param get_block_number: Coroutine function returning the latest block number.
+        :param ttl: Maximum age of an entry in seconds, whatever the block.
+        :param block_poll_interval: Seconds during which a read block number is reused.
+        """
+        self.get_block_number = get_block_number
+        self.ttl = ttl
+        self.block_poll_interval = block_poll_interval
+        self._entries: dict[Hashable, CacheEntry] = {}
+        self._block_number: int | None = None
+        self._block_read_at = float("-inf")
+        self._single_flight = SingleFlight()
+
+    async def current_block_number(self) -> int | None:
+        """
+        Get the latest block number, polling the node at most once per interval.
+
+        :return: The block number or None if it can't be read.
+        """
+        if time.monotonic() - self._block_read_at < self.block_poll_interval:
+            return self._block_number
+        try:
+            self._block_number = await self._single_flight.do(
+                ("block_number",), self.get_block_number
+            )
+        except Exception as e:
+            logger.warning(f"Failed to get block number, falling back to TTL: {e}")
+            self._block_number = None
+        self._block_read_at = time.monotonic()
+        return self._block_number
+
+    def _is_valid(self, entry: CacheEntry | None, block_number: int | None) -> bool:
+        """
+        Check whether a cache entry can be served.
+
+        :param entry: The cache entry.
+        :param block_number: The latest block number, None if unknown.
+        :return: bool
+        """
+        if entry is None or time.monotonic() - entry.fetched_at >= self.ttl:
+            return False
+        return block_number is None or entry.block_number == block_number
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get a value from the cache, loading it once for all concurrent callers
+        when it is missing or outdated.
+
+        :param key: Cache key.
+        :param loader: Coroutine function producing the value.
+        :return: The cached value.
+        """
+        return (await self.get_entry(key, loader)).value
+
+    async def get_entry(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> CacheEntry:
+        """
+        Same as `get`, returning the cache entry so callers can tell how stale
+        the value is.
+
+        :param key: Cache key.
+        :param loader: Coroutine function producing the value.
+        :return: CacheEntry
+        """
+        block_number = await self.current_block_number()
+        entry = self._entries.get(key)
+        if self._is_valid(entry, block_number):
+            return entry
+
+        async def load() -> CacheEntry:
+            loaded = CacheEntry(await loader(), block_number, time.monotonic())
+            self._entries[key] = loaded
+            return loaded
+
+        return await self._single_flight.do((key, block_number), load)
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """
+        Drop one entry, or all of them when no key is given.
+
+        :param key: Cache key.
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
@@ -2,13 +2,16 @@
 This module contains the alert mixin class.
 """
 
-import asyncio
 import logging
-from web_app.telegram.notifications import send_health_ratio_notification
+from collections import defaultdict
+
+from web_app.telegram.notifications import (
+    ALERT_DISPATCHER,
+    send_health_ratio_notification,
+)
 from web_app.contract_tools.mixins import HealthRatioMixin
 from web_app.db.crud import UserDBConnector
 
-
 logger = logging.getLogger(__name__)
 ALERT_THRESHOLD = 3.2  # FIXME return to 1.1 after testing
 
@@ -19,36 +22,85 @@ class AlertMixin:
     """
 
     @classmethod
-    def check_users_health_ratio_level(cls) -> None:
+    async def check_users_health_ratio_level(
+        cls, users_data: list[tuple[str, str]] = None
+    ) -> dict:
         """
         Check the health ratio level for all users with an OPENED position.
-        If a user's health ratio level is lower than 1.1, raise a `HealthRatioLevelLowException`.
-        """
+        If a user's health ratio level is lower than ALERT_THRESHOLD, notify the user.
+        Notifications are sent by the alert dispatcher while the health ratios
+        of other positions are still being computed. The health ratios are then
+        stored in their history.
 
-        users_data = UserDBConnector().get_users_for_notifications()
+        :param users_data: (contract address, telegram ID) pairs to check, e.g. a shard
+         of the users. Defaults to all the users for notifications.
+        :return: Counts of the positions checked, failed and alerted, of the
+         notifications dispatched and of the health ratio samples stored.
+        """
+        if users_data is None:
+            users_data = UserDBConnector().get_users_for_notifications()
         user_number = len([user for user, _ in users_data])
         logger.info(f"Found number of users for notifications: {user_number}")
+
+        telegram_ids = defaultdict(list)
         for contract_address, telegram_id in users_data:
-            health_ratio_level, _ = asyncio.run(
-                HealthRatioMixin.get_health_ratio_and_tvl(contract_address)
-            )
+            telegram_ids[contract_address].append(telegram_id)
+
+        inputs = {}
+        prices = {}
+        failed = 0
+        alerts = 0
+        async for (
+            contract_address,
+            health_ratio,
+        ) in HealthRatioMixin.iter_health_ratios_and_tvl(
+            list(telegram_ids), inputs=inputs, prices=prices
+        ):
+            if isinstance(health_ratio, Exception):
+                failed += 1
+                logger.error(
+                    f"Failed to get health ratio for {contract_address}: "
+                    f"{health_ratio!r}"
+                )
+                continue
 
+            health_ratio_level, _ = health_ratio
             if float(health_ratio_level) < ALERT_THRESHOLD:
                 logger.info(
                     f"Health ratio level for user {contract_address} is {health_ratio_level}"
                 )
-                cls.send_notification(telegram_id, health_ratio_level)
+                for telegram_id in telegram_ids[contract_address]:
+                    cls.send_notification(telegram_id, health_ratio_level)
+                    alerts += 1
+        stats = await cls.flush_notifications()
+        logger.info(f"Health ratio notifications: {stats}")
+        return {
+            "positions": len(telegram_ids),
+            "failed": failed,
+            "alerts": alerts,
+            "notifications": stats,
+            "samples": HealthRatioMixin.record_health_history(inputs, prices),
+        }
 
     @staticmethod
-    def send_notification(telegram_id: int, health_ratio: float):
+    def send_notification(telegram_id: int, health_ratio: float) -> None:
         """
-        Send notification to a user if they have allowed notifications.
+        Queue a notification to a user if they have allowed notifications.
+        Alerts pending for the same user are coalesced, and repeated alerts
+        are suppressed within the cool-down.
 
         Args:
-            telegram_id: ID of the r to notify
+            telegram_id: ID of the user to notify
             health_ratio: Current health ratio of the user's position
         """
-        asyncio.run(send_health_ratio_notification(telegram_id, health_ratio))
-        logger.info(
-            f"Notification sent to user {telegram_id} with health ratio {health_ratio}"
-        )
+        send_health_ratio_notification(telegram_id, health_ratio)
+
+    @staticmethod
+    async def flush_notifications() -> dict:
+        """
+        Wait until the queued notifications are sent.
+
+        Returns:
+            Counts of the notifications sent, suppressed, coalesced and failed
+        """
+        return await ALERT_DISPATCHER.flush()
@@ -10,7 +10,9 @@ from decimal import Decimal
 from web_app.contract_tools.constants import TokenParams, MULTIPLIER_POWER
 from web_app.contract_tools.api_request import APIRequest
 from web_app.contract_tools.blockchain_call import CLIENT
+from web_app.db.crud.base import run_in_db_executor
 from web_app.db.crud.position import PositionDBConnector
+from web_app.db.models import ExtraDeposit
 
 logger = logging.getLogger(__name__)
 position_db_connector = PositionDBConnector()
@@ -105,41 +107,51 @@ class DashboardMixin:
             return Decimal(0)
 
     @classmethod
-    async def get_current_position_sum(cls, position: dict) -> Decimal:
+    async def get_current_position_sum(
+        cls, position: dict, extra_deposits: list[ExtraDeposit] = None
+    ) -> Decimal:
         """
         Calculate the total position value including extra deposits.
 
         :param position: Position object containing base amount and token information
+        :param extra_deposits: Extra deposits of the position, as loaded by
+         `get_dashboard_snapshot`. When given, the position isn't read again.
         :return: Decimal representing total position value including extra deposits
         """
-        main_position = position_db_connector.get_position_by_id(position["id"])
-        if not main_position:
-            return Decimal(0)
+        if extra_deposits is None:
+            main_position = await run_in_db_executor(
+                position_db_connector.get_position_by_id, position["id"]
+            )
+            if not main_position:
+                return Decimal(0)
+            extra_deposits = await run_in_db_executor(
+                position_db_connector.get_extra_deposits_by_position_id, position["id"]
+            )
+            position = {
+                "token_symbol": main_position.token_symbol,
+                "amount": main_position.amount,
+                "multiplier": main_position.multiplier,
+            }
+        token_symbol = position["token_symbol"]
 
         current_prices = await cls.get_current_prices()
-        base_price = current_prices.get(main_position.token_symbol)
+        base_price = current_prices.get(token_symbol)
         total_sum = Decimal(0)
         if base_price:
             total_sum += cls._calculate_sum(
                 base_price,
-                Decimal(main_position.amount),
-                Decimal(main_position.multiplier),
+                Decimal(position["amount"]),
+                Decimal(position["multiplier"]),
             )
 
-        extra_deposits = position_db_connector.get_extra_deposits_by_position_id(
-            position["id"]
-        )
-
         for extra_deposit in extra_deposits:
             if extra_deposit.token_symbol in current_prices:
                 deposit_amount = Decimal(extra_deposit.amount)
-                if extra_deposit.token_symbol != main_position.token_symbol:
+                if extra_deposit.token_symbol != token_symbol:
                     deposit_amount *= Decimal(
                         current_prices[extra_deposit.token_symbol]
                     )
-                    deposit_amount /= Decimal(
-                        current_prices[main_position.token_symbol]
-                    )
+                    deposit_amount /= Decimal(current_prices[token_symbol])
                 total_sum += deposit_amount
 
         return total_sum
@@ -180,7 +192,8 @@ class DashboardMixin:
         :param position_id: Position ID
         :return (str): Position balance
         """
-        main_position = position_db_connector.get_position_by_id(position_id)
+        main_position = await run_in_db_executor(
+            position_db_connector.get_position_by_id, position_id
+        )
         main_position_balance = main_position and main_position.amount or "0"
         return main_position_balance
-
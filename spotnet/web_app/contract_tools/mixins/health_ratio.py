@@ -3,16 +3,44 @@ HealthRatioMixin is a mixin class to calculate the health ratio of a deposit con
 """
 
 import asyncio
+import logging
+import os
+from dataclasses import dataclass
 from decimal import Decimal
+from typing import AsyncIterator
 
 from pragma_sdk.common.types.types import AggregationMode
 from pragma_sdk.onchain.client import PragmaOnChainClient
+from sqlalchemy.exc import SQLAlchemyError
 from web_app.contract_tools.blockchain_call import CLIENT
+from web_app.contract_tools.cache import BlockScopedCache, CacheEntry
 from web_app.contract_tools.constants import TokenParams, ZKLEND_SCALE_DECIMALS
+from web_app.db.crud import HealthHistoryDBConnector
+
+logger = logging.getLogger(__name__)
+health_history_db_connector = HealthHistoryDBConnector()
 
 PRAGMA = PragmaOnChainClient(
     network="mainnet",
 )
+# Spot prices of the Pragma pairs, valid for the current block. The block number
+# is shared with the reserve cache, which already polls it.
+PRAGMA_PRICE_CACHE = BlockScopedCache(
+    CLIENT.reserve_cache.current_block_number,
+    ttl=float(os.getenv("PRAGMA_PRICE_CACHE_TTL", "10")),
+    block_poll_interval=0,
+)
+
+
+@dataclass
+class HealthRatioInputs:
+    """
+    Class to hold the on-chain inputs of the health ratio of a deposit contract.
+    """
+
+    deposits: dict[str, Decimal]
+    borrowed_token: str
+    debt_raw: int
 
 
 class HealthRatioMixin:
@@ -28,9 +56,26 @@ class HealthRatioMixin:
         :param token: The token symbol (e.g., "ETH", "USDC").
         :return: The price of the token as a Decimal.
         """
-        decimals = 10**8 if token not in ("USDC", "USDT") else 10**6
-        data = await PRAGMA.get_spot(f"{token}/USD", AggregationMode.MEDIAN)
-        return Decimal(data.price / decimals)
+        return (await cls.get_pragma_price_entry(token)).value
+
+    @classmethod
+    async def get_pragma_price_entry(cls, token: str) -> CacheEntry:
+        """
+        Get the price of a token with the block and time it was read at.
+        Prices are shared by the whole process and read once per block,
+        concurrent callers waiting for the same read.
+
+        :param token: The token symbol (e.g., "ETH", "USDC").
+        :return: CacheEntry holding the price as a Decimal value.
+        """
+        pair = f"{token}/USD"
+
+        async def read_price() -> Decimal:
+            decimals = 10**8 if token not in ("USDC", "USDT") else 10**6
+            data = await PRAGMA.get_spot(pair, AggregationMode.MEDIAN)
+            return Decimal(data.price / decimals)
+
+        return await PRAGMA_PRICE_CACHE.get_entry(pair, read_price)
 
     @classmethod
     async def _get_z_balances(
@@ -66,17 +111,19 @@ class HealthRatioMixin:
 
     @classmethod
     async def _get_deposited_tokens(
-        cls, deposit_contract_address: str
+        cls, deposit_contract_address: str, reserves: dict = None
     ) -> dict[str, Decimal]:
         """
         Get the deposited tokens and their amounts in a deposit contract.
 
         :param deposit_contract_address: The address of the deposit contract.
+        :param reserves: The zkLend reserves as returned by `CLIENT.get_z_addresses`,
+         fetched when not given.
         :return: A dictionary of deposited tokens with token symbols as keys
          and amounts as Decimal values.
         """
-
-        reserves = await CLIENT.get_z_addresses()
+        if reserves is None:
+            reserves = await CLIENT.get_z_addresses()
         deposits = await cls._get_z_balances(reserves, deposit_contract_address)
         return {
             token: amount * Decimal(reserves[token][2]) / ZKLEND_SCALE_DECIMALS
@@ -132,32 +179,64 @@ class HealthRatioMixin:
         return non_zero_debt[0]
 
     @classmethod
-    async def get_health_ratio_and_tvl(cls, deposit_contract_address: str) -> tuple:
+    async def _get_health_ratio_inputs(
+        cls, deposit_contract_address: str, reserves: dict = None
+    ) -> HealthRatioInputs:
         """
-        Calculate the health ratio of a deposit contract.
+        Read the debt and deposits of a deposit contract.
 
         :param deposit_contract_address: The address of the deposit contract.
-        :return: The health ratio as a string.
+        :param reserves: The zkLend reserves as returned by `CLIENT.get_z_addresses`,
+         fetched when not given.
+        :return: HealthRatioInputs
         """
-        borrowed_token_address, debt_raw = await cls._get_borrowed_token(
-            deposit_contract_address
+        (borrowed_token_address, debt_raw), deposits = await asyncio.gather(
+            cls._get_borrowed_token(deposit_contract_address),
+            cls._get_deposited_tokens(deposit_contract_address, reserves),
+        )
+        return HealthRatioInputs(
+            deposits=deposits,
+            borrowed_token=TokenParams.get_token_symbol(borrowed_token_address),
+            debt_raw=debt_raw,
         )
-        borrowed_token = TokenParams.get_token_symbol(borrowed_token_address)
-        deposits = await cls._get_deposited_tokens(deposit_contract_address)
-        prices = await cls._get_pragma_prices(set(deposits.keys()) | {borrowed_token})
 
+    @classmethod
+    def _get_collateral_and_debt(
+        cls, inputs: HealthRatioInputs, prices: dict[str, Decimal]
+    ) -> tuple[Decimal, Decimal]:
+        """
+        Calculate the USD values of the deposits and debt of a deposit contract.
+
+        :param inputs: The debt and deposits of the deposit contract.
+        :param prices: Token prices with token symbols as keys.
+        :return: The deposit and debt values.
+        """
         deposit_usdc = sum(
             amount * Decimal(prices[token])
-            for token, amount in deposits.items()
+            for token, amount in inputs.deposits.items()
             if amount != 0
         )
-
-        borrowed_address = TokenParams.get_token_address(borrowed_token)
+        borrowed_address = TokenParams.get_token_address(inputs.borrowed_token)
         debt_usdc = (
-            debt_raw
-            * prices[borrowed_token]
+            inputs.debt_raw
+            * prices[inputs.borrowed_token]
             / 10 ** int(TokenParams.get_token_decimals(borrowed_address))
         )
+        return deposit_usdc, debt_usdc
+
+    @classmethod
+    def _compute_health_ratio_and_tvl(
+        cls, inputs: HealthRatioInputs, prices: dict[str, Decimal]
+    ) -> tuple:
+        """
+        Calculate the health ratio and LTV of a deposit contract from its inputs.
+
+        :param inputs: The debt and deposits of the deposit contract.
+        :param prices: Token prices with token symbols as keys.
+        :return: The health ratio as a string and the LTV as a Decimal.
+        """
+        borrowed_token = inputs.borrowed_token
+        deposit_usdc, debt_usdc = cls._get_collateral_and_debt(inputs, prices)
         health_factor = (
             f"{round(deposit_usdc / Decimal(debt_usdc), 2)}" if debt_usdc != 0 else "0"
         )
@@ -166,6 +245,159 @@ class HealthRatioMixin:
         )
         return health_factor, ltv
 
+    @classmethod
+    def get_health_sample(
+        cls, inputs: HealthRatioInputs, prices: dict[str, Decimal]
+    ) -> dict:
+        """
+        Get the health ratio, LTV and USD values of a deposit contract,
+        as stored in its health ratio history.
+
+        :param inputs: The debt and deposits of the deposit contract.
+        :param prices: Token prices with token symbols as keys.
+        :return: dict with health_ratio, ltv, collateral_usd and debt_usd floats.
+        """
+        health_ratio, ltv = cls._compute_health_ratio_and_tvl(inputs, prices)
+        collateral_usd, debt_usd = cls._get_collateral_and_debt(inputs, prices)
+        return {
+            "health_ratio": float(health_ratio),
+            "ltv": float(ltv),
+            "collateral_usd": float(collateral_usd),
+            "debt_usd": float(debt_usd),
+        }
+
+    @classmethod
+    def record_health_history(
+        cls, inputs: dict[str, HealthRatioInputs], prices: dict[str, Decimal]
+    ) -> int:
+        """
+        Store the health ratio samples of deposit contracts in their history.
+        Contracts whose health ratio can't be computed are left out, and a failed
+        write is only logged so it never blocks the alerts.
+
+        :param inputs: The inputs of the deposit contracts, by contract address.
+        :param prices: Token prices with token symbols as keys.
+        :return: The number of samples stored.
+        """
+        samples = {}
+        for deposit_contract_address, contract_inputs in inputs.items():
+            try:
+                samples[deposit_contract_address] = cls.get_health_sample(
+                    contract_inputs, prices
+                )
+            except (ArithmeticError, LookupError):
+                continue
+        try:
+            health_history_db_connector.write_samples(samples)
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to store the health ratio history: {e}")
+            return 0
+        return len(samples)
+
+    @classmethod
+    async def get_health_ratio_and_tvl(cls, deposit_contract_address: str) -> tuple:
+        """
+        Calculate the health ratio of a deposit contract.
+
+        :param deposit_contract_address: The address of the deposit contract.
+        :return: The health ratio as a string.
+        """
+        inputs = await cls._get_health_ratio_inputs(deposit_contract_address)
+        prices = await cls._get_pragma_prices(
+            set(inputs.deposits.keys()) | {inputs.borrowed_token}
+        )
+        return cls._compute_health_ratio_and_tvl(inputs, prices)
+
+    @classmethod
+    async def iter_health_ratios_and_tvl(
+        cls,
+        deposit_contract_addresses: list[str],
+        concurrency: int = None,
+        timeout: float = None,
+        inputs: dict[str, HealthRatioInputs] = None,
+        prices: dict[str, Decimal] = None,
+    ) -> AsyncIterator[tuple[str, tuple | Exception]]:
+        """
+        Calculate the health ratios of many deposit contracts, yielding each one
+        as soon as it is computed. Reserves and prices are fetched once for the
+        whole batch, the debt and deposits of the contracts are read concurrently.
+
+        :param deposit_contract_addresses: The addresses of the deposit contracts.
+        :param concurrency: Maximum number of contracts read at once.
+         Defaults to `HEALTH_RATIO_CONCURRENCY`.
+        :param timeout: Seconds allowed to read a contract before giving up on it.
+         Defaults to `HEALTH_RATIO_TIMEOUT`.
+        :param inputs: When given, filled with the inputs read for each contract.
+        :param prices: When given, filled with the prices used for the batch.
+        :return: (contract address, result) pairs in completion order, the result
+         being the value of `get_health_ratio_and_tvl` or the exception raised
+         for that contract.
+        """
+        if concurrency is None:
+            concurrency = int(os.getenv("HEALTH_RATIO_CONCURRENCY", "50"))
+        if timeout is None:
+            timeout = float(os.getenv("HEALTH_RATIO_TIMEOUT", "20"))
+        semaphore = asyncio.Semaphore(concurrency)
+        reserves, token_prices = await asyncio.gather(
+            CLIENT.get_z_addresses(),
+            cls._get_pragma_prices({token.name for token in TokenParams.tokens()}),
+        )
+        if prices is not None:
+            prices.update(token_prices)
+
+        async def compute(deposit_contract_address: str) -> tuple:
+            async with semaphore:
+                try:
+                    contract_inputs = await asyncio.wait_for(
+                        cls._get_health_ratio_inputs(
+                            deposit_contract_address, reserves
+                        ),
+                        timeout,
+                    )
+                    if inputs is not None:
+                        inputs[deposit_contract_address] = contract_inputs
+                    result = cls._compute_health_ratio_and_tvl(
+                        contract_inputs, token_prices
+                    )
+                except Exception as e:
+                    result = e
+            return deposit_contract_address, result
+
+        tasks = [
+            asyncio.ensure_future(compute(address))
+            for address in deposit_contract_addresses
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @classmethod
+    async def get_health_ratios_and_tvl(
+        cls,
+        deposit_contract_addresses: list[str],
+        concurrency: int = None,
+        timeout: float = None,
+    ) -> dict[str, tuple | Exception]:
+        """
+        Calculate the health ratios of many deposit contracts at once.
+
+        :param deposit_contract_addresses: The addresses of the deposit contracts.
+        :param concurrency: Maximum number of contracts read at once.
+        :param timeout: Seconds allowed to read a contract before giving up on it.
+        :return: A dictionary with contract addresses as keys and, as values,
+         the result of `get_health_ratio_and_tvl` or the exception raised for
+         that contract.
+        """
+        return {
+            address: result
+            async for address, result in cls.iter_health_ratios_and_tvl(
+                deposit_contract_addresses, concurrency, timeout
+            )
+        }
+
 
 if __name__ == "__main__":
     print(
@@ -0,0 +1,202 @@
+"""
+This module keeps the prices of the supported Ekubo pools in memory,
+refreshing them once per block in the background.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .cache import SingleFlight
+from .constants import TokenParams
+from .rpc_retry import call_with_retry
+
+if TYPE_CHECKING:
+    from starknet_py.contract import Contract
+
+    from .blockchain_call import StarknetClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolPriceSnapshot:
+    """
+    Class to hold the raw `get_pool_price` result of a pool with the block
+    and time it was read at.
+    """
+
+    price_data: Any
+    block_number: int | None
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        """
+        Seconds elapsed since the price was read.
+        """
+        return time.monotonic() - self.fetched_at
+
+
+class EkuboPriceOracle:
+    """
+    Serves Ekubo pool prices from an in-memory snapshot refreshed on every new
+    block. A price older than the freshness bound is read live instead,
+    once for all concurrent callers.
+    """
+
+    def __init__(
+        self,
+        client: "StarknetClient",
+        max_age: float = 12.0,
+        poll_interval: float = 2.0,
+    ):
+        """
+        :param client: The Starknet client used to read the block number and prices.
+        :param max_age: Maximum age in seconds of a snapshot served to callers.
+        :param poll_interval: Seconds between two checks for a new block.
+        """
+        self.client = client
+        self.max_age = max_age
+        self.poll_interval = poll_interval
+        self.snapshots: dict[tuple, PoolPriceSnapshot] = {}
+        self.ekubo_contract: "Contract | None" = None
+        self._block_number: int | None = None
+        self._single_flight = SingleFlight()
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    def _snapshot_key(pool_key: dict) -> tuple:
+        """
+        Build the snapshot key of a pool.
+
+        :param pool_key: The pool key dictionary.
+        :return: tuple
+        """
+        return (
+            pool_key["token0"],
+            pool_key["token1"],
+            pool_key["fee"],
+            pool_key["tick_spacing"],
+            pool_key["extension"],
+        )
+
+    def supported_pool_keys(self) -> list[dict]:
+        """
+        Get the pool keys used to open and close positions: every token is
+        borrowed against USDC, except USDC which is borrowed against ETH.
+
+        :return: list of pool key dictionaries
+        """
+        pool_keys = {}
+        for token in TokenParams.tokens():
+            borrowing_token = (
+                TokenParams.ETH if token == TokenParams.USDC else TokenParams.USDC
+            )
+            pool_key = self.client._build_ekubo_pool_key(
+                token.address, borrowing_token.address
+            )
+            pool_keys[self._snapshot_key(pool_key)] = pool_key
+        return list(pool_keys.values())
+
+    async def _read_price_data(
+        self, pool_key: dict, ekubo_contract: "Contract"
+    ) -> PoolPriceSnapshot:
+        """
+        Read the price of a pool from the chain and store it in the snapshot.
+
+        :param pool_key: The pool key dictionary.
+        :param ekubo_contract: The Ekubo contract instance.
+        :return: PoolPriceSnapshot
+        """
+        block_number = self._block_number
+        price_data = await call_with_retry(
+            lambda: ekubo_contract.functions["get_pool_price"].call(pool_key),
+            self.client.retry_policy,
+            self.client.metrics,
+            label="get_pool_price",
+        )
+        snapshot = PoolPriceSnapshot(price_data, block_number, time.monotonic())
+        self.snapshots[self._snapshot_key(pool_key)] = snapshot
+        return snapshot
+
+    async def get_price_data(self, pool_key: dict, ekubo_contract: "Contract") -> Any:
+        """
+        Get the `get_pool_price` result of a pool, from the snapshot when it is
+        fresh enough, otherwise from the chain.
+
+        :param pool_key: The pool key dictionary.
+        :param ekubo_contract: The Ekubo contract instance.
+        :return: The raw `get_pool_price` result.
+        """
+        key = self._snapshot_key(pool_key)
+        snapshot = self.snapshots.get(key)
+        if snapshot is not None and snapshot.age < self.max_age:
+            return snapshot.price_data
+
+        snapshot = await self._single_flight.do(
+            key, lambda: self._read_price_data(pool_key, ekubo_contract)
+        )
+        return snapshot.price_data
+
+    async def refresh(self) -> None:
+        """
+        Read the prices of all supported pools, sharing the reads already in flight.
+        """
+        pool_keys = self.supported_pool_keys()
+        results = await asyncio.gather(
+            *[
+                self._single_flight.do(
+                    self._snapshot_key(pool_key),
+                    lambda pool_key=pool_key: self._read_price_data(
+                        pool_key, self.ekubo_contract
+                    ),
+                )
+                for pool_key in pool_keys
+            ],
+            return_exceptions=True,
+        )
+        for pool_key, result in zip(pool_keys, results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    f"Failed to refresh Ekubo pool price {pool_key}: {result}"
+                )
+
+    async def run(self) -> None:
+        """
+        Refresh the prices every time a new block is produced, until cancelled.
+        """
+        while True:
+            try:
+                block_number = await self.client.get_block_number()
+                if block_number != self._block_number:
+                    self._block_number = block_number
+                    await self.refresh()
+            except Exception as e:
+                logger.warning(f"Failed to refresh Ekubo pool prices: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self, ekubo_contract: "Contract") -> None:
+        """
+        Start refreshing the prices in the background of the running event loop.
+
+        :param ekubo_contract: The Ekubo contract instance.
+        """
+        self.ekubo_contract = ekubo_contract
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Stop the background refresh.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
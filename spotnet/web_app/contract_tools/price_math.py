@@ -0,0 +1,146 @@
+"""
+This module converts Ekubo Q128.128 sqrt ratios into token prices with exact
+integer arithmetic, so the prices sent in repay and loop calldata don't depend
+on float rounding.
+
+Usage:
+    # Compare the exact conversion with the former float conversion
+    python -m web_app.contract_tools.price_math --pools 10000
+"""
+
+import argparse
+import json
+import random
+import timeit
+from decimal import Decimal
+from fractions import Fraction
+from functools import lru_cache
+from math import floor
+from typing import Iterable
+
+# sqrt_ratio is a Q128.128 fixed-point number, so the price ratio is sqrt_ratio**2 / Q256
+Q256 = 1 << 256
+
+
+@lru_cache(maxsize=None)
+def _pow10(exponent: int) -> int:
+    """
+    Get a power of ten, cached as decimals only take a few values.
+
+    :param exponent: The exponent.
+    :return: int
+    """
+    return 10**exponent
+
+
+def sqrt_ratio_to_price(
+    sqrt_ratio: int, token0_decimals: int, token1_decimals: int, is_token1: bool
+) -> Fraction:
+    """
+    Convert an Ekubo sqrt ratio to the exact price of a token of the pool.
+
+    :param sqrt_ratio: The pool sqrt ratio, as returned by `get_pool_price`.
+    :param token0_decimals: Decimals of the pool token0.
+    :param token1_decimals: Decimals of the pool token1.
+    :param is_token1: Whether the price of token1 is requested.
+    :return: The exact price as a fraction.
+    """
+    token0_decimals, token1_decimals = int(token0_decimals), int(token1_decimals)
+    # Same scaling as the price sent on-chain: the ratio times 10**|decimals difference|
+    scale = _pow10(abs(token0_decimals - token1_decimals))
+    squared = int(sqrt_ratio) ** 2
+    if is_token1:
+        return Fraction(Q256 * _pow10(token0_decimals), squared * scale)
+    return Fraction(squared * scale * _pow10(token1_decimals), Q256)
+
+
+def sqrt_ratios_to_prices(pools: Iterable[tuple[int, int, int, bool]]) -> list[int]:
+    """
+    Convert the sqrt ratios of many pools to their floored prices at once.
+    Only integer floor divisions are done, without building fractions.
+
+    :param pools: (sqrt_ratio, token0_decimals, token1_decimals, is_token1) tuples.
+    :return: The floored prices, in the order of the pools.
+    """
+    prices = []
+    for sqrt_ratio, token0_decimals, token1_decimals, is_token1 in pools:
+        token0_decimals, token1_decimals = int(token0_decimals), int(token1_decimals)
+        scale = _pow10(abs(token0_decimals - token1_decimals))
+        squared = int(sqrt_ratio) ** 2
+        if is_token1:
+            prices.append(Q256 * _pow10(token0_decimals) // (squared * scale))
+        else:
+            prices.append(squared * scale * _pow10(token1_decimals) // Q256)
+    return prices
+
+
+def get_debt_price(supply_price: int, decimals_sum: int) -> int:
+    """
+    Get the price of the debt token from the floored price of the supply token.
+
+    :param supply_price: The floored supply token price.
+    :param decimals_sum: Sum of the decimals of both tokens.
+    :return: The floored debt token price.
+    :raises ZeroDivisionError: When the supply price is 0.
+    """
+    return _pow10(int(decimals_sum)) // supply_price
+
+
+def _float_price(
+    sqrt_ratio: int, token0_decimals: int, token1_decimals: int, is_token1: bool
+) -> Decimal:
+    """
+    The float conversion formerly used by `StarknetClient`, kept for benchmarks.
+    """
+    price = Decimal(((sqrt_ratio / 2**128) ** 2)) * (
+        10 ** abs(token0_decimals - token1_decimals)
+    )
+    return (
+        (1 / price) * 10**token0_decimals if is_token1 else price * 10**token1_decimals
+    )
+
+
+def benchmark(pools_count: int, repeat: int = 5) -> dict:
+    """
+    Time the float and exact conversions of random pools and count the prices
+    on which they disagree.
+
+    :param pools_count: Number of pools converted per run.
+    :param repeat: Number of timed runs, the best one is reported.
+    :return: Timings in milliseconds and the number of mismatching prices.
+    """
+    rng = random.Random(0)
+    decimals = [(18, 6), (6, 18), (18, 18)]
+    pools = []
+    for _ in range(pools_count):
+        token0_decimals, token1_decimals = rng.choice(decimals)
+        # sqrt ratios of real pools lie around 2**128 scaled by the decimals difference
+        sqrt_ratio = rng.randrange(1 << 100, 1 << 160)
+        pools.append((sqrt_ratio, token0_decimals, token1_decimals, rng.random() < 0.5))
+
+    def run_float() -> list[int]:
+        return [floor(_float_price(*pool)) for pool in pools]
+
+    def run_exact() -> list[int]:
+        return [floor(sqrt_ratio_to_price(*pool)) for pool in pools]
+
+    def run_batch() -> list[int]:
+        return sqrt_ratios_to_prices(pools)
+
+    timings = {
+        name: round(min(timeit.repeat(func, number=1, repeat=repeat)) * 1000, 2)
+        for name, func in (
+            ("float_ms", run_float),
+            ("exact_ms", run_exact),
+            ("exact_batch_ms", run_batch),
+        )
+    }
+    mismatches = sum(legacy != exact for legacy, exact in zip(run_float(), run_batch()))
+    return {"pools": pools_count, **timings, "float_mismatches": mismatches}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pools", type=int, default=10000)
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.pools), indent=2))
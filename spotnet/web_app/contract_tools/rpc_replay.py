@@ -0,0 +1,364 @@
+"""
+This module records Starknet JSON-RPC traffic into a fixture file and replays it,
+either in-process (as the transport of a `FullNodeClient`) or as a local node
+stand-in server, so the read path can be benchmarked without a live node.
+
+Usage:
+    # Record the reads of a health ratio computation against the live nodes
+    python -m web_app.contract_tools.rpc_replay record --fixture rpc.json --contract 0x...
+    # Record everything sent through a proxy to an upstream node
+    python -m web_app.contract_tools.rpc_replay proxy --fixture rpc.json --upstream URL
+    # Serve the recorded responses as a node on http://127.0.0.1:6061
+    python -m web_app.contract_tools.rpc_replay serve --fixture rpc.json --latency-ms 20
+    # Benchmark the health ratio read path against the recorded responses
+    python -m web_app.contract_tools.rpc_replay bench --fixture rpc.json --contract 0x...
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import time
+from typing import Any
+
+from aiohttp import ClientSession, web
+from starknet_py.net.full_node_client import FullNodeClient
+from starknet_py.net.http_client import HttpMethod, RpcHttpClient
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC error code returned for requests missing from the fixture
+NOT_RECORDED_ERROR = -32001
+
+
+class RpcFixture:
+    """
+    Recorded JSON-RPC responses keyed by request method and params.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Path of the fixture JSON file, loaded if it exists.
+        """
+        self.path = path
+        self.responses: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.responses = json.load(file)
+
+    @staticmethod
+    def _key(payload: dict) -> str:
+        """
+        Build the lookup key of a JSON-RPC request, ignoring its id.
+        :param payload: JSON-RPC request payload
+        :return: str
+        """
+        return json.dumps(
+            {"method": payload["method"], "params": payload.get("params")},
+            sort_keys=True,
+        )
+
+    def record(self, payload: dict, response: dict) -> None:
+        """
+        Store the response of a request.
+        :param payload: JSON-RPC request payload
+        :param response: JSON-RPC response
+        """
+        self.responses[self._key(payload)] = {
+            key: value for key, value in response.items() if key != "id"
+        }
+
+    def lookup(self, payload: dict) -> dict:
+        """
+        Get the recorded response of a request.
+        :param payload: JSON-RPC request payload
+        :return: JSON-RPC response carrying the request id
+        """
+        response = self.responses.get(self._key(payload))
+        if response is None:
+            response = {
+                "jsonrpc": "2.0",
+                "error": {
+                    "code": NOT_RECORDED_ERROR,
+                    "message": f"No recorded response for {payload['method']}",
+                },
+            }
+        return {**response, "id": payload.get("id")}
+
+    def answer(self, payload: dict | list[dict]) -> dict | list[dict]:
+        """
+        Answer a single or batch JSON-RPC request from the recorded responses.
+        :param payload: JSON-RPC request payload or list of payloads
+        :return: JSON-RPC response or list of responses
+        """
+        if isinstance(payload, list):
+            return [self.lookup(item) for item in payload]
+        return self.lookup(payload)
+
+    def record_exchange(
+        self, payload: dict | list[dict], response: dict | list[dict]
+    ) -> None:
+        """
+        Store the responses of a single or batch JSON-RPC exchange.
+        :param payload: JSON-RPC request payload or list of payloads
+        :param response: JSON-RPC response or list of responses
+        """
+        if isinstance(payload, dict):
+            payload, response = [payload], [response]
+        if not isinstance(response, list):
+            # A batch rejected as a whole can't be matched to its requests
+            return
+        responses = {item.get("id"): item for item in response}
+        for item in payload:
+            if item.get("id") in responses:
+                self.record(item, responses[item.get("id")])
+
+    def save(self) -> None:
+        """
+        Write the fixture file.
+        """
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(self.responses, file, indent=2, sort_keys=True)
+        logger.info(f"Saved {len(self.responses)} RPC responses to {self.path}")
+
+
+class ReplayRpcHttpClient(RpcHttpClient):
+    """
+    RPC transport answering from a fixture after an injected latency.
+    """
+
+    def __init__(self, url: str, fixture: RpcFixture, latency: float = 0.0):
+        super().__init__(url=url)
+        self.fixture = fixture
+        self.latency = latency
+
+    async def request(
+        self,
+        address: str,
+        http_method: HttpMethod,
+        params: dict | None = None,
+        payload: dict | list[dict] | None = None,
+    ) -> Any:
+        """
+        Answer the request from the fixture instead of the network.
+        """
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.fixture.answer(payload)
+
+
+class RecordingRpcHttpClient(RpcHttpClient):
+    """
+    RPC transport forwarding requests to the node and recording the responses.
+    """
+
+    def __init__(self, url: str, fixture: RpcFixture):
+        super().__init__(url=url)
+        self.fixture = fixture
+
+    async def request(
+        self,
+        address: str,
+        http_method: HttpMethod,
+        params: dict | None = None,
+        payload: dict | list[dict] | None = None,
+    ) -> Any:
+        """
+        Forward the request and record its response.
+        """
+        response = await super().request(
+            address=address, http_method=http_method, params=params, payload=payload
+        )
+        self.fixture.record_exchange(payload, response)
+        return response
+
+
+def use_replay_transport(
+    client: FullNodeClient, fixture: RpcFixture, latency: float = 0.0
+) -> None:
+    """
+    Make a `FullNodeClient` answer from a fixture instead of its node.
+
+    :param client: The client to patch.
+    :param fixture: The recorded responses.
+    :param latency: Latency in seconds injected in every request.
+    """
+    client._client = ReplayRpcHttpClient(client.url, fixture, latency)
+
+
+def use_recording_transport(client: FullNodeClient, fixture: RpcFixture) -> None:
+    """
+    Make a `FullNodeClient` record the responses of its node into a fixture.
+
+    :param client: The client to patch.
+    :param fixture: The fixture to record into.
+    """
+    client._client = RecordingRpcHttpClient(client.url, fixture)
+
+
+def create_app(
+    fixture: RpcFixture, upstream: str | None = None, latency: float = 0.0
+) -> web.Application:
+    """
+    Create a JSON-RPC server replaying a fixture or, with an upstream node,
+    a proxy recording into it.
+
+    :param fixture: The fixture to replay or record into.
+    :param upstream: URL of the node to proxy to, None to replay.
+    :param latency: Latency in seconds injected in every replayed request.
+    :return: web.Application
+    """
+
+    async def handle(request: web.Request) -> web.Response:
+        payload = await request.json()
+        if upstream is None:
+            if latency:
+                await asyncio.sleep(latency)
+            return web.json_response(fixture.answer(payload))
+
+        async with request.app["session"].post(upstream, json=payload) as response:
+            body = await response.json(content_type=None)
+        fixture.record_exchange(payload, body)
+        return web.json_response(body, status=response.status)
+
+    async def session_context(app: web.Application):
+        async with ClientSession() as session:
+            app["session"] = session
+            yield
+        if upstream is not None:
+            fixture.save()
+
+    app = web.Application()
+    app.router.add_post("/{tail:.*}", handle)
+    app.cleanup_ctx.append(session_context)
+    return app
+
+
+async def record_health_ratio(fixture: RpcFixture, contract_addresses: list[str]):
+    """
+    Compute the health ratio of contracts against the live nodes,
+    recording every RPC response.
+
+    :param fixture: The fixture to record into.
+    :param contract_addresses: Deposit contract addresses.
+    """
+    from web_app.contract_tools.blockchain_call import CLIENT
+    from web_app.contract_tools.mixins.health_ratio import PRAGMA, HealthRatioMixin
+
+    for node in CLIENT.router.nodes:
+        use_recording_transport(node.client, fixture)
+    use_recording_transport(PRAGMA.full_node_client, fixture)
+
+    for contract_address in contract_addresses:
+        health_ratio = await HealthRatioMixin.get_health_ratio_and_tvl(contract_address)
+        logger.info(f"Recorded {contract_address}: {health_ratio}")
+    fixture.save()
+
+
+async def bench_health_ratio(
+    fixture: RpcFixture,
+    contract_addresses: list[str],
+    iterations: int,
+    concurrency: int,
+    latency: float,
+) -> dict:
+    """
+    Benchmark health ratio computations against recorded responses.
+
+    :param fixture: The recorded responses.
+    :param contract_addresses: Deposit contract addresses.
+    :param iterations: Number of computations per contract.
+    :param concurrency: Number of computations running at once.
+    :param latency: Latency in seconds injected in every RPC request.
+    :return: Throughput and latency percentiles.
+    """
+    from web_app.contract_tools.blockchain_call import CLIENT
+    from web_app.contract_tools.mixins.health_ratio import PRAGMA, HealthRatioMixin
+
+    for node in CLIENT.router.nodes:
+        use_replay_transport(node.client, fixture, latency)
+    use_replay_transport(PRAGMA.full_node_client, fixture, latency)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def run(contract_address: str) -> None:
+        async with semaphore:
+            started_at = time.perf_counter()
+            await HealthRatioMixin.get_health_ratio_and_tvl(contract_address)
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(
+        *[run(address) for address in contract_addresses for _ in range(iterations)]
+    )
+    duration = time.perf_counter() - started_at
+
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+    return {
+        "computations": len(latencies),
+        "duration_s": round(duration, 4),
+        "throughput_per_s": round(len(latencies) / duration, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentiles[94] * 1000, 2) if percentiles else None,
+        "p99_ms": round(percentiles[98] * 1000, 2) if percentiles else None,
+    }
+
+
+def main() -> None:
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Record health ratio reads in-process")
+    record.add_argument("--contract", action="append", required=True)
+
+    proxy = commands.add_parser("proxy", help="Record through a JSON-RPC proxy")
+    proxy.add_argument("--upstream", required=True)
+
+    serve = commands.add_parser("serve", help="Serve recorded responses as a node")
+    serve.add_argument("--latency-ms", type=float, default=0)
+
+    bench = commands.add_parser("bench", help="Benchmark health ratio reads")
+    bench.add_argument("--contract", action="append", required=True)
+    bench.add_argument("--iterations", type=int, default=20)
+    bench.add_argument("--concurrency", type=int, default=10)
+    bench.add_argument("--latency-ms", type=float, default=0)
+
+    for command in (record, proxy, serve, bench):
+        command.add_argument("--fixture", required=True)
+    for command in (proxy, serve):
+        command.add_argument("--host", default="127.0.0.1")
+        command.add_argument("--port", type=int, default=6061)
+
+    args = parser.parse_args()
+    fixture = RpcFixture(args.fixture)
+
+    if args.command == "record":
+        asyncio.run(record_health_ratio(fixture, args.contract))
+    elif args.command == "proxy":
+        app = create_app(fixture, upstream=args.upstream)
+        web.run_app(app, host=args.host, port=args.port)
+    elif args.command == "serve":
+        app = create_app(fixture, latency=args.latency_ms / 1000)
+        web.run_app(app, host=args.host, port=args.port)
+    else:
+        result = asyncio.run(
+            bench_health_ratio(
+                fixture,
+                args.contract,
+                args.iterations,
+                args.concurrency,
+                args.latency_ms / 1000,
+            )
+        )
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
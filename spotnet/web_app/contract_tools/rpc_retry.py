@@ -0,0 +1,212 @@
+"""
+This module contains the retry policy and metrics for Starknet RPC calls.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+import aiohttp
+from starknet_py.net.client_errors import ClientError
+from starknet_py.net.http_client import ServerError
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC error code of a node-side internal error
+RPC_INTERNAL_ERROR = -32603
+# JSON-RPC error code of a provider rate limit
+RPC_LIMIT_EXCEEDED = -32005
+# RPC error codes worth retrying, the Starknet ones (e.g. 52 invalid nonce) are not
+TRANSIENT_RPC_ERRORS = frozenset({RPC_INTERNAL_ERROR, RPC_LIMIT_EXCEEDED})
+
+
+class RetryDeadlineExceeded(Exception):
+    """
+    Exception raised when a call does not succeed before its deadline.
+    """
+
+    def __init__(self, label: str, deadline: float):
+        self.message = f"RPC call {label} did not succeed within {deadline}s"
+        super().__init__(self.message)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Exponential backoff with jitter for transient RPC failures.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    jitter: float = 0.5
+    deadline: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """
+        Build the policy from `STARKNET_RPC_*` environment variables.
+        :return: RetryPolicy
+        """
+        return cls(
+            max_attempts=int(os.getenv("STARKNET_RPC_MAX_ATTEMPTS", cls.max_attempts)),
+            base_delay=float(os.getenv("STARKNET_RPC_BACKOFF_BASE", cls.base_delay)),
+            max_delay=float(os.getenv("STARKNET_RPC_BACKOFF_MAX", cls.max_delay)),
+            jitter=float(os.getenv("STARKNET_RPC_BACKOFF_JITTER", cls.jitter)),
+            deadline=float(os.getenv("STARKNET_RPC_DEADLINE", cls.deadline)),
+        )
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        Get the delay before the next attempt.
+        :param attempt: Number of the attempt that just failed, starting from 1
+        :return: Delay in seconds
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    @staticmethod
+    def is_retryable(exc: BaseException) -> bool:
+        """
+        Classify an error as transient (worth retrying) or permanent.
+        :param exc: The raised exception
+        :return: True if the call should be retried
+        """
+        if isinstance(exc, ClientError):
+            # HTTP errors carry the status as a string, RPC errors an integer code
+            if isinstance(exc.code, str):
+                return exc.code == "429" or exc.code.startswith("5")
+            return exc.code in TRANSIENT_RPC_ERRORS
+        return isinstance(
+            exc,
+            (
+                asyncio.TimeoutError,
+                aiohttp.ClientError,
+                ConnectionError,
+                ServerError,
+            ),
+        )
+
+
+class RpcMetrics:
+    """
+    Per-method retry counters and latency histograms of RPC calls.
+    """
+
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+    def __init__(self):
+        self._stats = defaultdict(self._empty_stats)
+
+    def _empty_stats(self) -> dict:
+        """
+        Initial stats of a method.
+        :return: dict
+        """
+        return {
+            "calls": 0,
+            "retries": 0,
+            "failures": 0,
+            "latency_sum": 0.0,
+            "latency_buckets": [0] * len(self.LATENCY_BUCKETS),
+        }
+
+    def observe(self, label: str, latency: float, attempts: int, success: bool) -> None:
+        """
+        Record a finished call.
+        :param label: Method name of the call
+        :param latency: Total call duration in seconds, retries included
+        :param attempts: Number of attempts made
+        :param success: Whether the call eventually succeeded
+        """
+        stats = self._stats[label]
+        stats["calls"] += 1
+        stats["retries"] += attempts - 1
+        stats["failures"] += not success
+        stats["latency_sum"] += latency
+        for index, bound in enumerate(self.LATENCY_BUCKETS):
+            if latency <= bound:
+                stats["latency_buckets"][index] += 1
+                break
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        Get a copy of the collected metrics, keyed by method name.
+        Histogram buckets are keyed by their upper bound in seconds.
+        :return: dict
+        """
+        return {
+            label: {
+                "calls": stats["calls"],
+                "retries": stats["retries"],
+                "failures": stats["failures"],
+                "latency_sum": stats["latency_sum"],
+                "latency_buckets": dict(
+                    zip(map(str, self.LATENCY_BUCKETS), stats["latency_buckets"])
+                ),
+            }
+            for label, stats in self._stats.items()
+        }
+
+    def total_requests(self) -> int:
+        """
+        Get the number of RPC requests sent, retries included.
+        :return: int
+        """
+        return sum(stats["calls"] + stats["retries"] for stats in self._stats.values())
+
+    def reset(self) -> None:
+        """
+        Drop all collected metrics.
+        """
+        self._stats.clear()
+
+
+async def call_with_retry(
+    func: Callable[[], Awaitable[Any]],
+    policy: RetryPolicy,
+    metrics: RpcMetrics,
+    label: str,
+) -> Any:
+    """
+    Await `func` until it succeeds, the error is permanent, the attempts
+    are exhausted or the deadline is reached. Never blocks the event loop.
+
+    :param func: Coroutine function performing one attempt
+    :param policy: Retry policy to apply
+    :param metrics: Metrics to record the call into
+    :param label: Method name used in logs and metrics
+    :return: The result of `func`
+    """
+    started_at = time.monotonic()
+    attempt = 0
+    while True:
+        attempt += 1
+        remaining = policy.deadline - (time.monotonic() - started_at)
+        try:
+            if remaining <= 0:
+                raise RetryDeadlineExceeded(label, policy.deadline)
+            result = await asyncio.wait_for(func(), timeout=remaining)
+        except Exception as e:
+            delay = policy.get_delay(attempt)
+            elapsed = time.monotonic() - started_at
+            if (
+                attempt >= policy.max_attempts
+                or not policy.is_retryable(e)
+                or elapsed + delay >= policy.deadline
+            ):
+                metrics.observe(label, elapsed, attempt, success=False)
+                raise
+            logger.warning(
+                f"RPC call {label} failed (attempt {attempt}/{policy.max_attempts}), "
+                f"retrying in {delay:.2f}s: {e}"
+            )
+            await asyncio.sleep(delay)
+        else:
+            metrics.observe(label, time.monotonic() - started_at, attempt, success=True)
+            return result
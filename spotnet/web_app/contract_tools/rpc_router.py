@@ -0,0 +1,199 @@
+"""
+This module routes Starknet RPC calls across several nodes.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from starknet_py.net.full_node_client import FullNodeClient
+
+from .rpc_retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class NodeEndpoint:
+    """
+    A Starknet node with its observed latency and health.
+    """
+
+    def __init__(self, url: str, latency_window: int = 100):
+        """
+        :param url: The node URL.
+        :param latency_window: Number of recent latencies kept for scoring.
+        """
+        self.url = url
+        self.client = FullNodeClient(node_url=url)
+        self.latencies: deque[float] = deque(maxlen=latency_window)
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+    @property
+    def is_healthy(self) -> bool:
+        """
+        A node is healthy unless it is ejected. Once the ejection expires
+        the node is re-admitted on probation.
+        """
+        return time.monotonic() >= self.ejected_until
+
+    @property
+    def score(self) -> float:
+        """
+        Lower is better: median latency penalized by recent failures.
+        Nodes without samples score 0 so they get probed.
+        """
+        if not self.latencies:
+            return 0.0
+        return statistics.median(self.latencies) * (1 + self.consecutive_failures)
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        """
+        Get a latency percentile of the node.
+
+        :param percentile: Percentile between 0 and 1.
+        :return: Latency in seconds, None without samples.
+        """
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+
+    def record_success(self, latency: float) -> None:
+        """
+        Record a successful call.
+
+        :param latency: Call duration in seconds.
+        """
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+
+    def record_failure(self, eject_after: int, eject_for: float) -> None:
+        """
+        Record a failed call, ejecting the node after too many failures in a row.
+
+        :param eject_after: Number of consecutive failures that ejects the node.
+        :param eject_for: Ejection duration in seconds.
+        """
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= eject_after:
+            self.ejected_until = time.monotonic() + eject_for
+            logger.warning(
+                f"Ejecting Starknet node {self.url} for {eject_for}s after "
+                f"{self.consecutive_failures} consecutive failures"
+            )
+
+
+class RpcRouter:
+    """
+    Sends each call to the fastest healthy node, optionally hedging it
+    on the next best node when it is slower than usual.
+    """
+
+    # Samples needed before a node's latency percentile is trusted for hedging
+    MIN_HEDGE_SAMPLES = 10
+
+    def __init__(
+        self,
+        node_urls: list[str],
+        hedge_percentile: float = 0.95,
+        eject_after: int = 3,
+        eject_for: float = 30.0,
+    ):
+        """
+        :param node_urls: URLs of the nodes to route between.
+        :param hedge_percentile: Latency percentile of the primary node after which
+         a hedged request is sent to the next node. 0 disables hedging.
+        :param eject_after: Number of consecutive failures that ejects a node.
+        :param eject_for: Seconds an ejected node is kept out of rotation.
+        """
+        if not node_urls:
+            raise ValueError("At least one Starknet node URL is required")
+        self.nodes = [NodeEndpoint(url) for url in node_urls]
+        self.hedge_percentile = hedge_percentile
+        self.eject_after = eject_after
+        self.eject_for = eject_for
+
+    def ranked_nodes(self) -> list[NodeEndpoint]:
+        """
+        Get the nodes to try, best first. When every node is ejected,
+        the one whose ejection ends first is used anyway.
+
+        :return: list of NodeEndpoint
+        """
+        healthy = [node for node in self.nodes if node.is_healthy]
+        if not healthy:
+            return [min(self.nodes, key=lambda node: node.ejected_until)]
+        return sorted(healthy, key=lambda node: node.score)
+
+    async def _call_node(
+        self, node: NodeEndpoint, func: Callable[[FullNodeClient], Awaitable[Any]]
+    ) -> Any:
+        """
+        Call a node and record the outcome in its health.
+
+        :param node: The node to call.
+        :param func: Coroutine function performing the call with the node's client.
+        :return: The result of `func`.
+        """
+        started_at = time.monotonic()
+        try:
+            result = await func(node.client)
+        except Exception as e:
+            # Contract errors say nothing about the health of the node
+            if RetryPolicy.is_retryable(e):
+                node.record_failure(self.eject_after, self.eject_for)
+            raise
+        node.record_success(time.monotonic() - started_at)
+        return result
+
+    def _hedge_delay(self, node: NodeEndpoint) -> float | None:
+        """
+        Get how long to wait for a node before hedging the call.
+
+        :param node: The primary node.
+        :return: Delay in seconds, None when the call shouldn't be hedged.
+        """
+        if not self.hedge_percentile or len(node.latencies) < self.MIN_HEDGE_SAMPLES:
+            return None
+        return node.latency_percentile(self.hedge_percentile)
+
+    async def call(self, func: Callable[[FullNodeClient], Awaitable[Any]]) -> Any:
+        """
+        Route a call to the best node.
+
+        :param func: Coroutine function performing the call with a node's client.
+        :return: The result of the first successful attempt.
+        """
+        primary, *backups = self.ranked_nodes()
+        hedge_delay = self._hedge_delay(primary) if backups else None
+        if hedge_delay is None:
+            return await self._call_node(primary, func)
+
+        pending = {asyncio.ensure_future(self._call_node(primary, func))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            error = next(iter(done)).exception() if done else None
+            if done and error is None:
+                return next(iter(done)).result()
+            if error is not None and not RetryPolicy.is_retryable(error):
+                raise error
+
+            # The primary is slow or unavailable: race it against the next best node
+            logger.debug(f"Hedging RPC call from {primary.url} to {backups[0].url}")
+            pending.add(asyncio.ensure_future(self._call_node(backups[0], func)))
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,406 @@
+"""
+This module stress tests the open positions against price shocks.
+
+The collateral and debt of every position are snapshotted once from the batch
+health ratio inputs, then any number of price scenarios are evaluated without
+an on-chain call. A position is liquidated under a scenario when its collateral,
+weighted by the collateral factors, no longer covers its debt divided by the
+borrow factor, as zkLend computes it.
+
+Positions holding a single collateral token, as spotnet opens them, are grouped
+by collateral and debt token and sorted by the relative price move that
+liquidates them. A scenario is then answered by a binary search per group
+instead of a pass over every position.
+
+Usage:
+    # Time the evaluation of price shock grids over random positions
+    python -m web_app.contract_tools.stress_test --positions 20000 --scenarios 200
+"""
+
+import argparse
+import itertools
+import json
+import math
+import random
+import timeit
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from typing import Iterable
+
+from web_app.contract_tools.constants import TokenParams
+from web_app.contract_tools.mixins.health_ratio import (
+    HealthRatioInputs,
+    HealthRatioMixin,
+)
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    """
+    Class to hold the outcome of a price scenario.
+    """
+
+    scenario: dict[str, float]
+    liquidations: int
+    collateral_at_risk: float
+    debt_at_risk: float
+
+
+class _PositionGroup:
+    """
+    Single collateral positions sharing their collateral and debt tokens,
+    sorted by the price move that liquidates them.
+    """
+
+    def __init__(self):
+        self.entries: list[tuple[float, float, float]] = []
+        self.thresholds: list[float] = []
+        self.collateral_suffix: list[float] = []
+        self.debt_suffix: list[float] = []
+
+    def prepare(self) -> None:
+        """
+        Sort the positions and build the suffix sums of their USD values.
+        """
+        self.entries.sort()
+        self.thresholds = [threshold for threshold, _, _ in self.entries]
+        self.collateral_suffix = list(
+            itertools.accumulate(
+                (collateral for _, collateral, _ in reversed(self.entries)),
+                initial=0.0,
+            )
+        )[::-1]
+        self.debt_suffix = list(
+            itertools.accumulate(
+                (debt for _, _, debt in reversed(self.entries)), initial=0.0
+            )
+        )[::-1]
+
+
+class StressTest:
+    """
+    Snapshot of the open positions evaluated under price shock scenarios.
+    """
+
+    def __init__(
+        self,
+        collateral_factors: dict[str, float] = None,
+        borrow_factors: dict[str, float] = None,
+    ):
+        """
+        :param collateral_factors: Collateral factor of each token,
+         defaults to the ones of `TokenParams`.
+        :param borrow_factors: Borrow factor of each token,
+         defaults to the ones of `TokenParams`.
+        """
+        self.collateral_factors = collateral_factors or {
+            token.name: float(token.collateral_factor) for token in TokenParams.tokens()
+        }
+        self.borrow_factors = borrow_factors or {
+            token.name: float(token.borrow_factor) for token in TokenParams.tokens()
+        }
+        self.positions = 0
+        self._single: dict[tuple[str, str], list[tuple[float, float]]] = {}
+        self._multi: list[tuple[dict[str, float], str, float]] = []
+
+    def __len__(self) -> int:
+        return self.positions
+
+    def add_position(
+        self, collateral_usd: dict[str, float], debt_token: str, debt_usd: float
+    ) -> None:
+        """
+        Add a position to the snapshot.
+
+        :param collateral_usd: USD value of the collateral, by token symbol.
+        :param debt_token: Symbol of the borrowed token.
+        :param debt_usd: USD value of the debt.
+        """
+        self.positions += 1
+        collateral_usd = {
+            token: float(value) for token, value in collateral_usd.items() if value
+        }
+        if not debt_usd:
+            # A position without debt can't be liquidated
+            return
+        if len(collateral_usd) == 1:
+            ((token, value),) = collateral_usd.items()
+            self._single.setdefault((token, debt_token), []).append(
+                (value, float(debt_usd))
+            )
+        else:
+            self._multi.append((collateral_usd, debt_token, float(debt_usd)))
+
+    @classmethod
+    def from_health_inputs(
+        cls, inputs: dict[str, HealthRatioInputs], prices: dict[str, Decimal]
+    ) -> "StressTest":
+        """
+        Build the snapshot from the inputs of the batch health ratio engine.
+
+        :param inputs: The inputs of the deposit contracts, by contract address.
+        :param prices: Token prices with token symbols as keys.
+        :return: StressTest
+        """
+        stress_test = cls()
+        for contract_inputs in inputs.values():
+            borrowed_address = TokenParams.get_token_address(
+                contract_inputs.borrowed_token
+            )
+            debt_usd = (
+                contract_inputs.debt_raw
+                * prices[contract_inputs.borrowed_token]
+                / 10 ** int(TokenParams.get_token_decimals(borrowed_address))
+            )
+            stress_test.add_position(
+                {
+                    token: amount * Decimal(prices[token])
+                    for token, amount in contract_inputs.deposits.items()
+                    if amount != 0
+                },
+                contract_inputs.borrowed_token,
+                debt_usd,
+            )
+        return stress_test
+
+    @classmethod
+    async def capture(cls, deposit_contract_addresses: list[str]) -> "StressTest":
+        """
+        Read the collateral and debt of deposit contracts and snapshot them.
+        Contracts which can't be read are left out.
+
+        :param deposit_contract_addresses: The addresses of the deposit contracts.
+        :return: StressTest
+        """
+        inputs, prices = {}, {}
+        async for _ in HealthRatioMixin.iter_health_ratios_and_tvl(
+            deposit_contract_addresses, inputs=inputs, prices=prices
+        ):
+            pass
+        return cls.from_health_inputs(inputs, prices)
+
+    def _prepare_groups(
+        self, threshold: float
+    ) -> dict[tuple[str, str], _PositionGroup]:
+        """
+        Sort the single collateral positions by the ratio of the collateral
+        price move to the debt price move below which they are liquidated.
+
+        :param threshold: Health factor below which a position is liquidated.
+        :return: The groups by collateral and debt token.
+        """
+        groups = {}
+        for (token, debt_token), positions in self._single.items():
+            group = _PositionGroup()
+            weight = self.collateral_factors[token] * self.borrow_factors[debt_token]
+            for collateral, debt in positions:
+                group.entries.append(
+                    (
+                        (
+                            threshold * debt / (weight * collateral)
+                            if collateral > 0
+                            else math.inf
+                        ),
+                        collateral,
+                        debt,
+                    )
+                )
+            group.prepare()
+            groups[(token, debt_token)] = group
+        return groups
+
+    def _is_liquidated(
+        self,
+        collateral_usd: dict[str, float],
+        debt_token: str,
+        debt_usd: float,
+        scenario: dict[str, float],
+        threshold: float,
+    ) -> bool:
+        """
+        Check whether a position is liquidated under a scenario.
+
+        :param collateral_usd: USD value of the collateral, by token symbol.
+        :param debt_token: Symbol of the borrowed token.
+        :param debt_usd: USD value of the debt.
+        :param scenario: Relative price change by token symbol.
+        :param threshold: Health factor below which a position is liquidated.
+        :return: bool
+        """
+        risk_adjusted_collateral = sum(
+            value * self.collateral_factors[token] * (1 + scenario.get(token, 0.0))
+            for token, value in collateral_usd.items()
+        )
+        risk_adjusted_debt = (
+            debt_usd
+            * (1 + scenario.get(debt_token, 0.0))
+            / self.borrow_factors[debt_token]
+        )
+        return risk_adjusted_collateral < threshold * risk_adjusted_debt
+
+    def evaluate(
+        self, scenarios: Iterable[dict[str, float]], threshold: float = 1.0
+    ) -> list[ScenarioResult]:
+        """
+        Evaluate price shock scenarios against the snapshot.
+
+        :param scenarios: Relative price change by token symbol, e.g.
+         {"ETH": -0.2} for ETH dropping 20%. Tokens left out keep their price.
+        :param threshold: Health factor below which a position is liquidated.
+        :return: The liquidations and the USD values of the liquidated positions,
+         at the shocked prices, of each scenario.
+        """
+        groups = self._prepare_groups(threshold)
+        results = []
+        for scenario in scenarios:
+            liquidations = 0
+            collateral_at_risk = debt_at_risk = 0.0
+            for (token, debt_token), group in groups.items():
+                collateral_move = max(0.0, 1 + scenario.get(token, 0.0))
+                debt_move = max(0.0, 1 + scenario.get(debt_token, 0.0))
+                if debt_move == 0:
+                    price_move = math.inf
+                elif token == debt_token:
+                    price_move = 1.0
+                else:
+                    price_move = collateral_move / debt_move
+                # Positions after the index need a smaller move to be liquidated
+                index = bisect_right(group.thresholds, price_move)
+                liquidations += len(group.thresholds) - index
+                collateral_at_risk += group.collateral_suffix[index] * collateral_move
+                debt_at_risk += group.debt_suffix[index] * debt_move
+
+            for collateral_usd, debt_token, debt_usd in self._multi:
+                if self._is_liquidated(
+                    collateral_usd, debt_token, debt_usd, scenario, threshold
+                ):
+                    liquidations += 1
+                    collateral_at_risk += sum(
+                        value * max(0.0, 1 + scenario.get(token, 0.0))
+                        for token, value in collateral_usd.items()
+                    )
+                    debt_at_risk += debt_usd * max(
+                        0.0, 1 + scenario.get(debt_token, 0.0)
+                    )
+
+            results.append(
+                ScenarioResult(
+                    scenario=dict(scenario),
+                    liquidations=liquidations,
+                    collateral_at_risk=collateral_at_risk,
+                    debt_at_risk=debt_at_risk,
+                )
+            )
+        return results
+
+    def evaluate_each_position(
+        self, scenarios: Iterable[dict[str, float]], threshold: float = 1.0
+    ) -> list[ScenarioResult]:
+        """
+        Evaluate scenarios by checking every position, kept for benchmarks
+        and as a reference of `evaluate`.
+
+        :param scenarios: Relative price change by token symbol.
+        :param threshold: Health factor below which a position is liquidated.
+        :return: The results of each scenario.
+        """
+        positions = self._multi + [
+            ({token: collateral}, debt_token, debt)
+            for (token, debt_token), group in self._single.items()
+            for collateral, debt in group
+        ]
+        results = []
+        for scenario in scenarios:
+            liquidated = [
+                (collateral_usd, debt_token, debt_usd)
+                for collateral_usd, debt_token, debt_usd in positions
+                if self._is_liquidated(
+                    collateral_usd, debt_token, debt_usd, scenario, threshold
+                )
+            ]
+            results.append(
+                ScenarioResult(
+                    scenario=dict(scenario),
+                    liquidations=len(liquidated),
+                    collateral_at_risk=sum(
+                        value * max(0.0, 1 + scenario.get(token, 0.0))
+                        for collateral_usd, _, _ in liquidated
+                        for token, value in collateral_usd.items()
+                    ),
+                    debt_at_risk=sum(
+                        debt_usd * max(0.0, 1 + scenario.get(debt_token, 0.0))
+                        for _, debt_token, debt_usd in liquidated
+                    ),
+                )
+            )
+        return results
+
+
+def price_shock_grid(shocks: dict[str, Iterable[float]]) -> list[dict[str, float]]:
+    """
+    Build the scenarios combining the price shocks of several tokens.
+
+    :param shocks: Relative price changes to combine, by token symbol.
+    :return: One scenario per combination.
+    """
+    tokens = list(shocks)
+    return [
+        dict(zip(tokens, combination))
+        for combination in itertools.product(*(shocks[token] for token in tokens))
+    ]
+
+
+def benchmark(positions_count: int, scenarios_count: int, repeat: int = 3) -> dict:
+    """
+    Time the evaluation of a price shock grid over random positions.
+
+    :param positions_count: Number of positions.
+    :param scenarios_count: Number of scenarios, ETH and STRK shocks combined.
+    :param repeat: Number of timed runs, the best one is reported.
+    :return: Timings in milliseconds of the grouped and per position evaluations.
+    """
+    rng = random.Random(0)
+    stress_test = StressTest()
+    for _ in range(positions_count):
+        token = rng.choice(
+            [TokenParams.ETH.name, TokenParams.STRK.name, TokenParams.kSTRK.name]
+        )
+        collateral = rng.uniform(10, 100_000)
+        stress_test.add_position(
+            {token: collateral},
+            TokenParams.USDC.name,
+            collateral * rng.uniform(0.1, 0.75),
+        )
+    side = max(1, math.isqrt(scenarios_count))
+    scenarios = price_shock_grid(
+        {
+            TokenParams.ETH.name: [-0.5 + i / side for i in range(side)],
+            TokenParams.STRK.name: [-0.5 + i / side for i in range(side)],
+        }
+    )
+    grouped_ms = min(
+        timeit.repeat(lambda: stress_test.evaluate(scenarios), number=1, repeat=repeat)
+    )
+    each_position_ms = min(
+        timeit.repeat(
+            lambda: stress_test.evaluate_each_position(scenarios), number=1, repeat=1
+        )
+    )
+    return {
+        "positions": positions_count,
+        "scenarios": len(scenarios),
+        "grouped_ms": round(grouped_ms * 1000, 2),
+        "each_position_ms": round(each_position_ms * 1000, 2),
+        "worst_scenario": asdict(
+            max(stress_test.evaluate(scenarios), key=lambda r: r.debt_at_risk)
+        ),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--positions", type=int, default=20000)
+    parser.add_argument("--scenarios", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.positions, args.scenarios), indent=2))
@@ -5,7 +5,9 @@ This module contains the CRUD operations for the database.
 from .airdrop import *
 from .base import *
 from .deposit import *
+from .health_history import *
 from .position import *
+from .task_run import *
 from .telegram import *
 from .transaction import *
 from .user import *
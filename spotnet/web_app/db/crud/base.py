@@ -2,19 +2,54 @@
 This module contains the base crud database configuration.
 """
 
+import asyncio
+import contextvars
+import functools
 import logging
+import os
 import uuid
-from typing import Type, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Type, TypeVar
 
-from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import scoped_session, sessionmaker
-
-from web_app.db.database import SQLALCHEMY_DATABASE_URL
+from sqlalchemy.orm import scoped_session
+
+from web_app.db.database import (
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    SQLALCHEMY_DATABASE_URL,
+    get_engine,
+    get_session_factory,
+)
 from web_app.db.models import AirDrop, Base
 
 logger = logging.getLogger(__name__)
 ModelType = TypeVar("ModelType", bound=Base)
+ResultType = TypeVar("ResultType")
+
+# One thread per connection of the pool, so calls don't wait for a connection
+DB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DB_EXECUTOR_WORKERS", DB_POOL_SIZE + DB_MAX_OVERFLOW)),
+    thread_name_prefix="db",
+)
+
+
+async def run_in_db_executor(
+    func: Callable[..., ResultType], *args, **kwargs
+) -> ResultType:
+    """
+    Run a blocking connector call in the database thread pool, so the event loop
+    keeps serving other requests and RPC calls while the query runs.
+    :param func: The connector method to call
+    :param args: Positional arguments of the call
+    :param kwargs: Keyword arguments of the call
+    :return: The result of the call
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        DB_EXECUTOR, functools.partial(context.run, func, *args, **kwargs)
+    )
 
 
 class DBConnector:
@@ -30,11 +65,12 @@ class DBConnector:
 
     def __init__(self, db_url: str = SQLALCHEMY_DATABASE_URL):
         """
-        Initialize the database connection and session factory.
+        Initialize the database connection and session factory. Connectors of
+        the same database share its engine and connection pool.
         :param db_url: str = None
         """
-        self.engine = create_engine(db_url)
-        self.session_factory = sessionmaker(bind=self.engine)
+        self.engine = get_engine(db_url)
+        self.session_factory = get_session_factory(db_url)
         self.Session = scoped_session(self.session_factory)
 
     def write_to_db(self, obj: Base = None) -> Base:
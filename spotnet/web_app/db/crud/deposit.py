@@ -65,7 +65,7 @@ class DepositDBConnector(DBConnector):
             raise ValueError("Vault not found")
         with self.Session() as db:
             new_amount = Decimal(vault.amount) + Decimal(amount)
-            db.query(Vault).filter_by(id=vault.id).update(amount=str(new_amount))
+            db.query(Vault).filter_by(id=vault.id).update({"amount": str(new_amount)})
             db.commit()
             vault = self.get_vault(wallet_id, symbol)
         return vault
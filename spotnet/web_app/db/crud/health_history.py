@@ -0,0 +1,206 @@
+"""
+This module contains the health ratio history database configuration.
+
+Samples are written at the "raw" resolution and rolled up into 1 minute,
+1 hour and 1 day buckets. Each resolution is kept for its own retention period.
+"""
+
+import logging
+import os
+import time
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from web_app.db.models import HealthRatioHistory
+
+from .base import DBConnector
+
+logger = logging.getLogger(__name__)
+
+# Bucket size in seconds of each resolution, each one rolled up from the previous one
+RESOLUTIONS = {"raw": 1, "1m": 60, "1h": 3600, "1d": 86400}
+DEFAULT_RETENTIONS = {"raw": "86400", "1m": "604800", "1h": "7776000", "1d": "63072000"}
+DEFAULT_ROLLUP_DELAY = "60"
+
+
+class HealthHistoryDBConnector(DBConnector):
+    """
+    Provides database connection and operations management for the
+    HealthRatioHistory model.
+    """
+
+    @staticmethod
+    def get_retentions() -> dict[str, int]:
+        """
+        Get the retention period of each resolution, in seconds.
+        Defaults to `HEALTH_HISTORY_RETENTION_<RESOLUTION>`.
+        :return: dict
+        """
+        return {
+            resolution: int(
+                os.getenv(f"HEALTH_HISTORY_RETENTION_{resolution.upper()}", default)
+            )
+            for resolution, default in DEFAULT_RETENTIONS.items()
+        }
+
+    def write_samples(self, samples: dict[str, dict], timestamp: int = None) -> None:
+        """
+        Writes health ratio samples in a single statement.
+        :param samples: Samples by contract address, as returned by
+         `HealthRatioMixin.get_health_sample`
+        :param timestamp: Unix time of the samples, defaults to now
+        :raise SQLAlchemyError: If the database operation fails.
+        """
+        if not samples:
+            return
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        rows = [
+            {
+                "contract_address": contract_address,
+                "resolution": "raw",
+                "timestamp": timestamp,
+                "health_ratio": sample["health_ratio"],
+                "min_health_ratio": sample["health_ratio"],
+                "ltv": sample["ltv"],
+                "collateral_usd": sample["collateral_usd"],
+                "debt_usd": sample["debt_usd"],
+                "samples": 1,
+            }
+            for contract_address, sample in samples.items()
+        ]
+        with self.Session() as db:
+            try:
+                db.execute(insert(HealthRatioHistory), rows)
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                raise e
+
+    def rollup(self, resolution: str, now: int = None) -> int:
+        """
+        Aggregates the rows of the previous resolution into the buckets of
+        `resolution` completed since the last rollup. Averages are weighted by
+        the number of samples of each row.
+        A bucket is only rolled up once it ended `HEALTH_HISTORY_ROLLUP_DELAY`
+        seconds ago, so samples committed late by a slow sweep are included.
+        :param resolution: The target resolution, "1m", "1h" or "1d"
+        :param now: Unix time, defaults to now
+        :return: Number of buckets written
+        """
+        resolutions = list(RESOLUTIONS)
+        source = resolutions[resolutions.index(resolution) - 1]
+        size = RESOLUTIONS[resolution]
+        now = int(time.time() if now is None else now)
+        delay = int(os.getenv("HEALTH_HISTORY_ROLLUP_DELAY", DEFAULT_ROLLUP_DELAY))
+        # Only completed buckets are rolled up, so they are never written twice
+        end = (now - delay) // size * size
+        bucket = (HealthRatioHistory.timestamp // size * size).label("timestamp")
+        samples = HealthRatioHistory.samples
+
+        def weighted_avg(column):
+            return func.sum(column * samples) / func.sum(samples)
+
+        with self.Session() as db:
+            try:
+                last_bucket = db.scalar(
+                    select(func.max(HealthRatioHistory.timestamp)).where(
+                        HealthRatioHistory.resolution == resolution
+                    )
+                )
+                conditions = [
+                    HealthRatioHistory.resolution == source,
+                    HealthRatioHistory.timestamp < end,
+                ]
+                if last_bucket is not None:
+                    conditions.append(
+                        HealthRatioHistory.timestamp >= last_bucket + size
+                    )
+                aggregated = (
+                    select(
+                        HealthRatioHistory.contract_address,
+                        literal(resolution),
+                        bucket,
+                        weighted_avg(HealthRatioHistory.health_ratio),
+                        func.min(HealthRatioHistory.min_health_ratio),
+                        weighted_avg(HealthRatioHistory.ltv),
+                        weighted_avg(HealthRatioHistory.collateral_usd),
+                        weighted_avg(HealthRatioHistory.debt_usd),
+                        func.sum(samples),
+                    )
+                    .where(*conditions)
+                    .group_by(HealthRatioHistory.contract_address, bucket)
+                )
+                result = db.execute(
+                    insert(HealthRatioHistory).from_select(
+                        [
+                            "contract_address",
+                            "resolution",
+                            "timestamp",
+                            "health_ratio",
+                            "min_health_ratio",
+                            "ltv",
+                            "collateral_usd",
+                            "debt_usd",
+                            "samples",
+                        ],
+                        aggregated,
+                    )
+                )
+                db.commit()
+                return result.rowcount
+            except SQLAlchemyError as e:
+                db.rollback()
+                raise e
+
+    def delete_expired(self, now: int = None) -> int:
+        """
+        Deletes the rows older than the retention period of their resolution.
+        :param now: Unix time, defaults to now
+        :return: Number of rows deleted
+        """
+        now = int(time.time() if now is None else now)
+        deleted = 0
+        with self.Session() as db:
+            try:
+                for resolution, retention in self.get_retentions().items():
+                    deleted += (
+                        db.query(HealthRatioHistory)
+                        .filter(
+                            HealthRatioHistory.resolution == resolution,
+                            HealthRatioHistory.timestamp < now - retention,
+                        )
+                        .delete(synchronize_session=False)
+                    )
+                db.commit()
+                return deleted
+            except SQLAlchemyError as e:
+                db.rollback()
+                raise e
+
+    def get_history(
+        self,
+        contract_address: str,
+        resolution: str,
+        since: int = None,
+        limit: int = 1000,
+    ) -> list[HealthRatioHistory]:
+        """
+        Retrieves the health ratio history of a deposit contract.
+        :param contract_address: The deposit contract address
+        :param resolution: "raw", "1m", "1h" or "1d"
+        :param since: Only rows from this Unix time are returned
+        :param limit: Maximum number of rows, the latest ones are kept
+        :return: The rows in chronological order
+        """
+        with self.Session() as db:
+            query = db.query(HealthRatioHistory).filter(
+                HealthRatioHistory.contract_address == contract_address,
+                HealthRatioHistory.resolution == resolution,
+            )
+            if since is not None:
+                query = query.filter(HealthRatioHistory.timestamp >= since)
+            rows = (
+                query.order_by(HealthRatioHistory.timestamp.desc()).limit(limit).all()
+            )
+            return rows[::-1]
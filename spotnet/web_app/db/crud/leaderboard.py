@@ -1,15 +1,27 @@
 """
 This module provides CRUD operations for the leaderboard, retrieving the top users by positions.
 
+The numbers of positions by user and by token are maintained in counter tables
+as positions are opened and closed, and reconciled with the positions periodically.
 """
+
 from .base import DBConnector
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func
-from web_app.db.models import User, Position
+from sqlalchemy import func, text
+from web_app.db.models import (
+    Position,
+    Status,
+    TokenPositionCount,
+    User,
+    UserPositionCount,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Positions counted on the leaderboard
+LEADERBOARD_STATUSES = (Status.OPENED, Status.CLOSED)
+
 class LeaderboardDBConnector(DBConnector):
     """
     Provides database connection and operations management using SQLAlchemy
@@ -24,14 +36,11 @@ class LeaderboardDBConnector(DBConnector):
         with self.Session() as db:
             try:
                 results = (
-                    db.query(
-                        User.wallet_id,
-                        func.count(Position.id).label("positions_number")
-                    )
-                    .join(Position, Position.user_id == User.id)
-                    .filter(Position.status.in_(["closed", "opened"]))
-                    .group_by(User.wallet_id)
-                    .order_by(func.count(Position.id).desc())
+                    db.query(User.wallet_id, UserPositionCount.positions_number)
+                    .select_from(UserPositionCount)
+                    .join(User, User.id == UserPositionCount.user_id)
+                    .filter(UserPositionCount.positions_number > 0)
+                    .order_by(UserPositionCount.positions_number.desc())
                     .limit(10)
                     .all()
                 )
@@ -44,7 +53,7 @@ class LeaderboardDBConnector(DBConnector):
             except SQLAlchemyError as e:
                 logger.error(f"Error retrieving top users by positions: {e}")
                 return []
-            
+
     def get_position_token_statistics(self) -> list[dict]:
         """
         Retrieves closed/opened positions groupped by token_symbol.
@@ -54,11 +63,10 @@ class LeaderboardDBConnector(DBConnector):
             try:
                 results = (
                     db.query(
-                        Position.token_symbol,
-                        func.count(Position.id).label("total_positions")
+                        TokenPositionCount.token_symbol,
+                        TokenPositionCount.total_positions,
                     )
-                    .filter(Position.status.in_(["closed", "opened"]))
-                    .group_by(Position.token_symbol)
+                    .filter(TokenPositionCount.total_positions > 0)
                     .all()
                 )
 
@@ -73,3 +81,74 @@ class LeaderboardDBConnector(DBConnector):
             except SQLAlchemyError as e:
                 logger.error(f"Error retrieving position token statistics: {e}")
                 return []
+
+    def reconcile_position_counts(self) -> dict[str, int]:
+        """
+        Recounts the closed/opened positions by user and by token, and corrects
+        the counters that drifted from them. The counter tables are locked
+        against writes meanwhile, so no position transition is missed or
+        counted twice.
+        :return: Number of corrected counters, for users and for tokens.
+        """
+        with self.Session() as db:
+            try:
+                if db.get_bind().dialect.name == "postgresql":
+                    db.execute(
+                        text(
+                            "LOCK TABLE user_position_count, token_position_count "
+                            "IN EXCLUSIVE MODE"
+                        )
+                    )
+                counted = Position.status.in_(
+                    [status.value for status in LEADERBOARD_STATUSES]
+                )
+                corrected = {
+                    "users": self._reconcile_counter(
+                        db,
+                        UserPositionCount.user_id,
+                        UserPositionCount.positions_number,
+                        db.query(Position.user_id, func.count(Position.id))
+                        .filter(counted)
+                        .group_by(Position.user_id),
+                    ),
+                    "tokens": self._reconcile_counter(
+                        db,
+                        TokenPositionCount.token_symbol,
+                        TokenPositionCount.total_positions,
+                        db.query(Position.token_symbol, func.count(Position.id))
+                        .filter(counted)
+                        .group_by(Position.token_symbol),
+                    ),
+                }
+                db.commit()
+                return corrected
+
+            except SQLAlchemyError as e:
+                db.rollback()
+                raise e
+
+    @staticmethod
+    def _reconcile_counter(db, key_column, count_column, expected_counts) -> int:
+        """
+        Sets the counters of a counter table to the expected counts.
+        :param db: The session of the transaction
+        :param key_column: The primary key column of the counter table
+        :param count_column: The counter column
+        :param expected_counts: Query of the expected count of each key
+        :return: Number of corrected counters
+        """
+        model = key_column.class_
+        expected = dict(expected_counts.all())
+        stored = dict(db.query(key_column, count_column).all())
+        corrected = 0
+        for key in stored.keys() | expected.keys():
+            count = expected.get(key, 0)
+            if stored.get(key, 0) == count:
+                continue
+            logger.warning(
+                f"Correcting {model.__tablename__} of {key}: "
+                f"{stored.get(key, 0)} instead of {count}"
+            )
+            db.merge(model(**{key_column.key: key, count_column.key: count}))
+            corrected += 1
+        return corrected
@@ -4,23 +4,46 @@ This module contains the position database configuration.
 
 import logging
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
 from typing import TypeVar
 from uuid import UUID
 
-from sqlalchemy import DECIMAL, Numeric, cast, func
+from sqlalchemy import func, select, text
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 
-from web_app.db.models import Base, ExtraDeposit, Position, Status, Transaction, User
-
+from web_app.db.models import (
+    Base,
+    ExtraDeposit,
+    OpenPositionTotal,
+    Position,
+    Status,
+    TokenPositionCount,
+    Transaction,
+    User,
+    UserPositionCount,
+)
+
+from .leaderboard import LEADERBOARD_STATUSES
 from .user import UserDBConnector
 
 logger = logging.getLogger(__name__)
 ModelType = TypeVar("ModelType", bound=Base)
 
 
+@dataclass
+class DashboardSnapshot:
+    """
+    Class to hold the dashboard data of a wallet, loaded in a single query.
+    """
+
+    contract_address: str | None = None
+    position: dict | None = None
+    extra_deposits: list[ExtraDeposit] = field(default_factory=list)
+
+
 class PositionDBConnector(UserDBConnector):
     """
     Provides database connection and operations management for the Position model.
@@ -103,7 +126,46 @@ class PositionDBConnector(UserDBConnector):
             except SQLAlchemyError as e:
                 logger.error(f"Failed to retrieve positions: {str(e)}")
                 return []
-      
+
+    def get_dashboard_snapshot(self, wallet_id: str) -> DashboardSnapshot:
+        """
+        Retrieves the contract address of a user, its latest opened position
+        and the extra deposits of that position in a single query.
+        :param wallet_id: str
+        :return: DashboardSnapshot, empty if the user doesn't exist
+        """
+        latest_position_id = (
+            select(Position.id)
+            .where(
+                Position.user_id == User.id,
+                Position.status == Status.OPENED.value,
+            )
+            .order_by(Position.created_at.desc())
+            .limit(1)
+            .correlate(User)
+            .scalar_subquery()
+        )
+        query = (
+            select(User.contract_address, Position, ExtraDeposit)
+            .select_from(User)
+            .outerjoin(Position, Position.id == latest_position_id)
+            .outerjoin(ExtraDeposit, ExtraDeposit.position_id == Position.id)
+            .where(User.wallet_id == wallet_id)
+        )
+        with self.Session() as db:
+            rows = db.execute(query).all()
+
+        if not rows:
+            return DashboardSnapshot()
+        contract_address, position, _ = rows[0]
+        return DashboardSnapshot(
+            contract_address=contract_address,
+            position=self._position_to_dict(position) if position else None,
+            extra_deposits=[
+                extra_deposit for _, _, extra_deposit in rows if extra_deposit
+            ],
+        )
+
     def get_all_positions_by_wallet_id(
         self, wallet_id: str, start: int, limit: int
     ) -> list[dict]:
@@ -138,7 +200,7 @@ class PositionDBConnector(UserDBConnector):
             except SQLAlchemyError as e:
                 logger.error(f"Failed to retrieve positions: {str(e)}")
                 return []
-    
+
     def get_count_positions_by_wallet_id(self, wallet_id: str) -> int:
         """
         Counts total number of positions for a user.
@@ -263,42 +325,230 @@ class PositionDBConnector(UserDBConnector):
 
     def delete_position(self, position: Position) -> None:
         """
-        Deletes a position from the database.
+        Deletes a position from the database, removing it from the open position
+        totals and the leaderboard counters.
         :param position: Position
         :return: None
         """
-        self.delete_object_by_id(Position, position.id)
+        with self.Session() as db:
+            try:
+                position = (
+                    db.query(Position)
+                    .filter(Position.id == position.id)
+                    .with_for_update()
+                    .first()
+                )
+                if position:
+                    self._apply_status_change(db, position, None)
+                    db.delete(position)
+                    db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                raise e
 
     def close_position(self, position_id: uuid) -> Position | None:
         """
-        Retrieves a position by its contract address.
+        Closes a position, updating the open position totals and the leaderboard
+        counters in the same transaction.
         :param position_id: str
-        :return: Position | None
+        :return: Position status | None
         """
-        position = self.get_object(Position, position_id)
-        if position:
-            position.status = Status.CLOSED.value
-            position.closed_at = datetime.now()
-            self.write_to_db(position)
-        return position.status
+        with self.Session() as session:
+            try:
+                position = (
+                    session.query(Position)
+                    .filter(Position.id == position_id)
+                    .with_for_update()
+                    .first()
+                )
+                if not position:
+                    logger.error(f"Position with ID {position_id} not found")
+                    return None
+                self._apply_status_change(session, position, Status.CLOSED)
+                position.status = Status.CLOSED.value
+                position.closed_at = datetime.now()
+                session.commit()
+                return position.status
+            except SQLAlchemyError as e:
+                session.rollback()
+                raise e
 
     def open_position(self, position_id: uuid.UUID, current_prices: dict) -> str | None:
         """
-        Opens a position by updating its status and creating an AirDrop claim.
+        Opens a position by updating its status and start price, and updates the
+        open position totals and the leaderboard counters in the same transaction.
+        Creates an AirDrop claim for a newly opened position.
         :param position_id: uuid.UUID
         :param current_prices: dict
         :return: str | None
         """
-        position = self.get_object(Position, position_id)
-        if position:
-            position.status = Status.OPENED.value
-            self.write_to_db(position)
-            self.create_empty_claim(position.user_id)
-            self.save_current_price(position, current_prices)
-            return position.status
-        else:
-            logger.error(f"Position with ID {position_id} not found")
-            return None
+        with self.Session() as session:
+            try:
+                position = (
+                    session.query(Position)
+                    .filter(Position.id == position_id)
+                    .with_for_update()
+                    .first()
+                )
+                if not position:
+                    logger.error(f"Position with ID {position_id} not found")
+                    return None
+                newly_opened = position.status != Status.OPENED
+                self._apply_status_change(session, position, Status.OPENED)
+                position.status = Status.OPENED.value
+                position.start_price = current_prices.get(position.token_symbol)
+                session.commit()
+                user_id, status = position.user_id, position.status
+            except SQLAlchemyError as e:
+                session.rollback()
+                raise e
+        if newly_opened:
+            self.create_empty_claim(user_id)
+        return status
+
+    def _apply_status_change(
+        self, session, position: Position, status: Status | None
+    ) -> None:
+        """
+        Updates the open position totals and the leaderboard counters for
+        a status change of a position, without committing the session.
+        :param session: The session of the transaction
+        :param position: Position, still with its current status
+        :param status: The new status, None for a deleted position
+        """
+        was_opened = position.status == Status.OPENED
+        if was_opened != (status == Status.OPENED):
+            self._add_to_open_totals(
+                session,
+                self._get_position_amounts(session, position),
+                -1 if was_opened else 1,
+            )
+        delta = (status in LEADERBOARD_STATUSES) - (
+            position.status in LEADERBOARD_STATUSES
+        )
+        if delta:
+            self._increment(
+                session,
+                UserPositionCount.positions_number,
+                UserPositionCount.user_id,
+                position.user_id,
+                delta,
+            )
+            self._increment(
+                session,
+                TokenPositionCount.total_positions,
+                TokenPositionCount.token_symbol,
+                position.token_symbol,
+                delta,
+            )
+
+    @staticmethod
+    def _get_position_amounts(session, position: Position) -> dict[str, Decimal]:
+        """
+        Gets the amounts of a position and its extra deposits, by token symbol.
+        :param session: The session of the transaction
+        :param position: Position
+        :return: dict
+        """
+        amounts = {position.token_symbol: Decimal(position.amount)}
+        extra_deposits = session.query(
+            ExtraDeposit.token_symbol, ExtraDeposit.amount
+        ).filter(ExtraDeposit.position_id == position.id)
+        for token_symbol, amount in extra_deposits:
+            amounts[token_symbol] = amounts.get(token_symbol, 0) + Decimal(amount)
+        return amounts
+
+    @classmethod
+    def _add_to_open_totals(
+        cls, session, amounts: dict[str, Decimal], sign: int = 1
+    ) -> None:
+        """
+        Adds amounts to the open position totals, without committing the session.
+        Tokens are updated in a fixed order, so concurrent transactions
+        lock their rows in the same order.
+        :param session: The session of the transaction
+        :param amounts: Amounts by token symbol
+        :param sign: 1 to add the amounts, -1 to subtract them
+        """
+        for token_symbol in sorted(amounts):
+            cls._increment(
+                session,
+                OpenPositionTotal.amount,
+                OpenPositionTotal.token_symbol,
+                token_symbol,
+                sign * Decimal(amounts[token_symbol]),
+            )
+
+    @staticmethod
+    def _increment(session, column, key_column, key, delta) -> None:
+        """
+        Adds a delta to a column of the row of a key, inserting the row if missing.
+        The upsert is done in the database, so concurrent increments add up,
+        including those creating the row.
+        :param session: The session of the transaction
+        :param column: The column to increment
+        :param key_column: The primary key column of the table
+        :param key: The key of the row
+        :param delta: The value to add
+        """
+        model = column.class_
+        set_ = {column.key: column + delta}
+        # Columns with an update timestamp are not refreshed by ON CONFLICT
+        set_.update(
+            {
+                other.key: other.onupdate.arg
+                for other in model.__table__.columns
+                if other.onupdate is not None
+            }
+        )
+        session.execute(
+            insert(model)
+            .values({key_column.key: key, column.key: delta})
+            .on_conflict_do_update(index_elements=[key_column], set_=set_)
+        )
+
+    def rebuild_open_position_totals(self) -> dict[str, Decimal]:
+        """
+        Recomputes the open position totals from the opened positions and
+        their extra deposits, replacing the maintained ones. The table is locked
+        against writes meanwhile, so no concurrent update is lost.
+        :return: The totals by token symbol
+        """
+        with self.Session() as session:
+            try:
+                if session.get_bind().dialect.name == "postgresql":
+                    session.execute(
+                        text("LOCK TABLE open_position_total IN EXCLUSIVE MODE")
+                    )
+                opened_ids = select(Position.id).where(
+                    Position.status == Status.OPENED.value
+                )
+                totals = {}
+                for token_symbol, amount in (
+                    session.query(Position.token_symbol, func.sum(Position.amount))
+                    .filter(Position.status == Status.OPENED.value)
+                    .group_by(Position.token_symbol)
+                ):
+                    totals[token_symbol] = Decimal(amount)
+                for token_symbol, amount in (
+                    session.query(
+                        ExtraDeposit.token_symbol, func.sum(ExtraDeposit.amount)
+                    )
+                    .filter(ExtraDeposit.position_id.in_(opened_ids))
+                    .group_by(ExtraDeposit.token_symbol)
+                ):
+                    totals[token_symbol] = totals.get(token_symbol, 0) + Decimal(amount)
+
+                session.query(OpenPositionTotal).delete(synchronize_session=False)
+                session.add_all(
+                    OpenPositionTotal(token_symbol=token_symbol, amount=amount)
+                    for token_symbol, amount in totals.items()
+                )
+                session.commit()
+                return totals
+            except SQLAlchemyError as e:
+                session.rollback()
+                raise e
 
     def get_repay_data(self, wallet_id: str) -> tuple:
         """
@@ -324,24 +574,19 @@ class PositionDBConnector(UserDBConnector):
 
     def get_total_amounts_for_open_positions(self) -> dict[str, Decimal]:
         """
-        Calculates the amounts for all positions where status is 'OPENED',
-        grouped by token symbol.
+        Gets the total amounts of the opened positions, including their extra
+        deposits, grouped by token symbol. The totals are maintained as positions
+        are opened, closed and topped up, so this reads one row per token.
 
         :return: Dictionary of total amounts for each token in opened positions
         """
         with self.Session() as db:
             try:
-                token_amounts = (
-                    db.query(
-                        Position.token_symbol,
-                        func.sum(cast(Position.amount, Numeric)).label("total_amount"),
-                    )
-                    .filter(Position.status != Status.PENDING.value)
-                    .group_by(Position.token_symbol)
-                    .all()
-                )
+                token_amounts = db.query(
+                    OpenPositionTotal.token_symbol, OpenPositionTotal.amount
+                ).filter(OpenPositionTotal.amount != 0)
 
-                return {token: Decimal(str(amount)) for token, amount in token_amounts}
+                return {token: Decimal(amount) for token, amount in token_amounts}
 
             except SQLAlchemyError as e:
                 logger.error(f"Error calculating amounts for open positions: {e}")
@@ -458,13 +703,15 @@ class PositionDBConnector(UserDBConnector):
 
     def delete_all_user_positions(self, user_id: uuid.UUID) -> None:
         """
-        Deletes all positions for a user.
+        Deletes all positions for a user, removing them from the open position
+        totals and the leaderboard counters.
         :param user_id: User ID
         """
         with self.Session() as db:
             try:
                 positions = db.query(Position).filter_by(user_id=user_id).all()
                 for position in positions:
+                    self._apply_status_change(db, position, None)
                     db.delete(position)
                 db.commit()
             except SQLAlchemyError as e:
@@ -477,22 +724,36 @@ class PositionDBConnector(UserDBConnector):
         Add or update an extra deposit for a position.
         If the token already exists for this position, update its amount.
         Otherwise, create a new extra deposit entry.
+        The amount is added to the open position totals in the same transaction
+        if the position is opened.
         """
         with self.Session() as session:
-            session.execute(
-                insert(ExtraDeposit)
-                .values(
-                    position_id=position.id, token_symbol=token_symbol, amount=amount
+            try:
+                status = (
+                    session.query(Position.status)
+                    .filter(Position.id == position.id)
+                    .with_for_update()
+                    .scalar()
                 )
-                .on_conflict_do_update(
-                    index_elements=["position_id", "token_symbol"],
-                    set_={
-                        "amount": cast(ExtraDeposit.amount, DECIMAL) + Decimal(amount)
-                    },
+                session.execute(
+                    insert(ExtraDeposit)
+                    .values(
+                        position_id=position.id,
+                        token_symbol=token_symbol,
+                        amount=amount,
+                    )
+                    .on_conflict_do_update(
+                        index_elements=["position_id", "token_symbol"],
+                        set_={"amount": ExtraDeposit.amount + Decimal(amount)},
+                    )
                 )
-            )
+                if status == Status.OPENED:
+                    self._add_to_open_totals(session, {token_symbol: amount})
 
-            session.commit()
+                session.commit()
+            except SQLAlchemyError as e:
+                session.rollback()
+                raise e
 
     def get_extra_deposits_data(self, position_id: UUID) -> dict[str, str]:
         """
@@ -527,8 +788,29 @@ class PositionDBConnector(UserDBConnector):
 
     def delete_all_extra_deposits(self, position_id: UUID) -> None:
         """
-        Delete all extra deposits for a position.
+        Delete all extra deposits for a position, removing them from the open
+        position totals if the position is opened.
         """
         with self.Session() as db:
-            db.query(ExtraDeposit).filter(ExtraDeposit.position_id == position_id).delete()
+            status = (
+                db.query(Position.status)
+                .filter(Position.id == position_id)
+                .with_for_update()
+                .scalar()
+            )
+            extra_deposits = db.query(ExtraDeposit).filter(
+                ExtraDeposit.position_id == position_id
+            )
+            if status == Status.OPENED:
+                self._add_to_open_totals(
+                    db,
+                    {
+                        token_symbol: Decimal(amount)
+                        for token_symbol, amount in extra_deposits.with_entities(
+                            ExtraDeposit.token_symbol, ExtraDeposit.amount
+                        )
+                    },
+                    -1,
+                )
+            extra_deposits.delete()
             db.commit()
@@ -0,0 +1,103 @@
+"""
+This module contains the task run database configuration.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+
+from web_app.db.models import TaskRun, TaskRunStatus
+
+from .base import DBConnector
+
+logger = logging.getLogger(__name__)
+
+
+class TaskRunDBConnector(DBConnector):
+    """
+    Provides database connection and operations management for the TaskRun model.
+    """
+
+    def create_task_run(
+        self,
+        task_name: str,
+        status: TaskRunStatus,
+        started_at: datetime,
+        finished_at: datetime = None,
+        positions: int = None,
+        rpc_calls: int = None,
+        details: dict = None,
+    ) -> TaskRun:
+        """
+        Records a run of a task.
+        :param task_name: Name of the task
+        :param status: Status of the run
+        :param started_at: Time the run started at
+        :param finished_at: Time the run finished at, None if it was skipped
+        :param positions: Number of positions processed
+        :param rpc_calls: Number of RPC calls made
+        :param details: Summary returned by the task, or the error
+        :return: TaskRun
+        """
+        task_run = TaskRun(
+            task_name=task_name,
+            status=status,
+            started_at=started_at,
+            finished_at=finished_at,
+            duration=(
+                (finished_at - started_at).total_seconds() if finished_at else None
+            ),
+            positions=positions,
+            rpc_calls=rpc_calls,
+            details=details,
+        )
+        return self.write_to_db(task_run)
+
+    def get_task_runs(self, task_name: str, limit: int = 50) -> list[TaskRun]:
+        """
+        Retrieves the latest runs of a task.
+        :param task_name: Name of the task
+        :param limit: Maximum number of runs returned
+        :return: The runs, most recent first
+        """
+        with self.Session() as db:
+            return (
+                db.query(TaskRun)
+                .filter(TaskRun.task_name == task_name)
+                .order_by(TaskRun.started_at.desc())
+                .limit(limit)
+                .all()
+            )
+
+    def get_task_run_stats(self, task_name: str, since: datetime) -> dict:
+        """
+        Retrieves statistics of the runs of a task, to tell whether it falls behind
+        its schedule.
+        :param task_name: Name of the task
+        :param since: Only runs started from this time are included
+        :return: Counts of runs by status, and average and maximum durations
+        """
+        with self.Session() as db:
+            try:
+                result = (
+                    db.query(
+                        func.count(TaskRun.id).label("runs"),
+                        *(
+                            func.count(TaskRun.id)
+                            .filter(TaskRun.status == status)
+                            .label(status.value)
+                            for status in TaskRunStatus
+                        ),
+                        func.avg(TaskRun.duration).label("avg_duration"),
+                        func.max(TaskRun.duration).label("max_duration"),
+                    )
+                    .filter(TaskRun.task_name == task_name, TaskRun.started_at >= since)
+                    .one()
+                )
+                return dict(result._mapping)
+
+            except SQLAlchemyError as e:
+                logger.error(f"Error retrieving stats of task {task_name}: {e}")
+                return {}
@@ -1,11 +1,15 @@
 """
 This module contains the database configuration and session.
+
+Engines are shared per database URL across the process, so every connector
+draws from the same connection pool instead of opening its own.
 """
 
 import os
+import threading
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 load_dotenv()
@@ -20,7 +24,91 @@ SQLALCHEMY_DATABASE_URL = (
     f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_SERVER}:{DB_PORT}/{DB_NAME}"
 )
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+
+_engines: dict[str, Engine] = {}
+_session_factories: dict[str, sessionmaker] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(db_url: str = SQLALCHEMY_DATABASE_URL) -> Engine:
+    """
+    Get the engine of a database, created on first use and shared afterwards.
+    Its pool is configured by the `DB_POOL_*` and `DB_MAX_OVERFLOW` variables.
+
+    :param db_url: The database URL.
+    :return: Engine
+    """
+    engine = _engines.get(db_url)
+    if engine is not None:
+        return engine
+    with _engines_lock:
+        if db_url not in _engines:
+            options = {"pool_pre_ping": DB_POOL_PRE_PING}
+            # SQLite uses a single connection pool without size settings
+            if make_url(db_url).get_backend_name() != "sqlite":
+                options.update(
+                    pool_size=DB_POOL_SIZE,
+                    max_overflow=DB_MAX_OVERFLOW,
+                    pool_timeout=DB_POOL_TIMEOUT,
+                    pool_recycle=DB_POOL_RECYCLE,
+                )
+            _engines[db_url] = create_engine(db_url, **options)
+        return _engines[db_url]
+
+
+def get_session_factory(db_url: str = SQLALCHEMY_DATABASE_URL) -> sessionmaker:
+    """
+    Get the session factory bound to the shared engine of a database.
+
+    :param db_url: The database URL.
+    :return: sessionmaker
+    """
+    session_factory = _session_factories.get(db_url)
+    if session_factory is None:
+        session_factory = _session_factories.setdefault(
+            db_url, sessionmaker(bind=get_engine(db_url))
+        )
+    return session_factory
+
+
+def get_pool_metrics() -> dict[str, dict]:
+    """
+    Get the usage of the connection pools of the shared engines.
+
+    :return: The size, checked out, idle and overflow connections of each pool,
+     by database URL with the password hidden.
+    """
+    metrics = {}
+    for db_url, engine in list(_engines.items()):
+        pool = engine.pool
+        metrics[make_url(db_url).render_as_string(hide_password=True)] = {
+            "pool": type(pool).__name__,
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        }
+    return metrics
+
+
+def dispose_engines(close: bool = True) -> None:
+    """
+    Dispose the pools of the shared engines. In a forked process, call it with
+    `close=False` so the connections inherited from the parent are dropped
+    without closing them under the parent.
+
+    :param close: Whether the pooled connections are closed.
+    """
+    for engine in list(_engines.values()):
+        engine.dispose(close=close)
+
+
+engine = get_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -6,19 +6,25 @@ between the data entities.
 """
 
 from datetime import datetime
+from decimal import Decimal
 from enum import Enum as PyEnum
 from uuid import uuid4
 
 from sqlalchemy import (
     DECIMAL,
     NUMERIC,
+    BigInteger,
     Boolean,
     Column,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
+    Integer,
+    JSON,
     String,
+    TypeDecorator,
     UniqueConstraint,
 )
 from sqlalchemy.dialects.postgresql import UUID
@@ -27,6 +33,28 @@ from sqlalchemy.sql import func
 from web_app.db.database import Base
 
 
+class Amount(TypeDecorator):
+    """
+    Token amount stored as NUMERIC, so it can be summed and indexed in the database,
+    and handled as a string in the application like the amounts of the API.
+    """
+
+    impl = NUMERIC
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        """
+        Converts the amount to a Decimal before it is sent to the database.
+        """
+        return None if value is None else Decimal(str(value))
+
+    def process_result_value(self, value, dialect):
+        """
+        Converts the stored amount to a string in positional notation.
+        """
+        return None if value is None else format(value, "f")
+
+
 class Status(PyEnum):
     """
     Enum for the position status.
@@ -56,6 +84,7 @@ class User(Base):
     wallet_id = Column(String, nullable=False, unique=True, index=True)
     contract_address = Column(String)
 
+
 class Referal(Base):
     """
     SQLAlchemy model for the referal table.
@@ -83,7 +112,7 @@ class Position(Base):
         UUID(as_uuid=True), ForeignKey("user.id"), index=True, nullable=False
     )
     token_symbol = Column(String, nullable=False)
-    amount = Column(String, nullable=False)
+    amount = Column(Amount, nullable=False)
     multiplier = Column(NUMERIC, nullable=False)
 
     created_at = Column(DateTime, nullable=False, default=func.now())
@@ -154,7 +183,7 @@ class Vault(Base):
         UUID(as_uuid=True), ForeignKey("user.id"), index=True, nullable=False
     )
     symbol = Column(String)
-    amount = Column(String)
+    amount = Column(Amount)
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(
         DateTime, nullable=False, default=func.now(), onupdate=func.now()
@@ -217,9 +246,133 @@ class ExtraDeposit(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     token_symbol = Column(String, nullable=False)
-    amount = Column(String, nullable=False)
+    amount = Column(Amount, nullable=False)
     added_at = Column(DateTime, default=datetime.utcnow)
     position_id = Column(UUID(as_uuid=True), ForeignKey("position.id"))
     __table_args__ = (
         UniqueConstraint("position_id", "token_symbol", name="_position_token_uc"),
     )
+
+
+class TaskRunStatus(PyEnum):
+    """
+    Enum for the status of a background task run.
+    """
+
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+    @classmethod
+    def choices(cls):
+        """
+        Returns the list of task run status choices.
+        """
+        return [status.value for status in cls]
+
+
+class TaskRun(Base):
+    """
+    SQLAlchemy model for the task_run table.
+    Stores the telemetry of the runs of the scheduled Celery tasks.
+    """
+
+    __tablename__ = "task_run"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    task_name = Column(String, nullable=False, index=True)
+    status = Column(
+        Enum(
+            TaskRunStatus,
+            name="task_run_status_enum",
+            values_callable=lambda x: [e.value for e in x],
+        ),
+        nullable=False,
+    )
+    started_at = Column(DateTime, nullable=False, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration = Column(Float, nullable=True)
+    positions = Column(Integer, nullable=True)
+    rpc_calls = Column(Integer, nullable=True)
+    details = Column(JSON, nullable=True)
+
+
+class HealthRatioHistory(Base):
+    """
+    SQLAlchemy model for the health_ratio_history table.
+    Stores the health ratio samples of deposit contracts and their rollups
+    into 1 minute, 1 hour and 1 day buckets.
+    """
+
+    __tablename__ = "health_ratio_history"
+
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    contract_address = Column(String, nullable=False)
+    # "raw" for samples, "1m", "1h" or "1d" for rollups
+    resolution = Column(String(4), nullable=False)
+    # Unix time of the sample, or start of the bucket
+    timestamp = Column(BigInteger, nullable=False)
+    health_ratio = Column(Float, nullable=False)
+    min_health_ratio = Column(Float, nullable=False)
+    ltv = Column(Float, nullable=False)
+    collateral_usd = Column(Float, nullable=False)
+    debt_usd = Column(Float, nullable=False)
+    samples = Column(Integer, nullable=False, default=1)
+    __table_args__ = (
+        Index(
+            "ix_health_ratio_history_contract_resolution_timestamp",
+            "contract_address",
+            "resolution",
+            "timestamp",
+        ),
+        Index(
+            "ix_health_ratio_history_resolution_timestamp", "resolution", "timestamp"
+        ),
+    )
+
+
+class OpenPositionTotal(Base):
+    """
+    SQLAlchemy model for the open_position_total table.
+    Maintains the total amount of the opened positions by token, including
+    their extra deposits, as positions are opened, closed and topped up.
+    """
+
+    __tablename__ = "open_position_total"
+
+    token_symbol = Column(String, primary_key=True)
+    amount = Column(NUMERIC, nullable=False, default=0)
+    updated_at = Column(
+        DateTime, nullable=False, default=func.now(), onupdate=func.now()
+    )
+
+
+class UserPositionCount(Base):
+    """
+    SQLAlchemy model for the user_position_count table.
+    Maintains the number of opened and closed positions of each user,
+    indexed for the top users of the leaderboard.
+    """
+
+    __tablename__ = "user_position_count"
+
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    positions_number = Column(Integer, nullable=False, default=0, index=True)
+
+
+class TokenPositionCount(Base):
+    """
+    SQLAlchemy model for the token_position_count table.
+    Maintains the number of opened and closed positions of each token.
+    """
+
+    __tablename__ = "token_position_count"
+
+    token_symbol = Column(String, primary_key=True)
+    total_positions = Column(Integer, nullable=False, default=0)
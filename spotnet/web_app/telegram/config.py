@@ -13,3 +13,14 @@ load_dotenv()
 # Retrieve the Telegram bot token from environment variables
 TELEGRAM_TOKEN = getenv("TELEGRAM_TOKEN")
 WEBAPP_URL = getenv("TELEGRAM_WEBAPP_URL", "https://spotnet.xyz")
+
+# Alert dispatcher: Telegram allows about 30 messages per second per bot
+# and 1 message per second per chat
+ALERT_RATE_LIMIT = float(getenv("TELEGRAM_ALERT_RATE_LIMIT", "30"))
+ALERT_CHAT_INTERVAL = float(getenv("TELEGRAM_ALERT_CHAT_INTERVAL", "1"))
+ALERT_SENDER_COUNT = int(getenv("TELEGRAM_ALERT_SENDER_COUNT", "10"))
+ALERT_MAX_RETRIES = int(getenv("TELEGRAM_ALERT_MAX_RETRIES", "3"))
+# An alert is suppressed if the chat was alerted less than the cool-down ago,
+# unless the health ratio dropped by more than the hysteresis since
+ALERT_COOLDOWN = float(getenv("TELEGRAM_ALERT_COOLDOWN", "3600"))
+ALERT_HYSTERESIS = float(getenv("TELEGRAM_ALERT_HYSTERESIS", "0.1"))
@@ -0,0 +1,327 @@
+"""
+This module dispatches health ratio alerts to Telegram chats.
+
+Alerts are queued and sent by concurrent senders sharing a global token bucket,
+so a burst of alerts stays within the Telegram limits instead of serializing
+behind retry sleeps. Alerts pending for the same chat are coalesced into one,
+and a chat alerted recently is only alerted again if its health ratio dropped
+further.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from decimal import Decimal
+from typing import Awaitable, Callable
+
+from aiogram.exceptions import TelegramRetryAfter
+from redis.asyncio import Redis
+
+from .config import (
+    ALERT_CHAT_INTERVAL,
+    ALERT_COOLDOWN,
+    ALERT_HYSTERESIS,
+    ALERT_MAX_RETRIES,
+    ALERT_RATE_LIMIT,
+    ALERT_SENDER_COUNT,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_AFTER = 10
+
+
+class TokenBucket:
+    """
+    Token bucket limiting the rate of an operation. It can be paused,
+    e.g. when Telegram asks to retry later.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        :param rate: Tokens added per second.
+        :param capacity: Maximum number of tokens, defaults to the rate.
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        """
+        Add the tokens accumulated since the last update.
+
+        :param now: The current monotonic time.
+        """
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """
+        Wait until a token is available and take it.
+        """
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for a while.
+
+        :param seconds: The pause duration.
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+class AlertHistory:
+    """
+    Last alert sent to each chat, kept in memory.
+    """
+
+    def __init__(self):
+        self._alerts: dict[str, tuple[Decimal, float]] = {}
+
+    async def get(self, chat_id: str) -> tuple[Decimal, float] | None:
+        """
+        Get the last alert sent to a chat.
+
+        :param chat_id: The chat ID.
+        :return: The health ratio alerted and the timestamp it was sent at,
+         None if the chat was never alerted.
+        """
+        return self._alerts.get(str(chat_id))
+
+    async def set(self, chat_id: str, health_ratio: Decimal, sent_at: float) -> None:
+        """
+        Record an alert sent to a chat.
+
+        :param chat_id: The chat ID.
+        :param health_ratio: The health ratio alerted.
+        :param sent_at: The timestamp the alert was sent at.
+        """
+        self._alerts[str(chat_id)] = (health_ratio, sent_at)
+
+
+class RedisAlertHistory(AlertHistory):
+    """
+    Last alert sent to each chat, kept in Redis so every worker shares it.
+    Entries expire after the cool-down.
+    """
+
+    KEY_PREFIX = "telegram_alert:"
+
+    def __init__(self, get_redis: Callable[[], Redis], ttl: float = ALERT_COOLDOWN):
+        """
+        :param get_redis: Returns the Redis client, decoding responses.
+        :param ttl: Seconds after which an entry expires.
+        """
+        super().__init__()
+        self.get_redis = get_redis
+        self.ttl = ttl
+
+    async def get(self, chat_id: str) -> tuple[Decimal, float] | None:
+        """
+        Get the last alert sent to a chat.
+
+        :param chat_id: The chat ID.
+        :return: The health ratio alerted and the timestamp it was sent at,
+         None if the chat wasn't alerted within the cool-down.
+        """
+        value = await self.get_redis().get(f"{self.KEY_PREFIX}{chat_id}")
+        if value is None:
+            return None
+        health_ratio, sent_at = json.loads(value)
+        return Decimal(health_ratio), sent_at
+
+    async def set(self, chat_id: str, health_ratio: Decimal, sent_at: float) -> None:
+        """
+        Record an alert sent to a chat.
+
+        :param chat_id: The chat ID.
+        :param health_ratio: The health ratio alerted.
+        :param sent_at: The timestamp the alert was sent at.
+        """
+        await self.get_redis().set(
+            f"{self.KEY_PREFIX}{chat_id}",
+            json.dumps([str(health_ratio), sent_at]),
+            ex=max(1, int(self.ttl)),
+        )
+
+
+class AlertDispatcher:
+    """
+    Queues alerts per chat and sends them with concurrent, rate limited senders.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, Decimal], Awaitable[None]],
+        history: AlertHistory = None,
+        rate_limit: float = ALERT_RATE_LIMIT,
+        chat_interval: float = ALERT_CHAT_INTERVAL,
+        sender_count: int = ALERT_SENDER_COUNT,
+        max_retries: int = ALERT_MAX_RETRIES,
+        cooldown: float = ALERT_COOLDOWN,
+        hysteresis: float = ALERT_HYSTERESIS,
+    ):
+        """
+        :param send: Sends the alert of a health ratio to a chat.
+        :param history: Last alerts sent, kept in memory by default.
+        :param rate_limit: Messages sent per second across all chats.
+        :param chat_interval: Minimum seconds between two messages to a chat.
+        :param sender_count: Number of concurrent senders.
+        :param max_retries: Retries of an alert Telegram asked to send later.
+        :param cooldown: Seconds during which an unchanged alert is suppressed.
+        :param hysteresis: Relative health ratio drop alerted again within the cool-down.
+        """
+        self.send = send
+        self.history = history if history is not None else AlertHistory()
+        self.bucket = TokenBucket(rate_limit)
+        self.chat_interval = chat_interval
+        self.sender_count = sender_count
+        self.max_retries = max_retries
+        self.cooldown = cooldown
+        self.hysteresis = Decimal(str(hysteresis))
+        self._pending: dict[str, Decimal] = {}
+        self._chat_sent_at: dict[str, float] = {}
+        self._queue: asyncio.Queue | None = None
+        self._senders: list[asyncio.Task] = []
+        self._stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats() -> dict:
+        """
+        Get empty dispatch counters.
+
+        :return: dict
+        """
+        return {"sent": 0, "suppressed": 0, "coalesced": 0, "failed": 0}
+
+    def submit(self, chat_id: str, health_ratio: Decimal | str | float) -> None:
+        """
+        Queue the alert of a health ratio for a chat. If an alert is already
+        pending for the chat, only the lowest health ratio is kept.
+
+        :param chat_id: The chat ID.
+        :param health_ratio: The health ratio to alert.
+        """
+        chat_id = str(chat_id)
+        health_ratio = Decimal(str(health_ratio))
+        if chat_id in self._pending:
+            self._pending[chat_id] = min(self._pending[chat_id], health_ratio)
+            self._stats["coalesced"] += 1
+            return
+        self._pending[chat_id] = health_ratio
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._senders = [
+                asyncio.create_task(self._run_sender())
+                for _ in range(self.sender_count)
+            ]
+        self._queue.put_nowait(chat_id)
+
+    async def flush(self) -> dict:
+        """
+        Wait until the queued alerts are sent, then stop the senders.
+
+        :return: Counts of the alerts sent, suppressed, coalesced and failed
+         since the last flush.
+        """
+        if self._queue is not None:
+            await self._queue.join()
+            for sender in self._senders:
+                sender.cancel()
+            await asyncio.gather(*self._senders, return_exceptions=True)
+            self._queue, self._senders = None, []
+        stats, self._stats = self._stats, self._new_stats()
+        return stats
+
+    async def _run_sender(self) -> None:
+        """
+        Send the queued alerts one at a time.
+        """
+        while True:
+            chat_id = await self._queue.get()
+            try:
+                await self._deliver(chat_id, self._pending.pop(chat_id))
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.error(f"Failed to send notification to {chat_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _is_suppressed(self, chat_id: str, health_ratio: Decimal) -> bool:
+        """
+        Check whether an alert repeats one sent to the chat within the cool-down.
+
+        :param chat_id: The chat ID.
+        :param health_ratio: The health ratio to alert.
+        :return: bool
+        """
+        last_alert = await self.history.get(chat_id)
+        if last_alert is None:
+            return False
+        last_health_ratio, sent_at = last_alert
+        if time.time() - sent_at >= self.cooldown:
+            return False
+        return health_ratio >= last_health_ratio * (1 - self.hysteresis)
+
+    async def _wait_for_chat(self, chat_id: str) -> None:
+        """
+        Wait until the chat can receive another message.
+
+        :param chat_id: The chat ID.
+        """
+        ready_at = self._chat_sent_at.get(chat_id, 0.0) + self.chat_interval
+        delay = ready_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _deliver(self, chat_id: str, health_ratio: Decimal) -> None:
+        """
+        Send an alert unless it is suppressed, retrying when Telegram asks to.
+
+        :param chat_id: The chat ID.
+        :param health_ratio: The health ratio to alert.
+        """
+        if await self._is_suppressed(chat_id, health_ratio):
+            self._stats["suppressed"] += 1
+            return
+
+        for retries_left in range(self.max_retries, -1, -1):
+            await self._wait_for_chat(chat_id)
+            await self.bucket.acquire()
+            try:
+                await self.send(chat_id, health_ratio)
+            except TelegramRetryAfter as e:
+                if retries_left < 1:
+                    raise
+                retry_after = (
+                    e.retry_after
+                    if e.retry_after and 0 < e.retry_after
+                    else DEFAULT_RETRY_AFTER
+                )
+                # Flood control applies to the whole bot, so every sender waits
+                self.bucket.pause(retry_after)
+                continue
+            finally:
+                self._chat_sent_at[chat_id] = time.monotonic()
+            break
+
+        await self.history.set(chat_id, health_ratio, time.time())
+        self._stats["sent"] += 1
+        logger.info(
+            f"Notification sent to user {chat_id} with health ratio {health_ratio}"
+        )
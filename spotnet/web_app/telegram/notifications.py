@@ -2,43 +2,34 @@
 This module provides functionalities to send telegram notifications
 """
 
-import asyncio
 from decimal import Decimal
 
-from aiogram.exceptions import TelegramRetryAfter
 from web_app.db.crud import TelegramUserDBConnector
-from web_app.telegram import bot, logger
+from web_app.telegram import bot
 
+from .dispatcher import AlertDispatcher
 from .texts import HEALTH_RATIO_WARNING_MESSAGE
 
 telegram_db = TelegramUserDBConnector()
 
-DEFAULT_RETRY_AFTER = 10
-DEFAULT_RETRY_COUNT = 1
+
+async def send_health_ratio_message(telegram_id: str, health_ratio: Decimal) -> None:
+    """
+    Send a message about the health ratio to a user
+    """
+    await bot.send_message(
+        chat_id=telegram_id,
+        text=HEALTH_RATIO_WARNING_MESSAGE.format(health_ratio=health_ratio),
+    )
+
+
+# Health ratio alerts go through the dispatcher to respect the Telegram limits
+ALERT_DISPATCHER = AlertDispatcher(send_health_ratio_message)
 
 
-async def send_health_ratio_notification(
-    telegram_id: str, health_ratio: Decimal, retry_count: int = DEFAULT_RETRY_COUNT
-) -> None:
+def send_health_ratio_notification(telegram_id: str, health_ratio: Decimal) -> None:
     """
-    Send notification about health ratio to user
+    Queue a notification about health ratio to user.
+    Queued notifications are sent by `ALERT_DISPATCHER.flush`.
     """
-    try:
-        await bot.send_message(
-            chat_id=telegram_id,
-            text=HEALTH_RATIO_WARNING_MESSAGE.format(health_ratio=health_ratio),
-        )
-    except TelegramRetryAfter as e:
-        if retry_count < 1:
-            return logger.error(f"Failed to send notification to {telegram_id}: {e}")
-
-        retry_after = DEFAULT_RETRY_AFTER
-        if e.retry_after and 0 < e.retry_after:
-            retry_after = e.retry_after
-
-        await asyncio.sleep(retry_after)
-        await send_health_ratio_notification(
-            telegram_id, health_ratio, retry_count=retry_count - 1
-        )
-    except Exception as e:
-        logger.error(f"Failed to send notification to {telegram_id}: {e}")
+    ALERT_DISPATCHER.submit(telegram_id, health_ratio)
@@ -45,6 +45,9 @@ def client() -> None:
     with patch(
         "starknet_py.contract.Contract.from_address", new_callable=AsyncMock
     ) as mock_from_address, patch(
+        "web_app.contract_tools.abi_cache.AbiCache.get_contract",
+        new_callable=AsyncMock,
+    ) as mock_get_contract, patch(
         "starknet_py.net.full_node_client.FullNodeClient.get_class_hash_at",
         new_callable=AsyncMock,
     ) as mock_class_hash, patch(
@@ -52,6 +55,7 @@ def client() -> None:
     ) as mock_request:
         # Mock return values
         mock_from_address.return_value = MagicMock()
+        mock_get_contract.return_value = MagicMock()
         mock_class_hash.return_value = "0x123"
         mock_request.return_value = {}
 
@@ -0,0 +1,41 @@
+"""
+This module contains the fixtures for the database tests.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.dialects import sqlite
+
+from web_app.db.crud import PositionDBConnector
+from web_app.db.models import (
+    AirDrop,
+    ExtraDeposit,
+    OpenPositionTotal,
+    Position,
+    TokenPositionCount,
+    User,
+    UserPositionCount,
+)
+
+
+@pytest.fixture
+def sqlite_position_db():
+    """
+    Returns a PositionDBConnector bound to an in-memory database, its upserts
+    compiled for SQLite.
+    """
+    connector = PositionDBConnector(db_url="sqlite://")
+    for model in (
+        User,
+        Position,
+        ExtraDeposit,
+        AirDrop,
+        OpenPositionTotal,
+        UserPositionCount,
+        TokenPositionCount,
+    ):
+        model.__table__.create(connector.engine)
+    with patch("web_app.db.crud.position.insert", sqlite.insert):
+        yield connector
+    connector.engine.dispose()
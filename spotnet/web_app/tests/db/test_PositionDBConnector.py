@@ -1,16 +1,25 @@
 """Test cases for PositionDBConnector"""
 
 import uuid
+from datetime import datetime
 from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import scoped_session
 
-from web_app.db.crud import PositionDBConnector
-from web_app.db.models import Position, Status, Transaction, TransactionStatus, User
-
+from web_app.db.crud import DashboardSnapshot, PositionDBConnector
+from web_app.db.models import (
+    AirDrop,
+    ExtraDeposit,
+    Position,
+    Status,
+    Transaction,
+    TransactionStatus,
+    User,
+)
 
 @pytest.fixture(scope="function")
 def sample_user():
@@ -366,3 +375,148 @@ def test_delete_all_user_positions_failure(mock_position_db_connector):
     position_connector.delete_all_user_positions(user_id)
 
     # mock_session.rollback.assert_called_once()
+
+
+def test_get_dashboard_snapshot():
+    """
+    The contract address, the latest opened position and its extra deposits
+    are loaded in a single query.
+    """
+    connector = PositionDBConnector(db_url="sqlite://")
+    for model in (User, Position, ExtraDeposit):
+        model.__table__.create(connector.engine)
+    with connector.Session() as db:
+        user = User(wallet_id="0x1", contract_address="0xc")
+        db.add_all([user, User(wallet_id="0x2", contract_address="0xd")])
+        db.flush()
+        positions = [
+            Position(
+                user_id=user.id,
+                token_symbol=token_symbol,
+                amount="1",
+                multiplier=2,
+                status=status,
+                start_price=1,
+                created_at=datetime(2024, month, 1),
+            )
+            for token_symbol, status, month in (
+                ("ETH", Status.OPENED.value, 1),
+                ("STRK", Status.OPENED.value, 2),
+                ("USDC", Status.CLOSED.value, 3),
+            )
+        ]
+        db.add_all(positions)
+        db.flush()
+        db.add_all(
+            [
+                ExtraDeposit(
+                    position_id=positions[0].id, token_symbol="ETH", amount="9"
+                ),
+                ExtraDeposit(
+                    position_id=positions[1].id, token_symbol="ETH", amount="1"
+                ),
+            ]
+        )
+        db.commit()
+
+    queries = []
+
+    def count_query(*args):
+        queries.append(args)
+
+    event.listen(connector.engine, "before_cursor_execute", count_query)
+    snapshot = connector.get_dashboard_snapshot("0x1")
+    event.remove(connector.engine, "before_cursor_execute", count_query)
+
+    assert len(queries) == 1
+    assert snapshot.contract_address == "0xc"
+    assert snapshot.position["token_symbol"] == "STRK"
+    assert [Decimal(deposit.amount) for deposit in snapshot.extra_deposits] == [1]
+    assert connector.get_dashboard_snapshot("0x2") == DashboardSnapshot(
+        contract_address="0xd"
+    )
+    assert connector.get_dashboard_snapshot("0x3") == DashboardSnapshot()
+    connector.engine.dispose()
+
+
+def test_open_position_totals(sqlite_position_db):
+    """
+    Opening and closing positions maintain the totals of the opened positions
+    and their extra deposits, which match the totals rebuilt from them.
+    """
+    connector = sqlite_position_db
+    with connector.Session() as db:
+        user = User(wallet_id="0x1", contract_address="0xc")
+        db.add(user)
+        db.flush()
+        positions = [
+            Position(
+                user_id=user.id,
+                token_symbol="ETH",
+                amount=amount,
+                multiplier=2,
+                status=Status.PENDING.value,
+                start_price=0,
+            )
+            for amount in ("2", "1.5")
+        ]
+        db.add_all(positions)
+        db.flush()
+        db.add(
+            ExtraDeposit(position_id=positions[0].id, token_symbol="USDC", amount="10")
+        )
+        db.commit()
+        first_id, second_id = positions[0].id, positions[1].id
+
+    prices = {"ETH": Decimal("2000")}
+    assert connector.open_position(first_id, prices) == Status.OPENED
+    assert connector.open_position(first_id, prices) == Status.OPENED
+    assert connector.open_position(second_id, prices) == Status.OPENED
+    assert connector.get_total_amounts_for_open_positions() == {
+        "ETH": Decimal("3.5"),
+        "USDC": Decimal("10"),
+    }
+    assert connector.get_object(Position, first_id).start_price == Decimal("2000")
+
+    assert connector.close_position(first_id) == Status.CLOSED
+    assert connector.close_position(first_id) == Status.CLOSED
+    assert connector.close_position(uuid.uuid4()) is None
+    totals = connector.get_total_amounts_for_open_positions()
+    assert totals == {"ETH": Decimal("1.5")}
+    assert connector.rebuild_open_position_totals() == totals
+    with connector.Session() as db:
+        assert db.query(AirDrop).count() == 2
+
+
+def test_add_extra_deposit_to_position_totals(sqlite_position_db):
+    """
+    Extra deposits are added to the totals only once their position is opened.
+    """
+    connector = sqlite_position_db
+    with connector.Session() as db:
+        user = User(wallet_id="0x1", contract_address="0xc")
+        db.add(user)
+        db.flush()
+        position = Position(
+            user_id=user.id,
+            token_symbol="ETH",
+            amount="1",
+            multiplier=2,
+            status=Status.PENDING.value,
+            start_price=0,
+        )
+        db.add(position)
+        db.commit()
+        db.refresh(position)
+
+    connector.add_extra_deposit_to_position(position, "USDC", "5")
+    assert connector.get_total_amounts_for_open_positions() == {}
+    connector.open_position(position.id, {"ETH": 1})
+    connector.add_extra_deposit_to_position(position, "USDC", "2.5")
+    connector.add_extra_deposit_to_position(position, "ETH", "1")
+
+    assert connector.get_total_amounts_for_open_positions() == {
+        "ETH": Decimal("2"),
+        "USDC": Decimal("7.5"),
+    }
+    assert Decimal(connector.get_extra_deposits_data(position.id)["USDC"]) == 7.5
@@ -0,0 +1,115 @@
+"""
+Test cases for HealthHistoryDBConnector, on an in-memory SQLite database
+"""
+
+import pytest
+
+from web_app.db.crud import HealthHistoryDBConnector
+from web_app.db.models import HealthRatioHistory
+
+
+def make_sample(health_ratio: float) -> dict:
+    """
+    Build a health ratio sample.
+    :param health_ratio: The health ratio
+    :return: dict
+    """
+    return {
+        "health_ratio": health_ratio,
+        "ltv": 0.5,
+        "collateral_usd": 100.0,
+        "debt_usd": 50.0,
+    }
+
+
+@pytest.fixture
+def health_history_db():
+    """
+    Returns a HealthHistoryDBConnector bound to an in-memory database.
+    """
+    connector = HealthHistoryDBConnector(db_url="sqlite://")
+    HealthRatioHistory.__table__.create(connector.engine)
+    yield connector
+    connector.engine.dispose()
+
+
+def test_rollup_completed_buckets(health_history_db):
+    """
+    Samples are rolled up once their bucket is completed, and only once.
+    """
+    health_history_db.write_samples(
+        {"0x1": make_sample(2.0), "0x2": make_sample(3.0)}, timestamp=1000
+    )
+    health_history_db.write_samples({"0x1": make_sample(1.0)}, timestamp=1010)
+    health_history_db.write_samples({"0x1": make_sample(4.0)}, timestamp=1090)
+
+    assert health_history_db.rollup("1m", now=1100) == 2
+    assert health_history_db.rollup("1m", now=1100) == 0
+    assert health_history_db.rollup("1m", now=1150) == 0
+    assert health_history_db.rollup("1m", now=1200) == 1
+
+    history = health_history_db.get_history("0x1", "1m")
+    assert [
+        (row.timestamp, row.health_ratio, row.min_health_ratio, row.samples)
+        for row in history
+    ] == [(960, 1.5, 1.0, 2), (1080, 4.0, 4.0, 1)]
+
+
+def test_rollup_includes_late_samples(health_history_db, monkeypatch):
+    """
+    A sample committed after its bucket ended, within the rollup delay,
+    is rolled up with its bucket.
+    """
+    monkeypatch.setenv("HEALTH_HISTORY_ROLLUP_DELAY", "30")
+    health_history_db.write_samples({"0x1": make_sample(2.0)}, timestamp=60)
+
+    assert health_history_db.rollup("1m", now=125) == 0
+    health_history_db.write_samples({"0x1": make_sample(4.0)}, timestamp=110)
+    assert health_history_db.rollup("1m", now=150) == 1
+
+    (bucket,) = health_history_db.get_history("0x1", "1m")
+    assert (bucket.timestamp, bucket.health_ratio, bucket.samples) == (60, 3.0, 2)
+
+
+def test_rollup_weights_by_samples(health_history_db):
+    """
+    Coarser buckets average the finer ones weighted by their samples.
+    """
+    health_history_db.write_samples({"0x1": make_sample(2.0)}, timestamp=0)
+    health_history_db.write_samples({"0x1": make_sample(1.0)}, timestamp=10)
+    health_history_db.write_samples({"0x1": make_sample(4.0)}, timestamp=70)
+    health_history_db.rollup("1m", now=3660)
+
+    assert health_history_db.rollup("1h", now=3660) == 1
+    (bucket,) = health_history_db.get_history("0x1", "1h")
+    assert bucket.health_ratio == pytest.approx(7 / 3)
+    assert bucket.min_health_ratio == 1.0
+    assert bucket.samples == 3
+
+
+def test_delete_expired(health_history_db, monkeypatch):
+    """
+    Rows are deleted once older than the retention of their resolution.
+    """
+    monkeypatch.setenv("HEALTH_HISTORY_RETENTION_RAW", "100")
+    health_history_db.write_samples({"0x1": make_sample(2.0)}, timestamp=0)
+    health_history_db.write_samples({"0x1": make_sample(2.0)}, timestamp=500)
+    health_history_db.rollup("1m", now=600)
+
+    assert health_history_db.delete_expired(now=600) == 1
+    assert [row.timestamp for row in health_history_db.get_history("0x1", "raw")] == [
+        500
+    ]
+    assert len(health_history_db.get_history("0x1", "1m")) == 2
+
+
+def test_get_history_latest_rows(health_history_db):
+    """
+    The latest rows since a given time are returned in chronological order.
+    """
+    for timestamp in range(0, 50, 10):
+        health_history_db.write_samples({"0x1": make_sample(2.0)}, timestamp=timestamp)
+
+    history = health_history_db.get_history("0x1", "raw", since=10, limit=3)
+
+    assert [row.timestamp for row in history] == [20, 30, 40]
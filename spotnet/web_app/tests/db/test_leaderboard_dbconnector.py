@@ -0,0 +1,117 @@
+"""
+Test cases for LeaderboardDBConnector and the counters maintained by
+PositionDBConnector, on an in-memory SQLite database
+"""
+
+import pytest
+from sqlalchemy import update
+
+from web_app.db.crud import PositionDBConnector
+from web_app.db.crud.leaderboard import LeaderboardDBConnector
+from web_app.db.models import (
+    Position,
+    Status,
+    TokenPositionCount,
+    User,
+    UserPositionCount,
+)
+
+PRICES = {"ETH": 2000, "STRK": 0.5}
+
+
+@pytest.fixture
+def position_db(sqlite_position_db):
+    """
+    Returns the SQLite PositionDBConnector holding the positions of two users,
+    all pending.
+    """
+    with sqlite_position_db.Session() as db:
+        users = [User(wallet_id="0x1"), User(wallet_id="0x2")]
+        db.add_all(users)
+        db.flush()
+        db.add_all(
+            Position(
+                user_id=users[user_index].id,
+                token_symbol=token_symbol,
+                amount="1",
+                multiplier=2,
+                status=Status.PENDING.value,
+                start_price=0,
+            )
+            for user_index, token_symbol in ((0, "ETH"), (1, "ETH"), (1, "STRK"))
+        )
+        db.commit()
+    return sqlite_position_db
+
+
+def get_position_ids(connector: PositionDBConnector) -> dict:
+    """
+    Get the IDs of the positions by wallet ID and token symbol.
+    :param connector: PositionDBConnector
+    :return: dict
+    """
+    with connector.Session() as db:
+        return {
+            (wallet_id, token_symbol): position_id
+            for wallet_id, token_symbol, position_id in db.query(
+                User.wallet_id, Position.token_symbol, Position.id
+            ).join(Position, Position.user_id == User.id)
+        }
+
+
+def test_counters_follow_position_transitions(position_db):
+    """
+    Positions are counted once opened, and still once closed, until deleted.
+    """
+    leaderboard_db = LeaderboardDBConnector(db_url="sqlite://")
+    position_ids = get_position_ids(position_db)
+    assert leaderboard_db.get_top_users_by_positions() == []
+
+    position_db.open_position(position_ids["0x1", "ETH"], PRICES)
+    position_db.open_position(position_ids["0x2", "ETH"], PRICES)
+    position_db.open_position(position_ids["0x2", "ETH"], PRICES)
+    position_db.close_position(position_ids["0x2", "ETH"])
+    position_db.close_position(position_ids["0x2", "STRK"])
+
+    assert leaderboard_db.get_top_users_by_positions() == [
+        {"wallet_id": "0x2", "positions_number": 2},
+        {"wallet_id": "0x1", "positions_number": 1},
+    ]
+    assert sorted(
+        leaderboard_db.get_position_token_statistics(),
+        key=lambda statistic: statistic["token_symbol"],
+    ) == [
+        {"token_symbol": "ETH", "total_positions": 2},
+        {"token_symbol": "STRK", "total_positions": 1},
+    ]
+    assert leaderboard_db.reconcile_position_counts() == {"users": 0, "tokens": 0}
+
+    position_db.delete_all_user_positions(position_db.get_user_by_wallet_id("0x2").id)
+    assert leaderboard_db.get_top_users_by_positions() == [
+        {"wallet_id": "0x1", "positions_number": 1}
+    ]
+    assert leaderboard_db.get_position_token_statistics() == [
+        {"token_symbol": "ETH", "total_positions": 1}
+    ]
+
+
+def test_reconcile_position_counts(position_db):
+    """
+    Drifted counters are corrected from the positions.
+    """
+    leaderboard_db = LeaderboardDBConnector(db_url="sqlite://")
+    position_ids = get_position_ids(position_db)
+    position_db.open_position(position_ids["0x1", "ETH"], PRICES)
+    position_db.open_position(position_ids["0x2", "ETH"], PRICES)
+    with position_db.Session() as db:
+        db.execute(update(UserPositionCount).values(positions_number=5))
+        db.add(TokenPositionCount(token_symbol="USDC", total_positions=1))
+        db.commit()
+
+    assert leaderboard_db.reconcile_position_counts() == {"users": 2, "tokens": 1}
+    assert sorted(
+        user["positions_number"] for user in leaderboard_db.get_top_users_by_positions()
+    ) == [1, 1]
+    assert leaderboard_db.get_position_token_statistics() == [
+        {"token_symbol": "ETH", "total_positions": 2}
+    ]
@@ -0,0 +1,82 @@
+"""
+Test cases for TaskRunDBConnector, on an in-memory SQLite database
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from web_app.db.crud import TaskRunDBConnector
+from web_app.db.models import TaskRun, TaskRunStatus
+
+STARTED_AT = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def task_run_db():
+    """
+    Returns a TaskRunDBConnector bound to an in-memory database.
+    """
+    connector = TaskRunDBConnector(db_url="sqlite://")
+    TaskRun.__table__.create(connector.engine)
+    yield connector
+    connector.engine.dispose()
+
+
+def test_create_task_run(task_run_db):
+    """
+    The duration of a run is derived from its start and end.
+    """
+    task_run = task_run_db.create_task_run(
+        "sweep",
+        TaskRunStatus.SUCCEEDED,
+        STARTED_AT,
+        finished_at=STARTED_AT + timedelta(seconds=42),
+        positions=10,
+        rpc_calls=30,
+        details={"alerts": 1},
+    )
+
+    assert task_run.duration == 42
+    assert task_run.details == {"alerts": 1}
+
+
+def test_get_task_runs(task_run_db):
+    """
+    The latest runs of a task come first.
+    """
+    for minutes in range(3):
+        task_run_db.create_task_run(
+            "sweep", TaskRunStatus.SKIPPED, STARTED_AT + timedelta(minutes=minutes)
+        )
+    task_run_db.create_task_run("monitor", TaskRunStatus.SKIPPED, STARTED_AT)
+
+    task_runs = task_run_db.get_task_runs("sweep", limit=2)
+
+    assert [task_run.started_at.minute for task_run in task_runs] == [2, 1]
+
+
+def test_get_task_run_stats(task_run_db):
+    """
+    Runs are counted by status, and durations averaged, since a given time.
+    """
+    for seconds, status in ((10, TaskRunStatus.SUCCEEDED), (30, TaskRunStatus.FAILED)):
+        task_run_db.create_task_run(
+            "sweep",
+            status,
+            STARTED_AT,
+            finished_at=STARTED_AT + timedelta(seconds=seconds),
+        )
+    task_run_db.create_task_run("sweep", TaskRunStatus.SKIPPED, STARTED_AT)
+    task_run_db.create_task_run(
+        "sweep", TaskRunStatus.SKIPPED, STARTED_AT - timedelta(days=1)
+    )
+
+    assert task_run_db.get_task_run_stats("sweep", STARTED_AT) == {
+        "runs": 3,
+        "succeeded": 1,
+        "failed": 1,
+        "skipped": 1,
+        "avg_duration": 20,
+        "max_duration": 30,
+    }
@@ -0,0 +1,147 @@
+"""
+Test cases for the contract ABI cache in web_app.contract_tools.abi_cache
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from starknet_py.net.client_models import SierraContractClass
+from starknet_py.net.full_node_client import FullNodeClient
+
+from web_app.api.main import app, startup_event
+from web_app.contract_tools.abi_cache import AbiCache
+from web_app.contract_tools.constants import EKUBO_MAINNET_ADDRESS
+
+ADDRESS = "0x123"
+ABI = [
+    {
+        "type": "function",
+        "name": "get_value",
+        "inputs": [],
+        "outputs": [{"type": "core::felt252"}],
+        "state_mutability": "view",
+    }
+]
+
+
+def make_client(class_hash: int) -> FullNodeClient:
+    """
+    Build a client serving a Sierra class with the test ABI.
+    :param class_hash: Class hash of the contract
+    :return: FullNodeClient
+    """
+    contract_class = MagicMock(spec=SierraContractClass)
+    contract_class.abi = json.dumps(ABI)
+    client = FullNodeClient(node_url="http://starknet-node")
+    client.get_class_hash_at = AsyncMock(return_value=class_hash)
+    client.get_class_by_hash = AsyncMock(return_value=contract_class)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_contract_is_built_from_cached_abi(tmp_path) -> None:
+    """
+    The class is fetched once, later instances are built from the cache.
+    """
+    client = make_client(class_hash=0xA)
+    AbiCache(str(tmp_path)).store(ADDRESS, 0xA, 1, ABI)
+
+    contract = await AbiCache(str(tmp_path)).get_contract(ADDRESS, client)
+    await asyncio.sleep(0)
+
+    assert "get_value" in contract.functions
+    client.get_class_by_hash.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_missing_abi_is_fetched_and_stored(tmp_path) -> None:
+    """
+    Without a cache entry the ABI is read from the chain and written to disk.
+    """
+    cache = AbiCache(str(tmp_path))
+    client = make_client(class_hash=0xA)
+
+    contract = await cache.get_contract(ADDRESS, client)
+
+    assert "get_value" in contract.functions
+    assert cache.load(ADDRESS) == {"class_hash": 0xA, "cairo_version": 1, "abi": ABI}
+
+
+def test_abi_is_stored_by_class_hash(tmp_path) -> None:
+    """
+    Contracts sharing a class share its cache file, and the address index
+    points each contract to its class.
+    """
+    cache = AbiCache(str(tmp_path))
+    cache.store(ADDRESS, 0xA, 1, ABI)
+    cache.store("0x456", 0xA, 1, ABI)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        f"{0xA:#066x}.json",
+        AbiCache.CONTRACTS_FILE,
+    ]
+    assert json.loads((tmp_path / AbiCache.CONTRACTS_FILE).read_text()) == {
+        f"{0x123:#066x}": f"{0xA:#066x}",
+        f"{0x456:#066x}": f"{0xA:#066x}",
+    }
+    assert cache.load("0x456") == {"class_hash": 0xA, "cairo_version": 1, "abi": ABI}
+
+
+@pytest.mark.asyncio
+async def test_changed_class_is_refreshed_in_background(tmp_path) -> None:
+    """
+    When the contract class changed, the cache is updated and a new instance
+    is handed to the caller.
+    """
+    cache = AbiCache(str(tmp_path))
+    cache.store(ADDRESS, 0xA, 1, [])
+    client = make_client(class_hash=0xB)
+    on_update = MagicMock()
+
+    await cache.get_contract(ADDRESS, client, on_update=on_update)
+    await asyncio.gather(*cache._tasks)
+
+    assert cache.load(ADDRESS)["class_hash"] == 0xB
+    on_update.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_unwritable_cache_still_serves_abi(tmp_path) -> None:
+    """
+    When the cache can't be written, the ABI read from the chain is still served.
+    """
+    (tmp_path / "file").write_text("")
+    cache = AbiCache(str(tmp_path / "file" / "abi"))
+
+    contract = await cache.get_contract(ADDRESS, make_client(class_hash=0xA))
+
+    assert "get_value" in contract.functions
+    assert cache.load(ADDRESS) is None
+
+
+@pytest.mark.asyncio
+async def test_startup_with_node_down(tmp_path) -> None:
+    """
+    The API starts from the bundled Ekubo ABI while the node is unreachable.
+    """
+    cache = AbiCache(str(tmp_path))
+    cache.store(EKUBO_MAINNET_ADDRESS, 0xA, 1, ABI)
+    client = FullNodeClient(node_url="http://starknet-node")
+    client.get_class_hash_at = AsyncMock(side_effect=ConnectionError("node down"))
+    client.get_class_by_hash = AsyncMock(side_effect=ConnectionError("node down"))
+    mock_client = MagicMock()
+    mock_client.client = client
+
+    with patch("web_app.api.main.ABI_CACHE", cache), patch(
+        "web_app.api.main.CLIENT", mock_client
+    ), patch("web_app.api.main.APIRequest.start_session", new_callable=AsyncMock):
+        await startup_event()
+        await asyncio.gather(*cache._tasks)
+
+    assert "get_value" in app.state.ekubo_contract.functions
+    client.get_class_by_hash.assert_not_awaited()
+    mock_client.pool_price_oracle.start.assert_called_once_with(
+        app.state.ekubo_contract
+    )
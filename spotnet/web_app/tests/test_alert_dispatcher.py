@@ -0,0 +1,161 @@
+"""
+Test cases for the Telegram alert dispatcher in web_app.telegram.dispatcher
+"""
+
+import asyncio
+import time
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, call
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+
+from web_app.telegram.dispatcher import AlertDispatcher, AlertHistory, TokenBucket
+
+
+def make_dispatcher(send: AsyncMock, **kwargs) -> AlertDispatcher:
+    """
+    Build a dispatcher without rate limits.
+    :param send: The mocked send function
+    :return: AlertDispatcher
+    """
+    options = {
+        "rate_limit": 1000,
+        "chat_interval": 0,
+        "sender_count": 4,
+        "max_retries": 1,
+        "cooldown": 3600,
+        "hysteresis": 0.1,
+    }
+    options.update(kwargs)
+    return AlertDispatcher(send, **options)
+
+
+@pytest.mark.asyncio
+async def test_pending_alerts_are_coalesced() -> None:
+    """
+    Alerts pending for the same chat are sent once with the lowest health ratio.
+    """
+    send = AsyncMock()
+    dispatcher = make_dispatcher(send)
+
+    dispatcher.submit("1", "3.0")
+    dispatcher.submit("1", 2.5)
+    dispatcher.submit(2, "3.1")
+    stats = await dispatcher.flush()
+
+    assert stats == {"sent": 2, "suppressed": 0, "coalesced": 1, "failed": 0}
+    send.assert_has_awaits(
+        [call("1", Decimal("2.5")), call("2", Decimal("3.1"))], any_order=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeated_alerts_are_suppressed() -> None:
+    """
+    A chat alerted within the cool-down is only alerted again when its health
+    ratio dropped by more than the hysteresis.
+    """
+    send = AsyncMock()
+    dispatcher = make_dispatcher(send)
+    dispatcher.submit("1", "3.0")
+    await dispatcher.flush()
+
+    dispatcher.submit("1", "2.8")
+    assert (await dispatcher.flush())["suppressed"] == 1
+
+    dispatcher.submit("1", "2.6")
+    assert (await dispatcher.flush())["sent"] == 1
+    assert send.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_alert_sent_again_after_cooldown() -> None:
+    """
+    An unchanged alert is sent again once the cool-down elapsed.
+    """
+    send = AsyncMock()
+    history = AlertHistory()
+    await history.set("1", Decimal("3.0"), time.time() - 3601)
+    dispatcher = make_dispatcher(send, history=history)
+
+    dispatcher.submit("1", "3.0")
+
+    assert (await dispatcher.flush())["sent"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_every_sender() -> None:
+    """
+    When Telegram asks to retry later, the bucket is paused and the alert retried.
+    """
+    send = AsyncMock(
+        side_effect=[
+            TelegramRetryAfter(method=MagicMock(), message="Flood", retry_after=7),
+            None,
+        ]
+    )
+    dispatcher = make_dispatcher(send)
+    dispatcher.bucket.pause = MagicMock()
+
+    dispatcher.submit("1", "3.0")
+    stats = await dispatcher.flush()
+
+    assert stats["sent"] == 1
+    dispatcher.bucket.pause.assert_called_once_with(7)
+    assert send.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_alert_does_not_stop_others() -> None:
+    """
+    A failing chat is counted without preventing alerts to other chats.
+    """
+
+    async def send(chat_id, _health_ratio):
+        if chat_id == "1":
+            raise ValueError("chat not found")
+
+    dispatcher = make_dispatcher(send)
+    dispatcher.submit("1", "3.0")
+    dispatcher.submit("2", "3.0")
+
+    assert await dispatcher.flush() == {
+        "sent": 1,
+        "suppressed": 0,
+        "coalesced": 0,
+        "failed": 1,
+    }
+    assert await dispatcher.history.get("1") is None
+
+
+@pytest.mark.asyncio
+async def test_alerts_are_sent_concurrently() -> None:
+    """
+    Alerts to different chats are sent by concurrent senders.
+    """
+
+    async def send(_chat_id, _health_ratio):
+        await asyncio.sleep(0.05)
+
+    dispatcher = make_dispatcher(send, sender_count=5)
+    for chat_id in range(5):
+        dispatcher.submit(chat_id, "3.0")
+
+    started_at = time.monotonic()
+    assert (await dispatcher.flush())["sent"] == 5
+    assert time.monotonic() - started_at < 0.2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate() -> None:
+    """
+    Tokens beyond the capacity are handed out at the bucket rate.
+    """
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    started_at = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire()
+
+    assert time.monotonic() - started_at >= 0.035
@@ -0,0 +1,26 @@
+"""
+Test cases for the shared HTTP session of web_app.contract_tools.api_request.APIRequest
+"""
+
+import pytest
+
+from web_app.contract_tools.api_request import APIRequest
+
+
+@pytest.mark.asyncio
+async def test_session_is_shared_and_closed() -> None:
+    """
+    All APIRequest instances reuse one pooled session until it is closed.
+    """
+    session = await APIRequest.start_session()
+
+    assert await APIRequest.start_session() is session
+    assert session.connector.limit == APIRequest.CONNECTION_LIMIT
+    assert session.connector.limit_per_host == APIRequest.CONNECTION_LIMIT_PER_HOST
+
+    await APIRequest.close_session()
+
+    assert session.closed
+    new_session = await APIRequest.start_session()
+    assert new_session is not session
+    await APIRequest.close_session()
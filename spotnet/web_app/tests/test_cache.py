@@ -0,0 +1,77 @@
+"""
+Test cases for the caching helpers in web_app.contract_tools.cache
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from web_app.contract_tools.cache import BlockScopedCache, SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_load() -> None:
+    """
+    Concurrent callers of the same key share a single load.
+    """
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    single_flight = SingleFlight()
+    results = await asyncio.gather(*[single_flight.do("key", loader) for _ in range(5)])
+
+    assert results == [1] * 5
+    assert calls == 1
+    assert await single_flight.do("key", loader) == 2
+
+
+@pytest.mark.asyncio
+async def test_block_scoped_cache_reuses_value_within_block() -> None:
+    """
+    The value is fetched once per block.
+    """
+    get_block_number = AsyncMock(side_effect=[100, 100, 101])
+    loader = AsyncMock(side_effect=["first", "second"])
+    cache = BlockScopedCache(get_block_number, ttl=60, block_poll_interval=0)
+
+    assert await cache.get("reserves", loader) == "first"
+    assert await cache.get("reserves", loader) == "first"
+    assert await cache.get("reserves", loader) == "second"
+    assert loader.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_block_scoped_cache_polls_block_number_once_per_interval() -> None:
+    """
+    The block number is not re-read within the poll interval.
+    """
+    get_block_number = AsyncMock(return_value=100)
+    loader = AsyncMock(return_value="value")
+    cache = BlockScopedCache(get_block_number, ttl=60, block_poll_interval=60)
+
+    await asyncio.gather(*[cache.get("reserves", loader) for _ in range(5)])
+
+    assert get_block_number.await_count == 1
+    assert loader.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_block_scoped_cache_falls_back_to_ttl() -> None:
+    """
+    Without a block number the entry is served until its TTL expires.
+    """
+    get_block_number = AsyncMock(side_effect=ConnectionError("node is down"))
+    loader = AsyncMock(side_effect=["first", "second"])
+    cache = BlockScopedCache(get_block_number, ttl=60, block_poll_interval=0)
+
+    assert await cache.get("reserves", loader) == "first"
+    assert await cache.get("reserves", loader) == "first"
+
+    cache.ttl = 0
+    assert await cache.get("reserves", loader) == "second"
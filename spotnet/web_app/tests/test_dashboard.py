@@ -9,9 +9,9 @@ under various conditions.
 """
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import FastAPI, Request
@@ -19,8 +19,9 @@ from fastapi.responses import JSONResponse
 from fastapi.testclient import TestClient
 from httpx import ASGITransport, AsyncClient
 
-from web_app.api.dashboard import get_dashboard, router
+from web_app.api.dashboard import get_dashboard, get_health_ratio_history, router
 from web_app.api.serializers.dashboard import DashboardResponse
+from web_app.db.crud import DashboardSnapshot
 from web_app.db.models import ExtraDeposit
 from web_app.contract_tools.mixins import HealthRatioMixin
 from web_app.contract_tools.mixins.dashboard import DashboardMixin
@@ -84,18 +85,14 @@ async def test_get_dashboard_success():
 
     wallet_id = "0x1234567890abcdef"
     id = uuid.uuid4()
-    mock_position_balance = 500
+    position_amount = "2.0"
     multiplier = 1
 
     with patch(
-        "web_app.api.dashboard.position_db_connector.get_contract_address_by_wallet_id"
-    ) as mock_get_contract_address_by_wallet_id, patch(
-        "web_app.api.dashboard.position_db_connector.get_positions_by_wallet_id"
-    ) as mock_get_positions_by_wallet_id, patch(
+        "web_app.api.dashboard.position_db_connector.get_dashboard_snapshot"
+    ) as mock_get_dashboard_snapshot, patch(
         "web_app.contract_tools.mixins.health_ratio.HealthRatioMixin.get_health_ratio_and_tvl"
     ) as mock_get_health_ratio_and_tvl, patch(
-        "web_app.db.crud.position.PositionDBConnector.get_extra_deposits_by_position_id",
-    ) as mock_get_extra_deposits_by_position_id, patch(
         "web_app.contract_tools.mixins.dashboard.DashboardMixin.get_wallet_balances",
         new_callable=AsyncMock,
     ) as mock_get_wallet_balances, patch(
@@ -104,26 +101,21 @@ async def test_get_dashboard_success():
     ) as mock_get_current_position_sum, patch(
         "web_app.contract_tools.mixins.dashboard.DashboardMixin.get_start_position_sum",
         new_callable=AsyncMock,
-    ) as mock_get_start_position_sum, patch(
-        "web_app.contract_tools.mixins.dashboard.DashboardMixin.get_position_balance",
-        new_callable=AsyncMock,
-    ) as mock_get_position_balance:
-
-        mock_get_position_balance.return_value = (
-            mock_position_balance
+    ) as mock_get_start_position_sum:
+
+        position = {
+            "multiplier": multiplier,
+            "created_at": "2024-01-01T00:00:00",
+            "start_price": "100.0",
+            "amount": position_amount,
+            "token_symbol": "ETH",
+            "id": str(id),
+        }
+        mock_get_dashboard_snapshot.return_value = DashboardSnapshot(
+            contract_address="0xabcdef1234567890",
+            position=position,
+            extra_deposits=MOCK_EXTRA_DEPOSITS,
         )
-        mock_get_extra_deposits_by_position_id.return_value = MOCK_EXTRA_DEPOSITS
-        mock_get_contract_address_by_wallet_id.return_value = "0xabcdef1234567890"
-        mock_get_positions_by_wallet_id.return_value = [
-            {
-                "multiplier": multiplier,
-                "created_at": "2024-01-01T00:00:00",
-                "start_price": "100.0",
-                "amount": "2.0",
-                "token_symbol": "ETH",
-                "id": str(id),
-            }
-        ]
         mock_get_health_ratio_and_tvl.return_value = ("1.2", "1000.0")
         mock_get_wallet_balances.return_value = {
             "ETH": 5.0,
@@ -134,7 +126,7 @@ async def test_get_dashboard_success():
 
         # balance from DashboardMixin.calculate_position_balance
         total_position_balance = (
-            Decimal(mock_position_balance)
+            Decimal(position_amount)
             * Decimal(multiplier)
             * (Decimal(100) / Decimal(99))
         )
@@ -158,6 +150,10 @@ async def test_get_dashboard_success():
             "position_id": str(id),
             "deposit_data": RETURN_EXTRA_DEPOSIT,
         }
+        mock_get_dashboard_snapshot.assert_called_once_with(wallet_id)
+        mock_get_current_position_sum.assert_awaited_once_with(
+            position, MOCK_EXTRA_DEPOSITS
+        )
 
 
 @pytest.mark.asyncio
@@ -166,18 +162,17 @@ async def test_get_dashboard_no_positions():
 
     wallet_id = "0x1234567890abcdef"
     with patch(
-        "web_app.api.dashboard.position_db_connector.get_contract_address_by_wallet_id"
-    ) as mock_get_contract_address_by_wallet_id, patch(
-        "web_app.api.dashboard.position_db_connector.get_positions_by_wallet_id"
-    ) as mock_get_positions_by_wallet_id, patch(
+        "web_app.api.dashboard.position_db_connector.get_dashboard_snapshot"
+    ) as mock_get_dashboard_snapshot, patch(
         "web_app.contract_tools.mixins.health_ratio.HealthRatioMixin.get_health_ratio_and_tvl",
         new_callable=AsyncMock,
     ) as mock_get_health_ratio_and_tvl, patch(
         "web_app.contract_tools.mixins.dashboard.DashboardMixin.get_wallet_balances",
         new_callable=AsyncMock,
     ) as mock_get_wallet_balances:
-        mock_get_contract_address_by_wallet_id.return_value = "0xabcdef1234567890"
-        mock_get_positions_by_wallet_id.return_value = []
+        mock_get_dashboard_snapshot.return_value = DashboardSnapshot(
+            contract_address="0xabcdef1234567890"
+        )
         mock_get_wallet_balances.return_value = {
             "ETH": 5.0,
             "USDC": 1000.0,
@@ -201,10 +196,8 @@ async def test_get_dashboard_no_contract_address():
 
     wallet_id = "0x1234567890abcdef"
     with patch(
-        "web_app.api.dashboard.position_db_connector.get_contract_address_by_wallet_id"
-    ) as mock_get_contract_address_by_wallet_id, patch(
-        "web_app.api.dashboard.position_db_connector.get_positions_by_wallet_id"
-    ) as mock_get_positions_by_wallet_id, patch(
+        "web_app.api.dashboard.position_db_connector.get_dashboard_snapshot"
+    ) as mock_get_dashboard_snapshot, patch(
         "web_app.contract_tools.mixins.health_ratio.HealthRatioMixin.get_health_ratio_and_tvl",
         new_callable=AsyncMock,
     ) as mock_get_health_ratio_and_tvl, patch(
@@ -212,8 +205,7 @@ async def test_get_dashboard_no_contract_address():
         new_callable=AsyncMock,
     ) as mock_get_wallet_balances:
 
-        mock_get_contract_address_by_wallet_id.return_value = None
-        mock_get_positions_by_wallet_id.return_value = []
+        mock_get_dashboard_snapshot.return_value = DashboardSnapshot()
         mock_get_wallet_balances.return_value = {
             "ETH": 5.0,
             "USDC": 1000.0,
@@ -276,7 +268,7 @@ def mock_health_ratio_mixin():
 async def test_invalid_wallet_id(mock_db_connector):
     """Test handling of invalid wallet ID."""
 
-    mock_db_connector.get_contract_address_by_wallet_id.side_effect = ValueError(
+    mock_db_connector.get_dashboard_snapshot.side_effect = ValueError(
         "Invalid wallet ID"
     )
     with pytest.raises(ValueError) as exc_info:
@@ -290,10 +282,9 @@ async def test_empty_positions(
 ):
     """Test handling of wallet with no positions."""
 
-    mock_db_connector.get_contract_address_by_wallet_id.return_value = (
-        MOCK_CONTRACT_ADDRESS
+    mock_db_connector.get_dashboard_snapshot.return_value = DashboardSnapshot(
+        contract_address=MOCK_CONTRACT_ADDRESS
     )
-    mock_db_connector.get_positions_by_wallet_id.return_value = []
     DashboardMixin.get_wallet_balances = AsyncMock(return_value=MOCK_WALLET_BALANCES)
     # DashboardMixin.get_zklend_position = AsyncMock(return_value={"products": []})
     HealthRatioMixin.get_health_ratio_and_tvl = AsyncMock(
@@ -319,10 +310,9 @@ async def test_empty_positions(
 async def test_external_service_errors(mock_db_connector):
     """Test handling of external service failures."""
 
-    mock_db_connector.get_contract_address_by_wallet_id.return_value = (
-        MOCK_CONTRACT_ADDRESS
+    mock_db_connector.get_dashboard_snapshot.return_value = DashboardSnapshot(
+        contract_address=MOCK_CONTRACT_ADDRESS, position=MOCK_POSITION
     )
-    mock_db_connector.get_positions_by_wallet_id.return_value = [MOCK_POSITION]
     with patch(
         "web_app.contract_tools.mixins.health_ratio.HealthRatioMixin.get_health_ratio_and_tvl",
         side_effect=Exception("External API error"),
@@ -332,6 +322,47 @@ async def test_external_service_errors(mock_db_connector):
         assert str(exc_info.value) == "External API error"
 
 
+@pytest.mark.asyncio
+async def test_get_health_ratio_history(mock_db_connector):
+    """Test the health ratio history is read from the database."""
+
+    mock_db_connector.get_contract_address_by_wallet_id.return_value = (
+        MOCK_CONTRACT_ADDRESS
+    )
+    row = MagicMock(
+        timestamp=3600,
+        health_ratio=1.5,
+        min_health_ratio=1.2,
+        ltv=0.6,
+        collateral_usd=150.0,
+        debt_usd=100.0,
+        samples=60,
+    )
+    with patch("web_app.api.dashboard.health_history_db_connector") as mock_history:
+        mock_history.get_history.return_value = [row]
+        history = await get_health_ratio_history(
+            VALID_WALLET_ID, "1h", since=datetime(1970, 1, 1, 1), limit=10
+        )
+
+    mock_history.get_history.assert_called_once_with(
+        MOCK_CONTRACT_ADDRESS, "1h", since=3600, limit=10
+    )
+    assert history[0].timestamp == datetime(1970, 1, 1, 1, tzinfo=timezone.utc)
+    assert history[0].min_health_ratio == 1.2
+    assert history[0].samples == 60
+
+
+@pytest.mark.asyncio
+async def test_get_health_ratio_history_no_position(mock_db_connector):
+    """Test the health ratio history of a wallet without position is empty."""
+
+    mock_db_connector.get_contract_address_by_wallet_id.return_value = None
+    with patch("web_app.api.dashboard.health_history_db_connector") as mock_history:
+        assert await get_health_ratio_history(VALID_WALLET_ID) == []
+
+    mock_history.get_history.assert_not_called()
+
+
 # @pytest.mark.asyncio
 # async def test_zklend_service_error(mock_db_connector):
 #     """Test handling of ZkLend service failure."""
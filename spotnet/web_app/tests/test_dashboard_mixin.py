@@ -2,13 +2,14 @@
 Test suite for the DashboardMixin class in the web_app.contract_tools.mixins.dashboard module.
 """
 
+from decimal import Decimal
 from unittest.mock import AsyncMock, patch
 
 import pytest
 
 from web_app.contract_tools.constants import TokenParams
 from web_app.contract_tools.mixins.dashboard import DashboardMixin
-
+from web_app.db.models import ExtraDeposit
 
 @pytest.fixture
 def mock_starknet_client():
@@ -72,3 +73,26 @@ class TestDashboardMixin:
 
         # Assert
         assert result == {"ETH": "10.5", "USDC": "1000.0"}
+
+    @pytest.mark.asyncio
+    async def test_get_current_position_sum_from_snapshot(self, mock_extra_deposit):
+        """
+        With the extra deposits of a snapshot, the position isn't read again.
+        """
+        position = {"id": "1", "token_symbol": "ETH", "amount": "2", "multiplier": 1}
+        usdc_deposit = ExtraDeposit(token_symbol="USDC", amount="500")
+        with patch(
+            "web_app.contract_tools.mixins.dashboard.position_db_connector"
+        ) as mock_db, patch.object(
+            DashboardMixin,
+            "get_current_prices",
+            new_callable=AsyncMock,
+            return_value={"ETH": Decimal("1000"), "USDC": Decimal("1")},
+        ):
+            total_sum = await DashboardMixin.get_current_position_sum(
+                position, [mock_extra_deposit, usdc_deposit]
+            )
+
+        mock_db.get_position_by_id.assert_not_called()
+        mock_db.get_extra_deposits_by_position_id.assert_not_called()
+        assert total_sum == Decimal(2000) * Decimal(100) / Decimal(99) + Decimal("1.5")
@@ -0,0 +1,211 @@
+"""
+Test cases for the incremental health monitor in spotnet_tracker.health_monitor
+"""
+
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from spotnet_tracker.health_monitor import HealthMonitor, MonitorState, PositionState
+from spotnet_tracker.risk_tiers import RiskTier, RiskTiers, TierSchedule
+from web_app.contract_tools.mixins.alert import ALERT_THRESHOLD
+from web_app.contract_tools.mixins.health_ratio import HealthRatioInputs
+
+CALM_CONTRACT = "0x1"
+TOUCHED_CONTRACT = "0x2"
+NEW_CONTRACT = "0x3"
+PRICES = {"ETH": Decimal("2000"), "USDC": Decimal("1")}
+NOW = 1_000_000.0
+TIERS = RiskTiers(
+    bounds={RiskTier.CRITICAL: 1.25, RiskTier.WATCH: 2},
+    schedules={
+        RiskTier.CRITICAL: TierSchedule(15, Decimal("0.002")),
+        RiskTier.WATCH: TierSchedule(60, Decimal("0.005")),
+        RiskTier.SAFE: TierSchedule(600, Decimal("0.05")),
+    },
+    alert_threshold=ALERT_THRESHOLD,
+)
+CRITICAL_RATIO = str(ALERT_THRESHOLD * 1.1)
+WATCH_RATIO = str(ALERT_THRESHOLD * 1.5)
+
+
+class InMemoryMonitorState(MonitorState):
+    """
+    Monitor state kept in memory instead of Redis.
+    """
+
+    def __init__(self, positions: dict, last_block: int | None):
+        super().__init__(redis=None)
+        self.positions = dict(positions)
+        self.last_block = last_block
+
+    async def load_positions(self, contract_addresses):
+        return {
+            address: self.positions[address]
+            for address in contract_addresses
+            if address in self.positions
+        }
+
+    async def save_positions(self, states):
+        self.positions.update(states)
+
+    async def get_last_block(self):
+        return self.last_block
+
+    async def set_last_block(self, block_number):
+        self.last_block = block_number
+
+
+def make_state(
+    eth_price: str = "2000", checked_at: float = NOW, health_ratio: str = "8.00"
+) -> PositionState:
+    """
+    Build the state of a position holding ETH and owing USDC.
+    :param eth_price: ETH price at the last check
+    :param checked_at: Timestamp of the last check
+    :param health_ratio: Health ratio at the last check, safe by default
+    :return: PositionState
+    """
+    return PositionState(health_ratio, {"ETH": eth_price, "USDC": "1"}, checked_at)
+
+
+@pytest.mark.parametrize(
+    "state, touched, now, expected",
+    [
+        (make_state(), set(), NOW + 10, False),
+        (None, set(), NOW + 10, True),
+        (make_state(), None, NOW + 10, True),
+        (make_state(), {0x1}, NOW + 10, True),
+        (make_state(), set(), NOW + 600, True),
+        (make_state(eth_price="1900"), set(), NOW + 10, True),
+        (make_state(eth_price="2099"), set(), NOW + 10, False),
+        (make_state(health_ratio=WATCH_RATIO), set(), NOW + 30, False),
+        (make_state(health_ratio=WATCH_RATIO), set(), NOW + 60, True),
+        (make_state(eth_price="2011", health_ratio=WATCH_RATIO), set(), NOW, True),
+        (make_state(health_ratio=CRITICAL_RATIO), set(), NOW + 10, False),
+        (make_state(health_ratio=CRITICAL_RATIO), set(), NOW + 15, True),
+        (make_state(eth_price="2005", health_ratio=CRITICAL_RATIO), set(), NOW, True),
+    ],
+)
+def test_is_due(state, touched, now, expected) -> None:
+    """
+    A position is recomputed only when one of its inputs changed, at the
+    cadence and price tolerance of its risk tier.
+    """
+    monitor = HealthMonitor(MagicMock(), tiers=TIERS)
+
+    assert monitor.is_due(CALM_CONTRACT, state, touched, PRICES, now) is expected
+
+
+@pytest.mark.asyncio
+async def test_run_recomputes_changed_positions_only() -> None:
+    """
+    Only new positions and positions touched by a zkLend event are recomputed,
+    and they move to the tier of their new health ratio.
+    """
+    state = InMemoryMonitorState(
+        {CALM_CONTRACT: make_state(), TOUCHED_CONTRACT: make_state()}, last_block=99
+    )
+    event = MagicMock(data=[0x2, 0xE])
+
+    async def iter_health_ratios(addresses, inputs):
+        for address in addresses:
+            inputs[address] = HealthRatioInputs({"ETH": Decimal("1")}, "USDC", 10**9)
+            yield address, ("2.00", Decimal("0.50"))
+
+    with patch("spotnet_tracker.health_monitor.UserDBConnector") as mock_db, patch(
+        "spotnet_tracker.health_monitor.CLIENT"
+    ) as mock_client, patch(
+        "spotnet_tracker.health_monitor.HealthRatioMixin"
+    ) as mock_mixin, patch(
+        "spotnet_tracker.health_monitor.time.time", return_value=NOW + 10
+    ), patch(
+        "spotnet_tracker.health_monitor.AlertMixin.send_notification"
+    ) as mock_send_notification, patch(
+        "spotnet_tracker.health_monitor.AlertMixin.flush_notifications",
+        new_callable=AsyncMock,
+        return_value={"sent": 1, "suppressed": 0, "coalesced": 1, "failed": 0},
+    ):
+        mock_db.return_value.get_users_for_notifications.return_value = [
+            (CALM_CONTRACT, "1"),
+            (TOUCHED_CONTRACT, "2"),
+            (NEW_CONTRACT, "3"),
+        ]
+        mock_client.get_block_number = AsyncMock(return_value=100)
+        mock_client.get_zklend_events = AsyncMock(return_value=[event])
+        mock_mixin._get_pragma_prices = AsyncMock(return_value=PRICES)
+        mock_mixin.iter_health_ratios_and_tvl = iter_health_ratios
+        mock_mixin.record_health_history.return_value = 2
+
+        summary = await HealthMonitor(state, tiers=TIERS).run()
+
+    assert summary == {
+        "positions": 3,
+        "recomputed": 2,
+        "failed": 0,
+        "alerts": 2,
+        "notifications": {"sent": 1, "suppressed": 0, "coalesced": 1, "failed": 0},
+        "samples": 2,
+        "tiers": {"critical": 2, "watch": 0, "safe": 1},
+    }
+    assert mock_send_notification.call_count == 2
+    assert state.last_block == 100
+    assert state.positions[NEW_CONTRACT].prices == {"ETH": "2000", "USDC": "1"}
+    assert state.positions[CALM_CONTRACT].checked_at == NOW
+    assert set(mock_mixin.record_health_history.call_args.args[0]) == {
+        TOUCHED_CONTRACT,
+        NEW_CONTRACT,
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_retries_failed_touched_position() -> None:
+    """
+    A position touched by a zkLend event whose health ratio failed transiently
+    is recomputed on the next run, after the event block was processed.
+    """
+    state = InMemoryMonitorState(
+        {CALM_CONTRACT: make_state(), TOUCHED_CONTRACT: make_state()}, last_block=99
+    )
+    event = MagicMock(data=[0x2, 0xE])
+    recomputed = []
+
+    async def iter_health_ratios(addresses, inputs):
+        for address in addresses:
+            recomputed.append(address)
+            if len(recomputed) == 1:
+                yield address, TimeoutError("Node timed out")
+                continue
+            inputs[address] = HealthRatioInputs({"ETH": Decimal("1")}, "USDC", 10**9)
+            yield address, ("8.00", Decimal("0.50"))
+
+    with patch("spotnet_tracker.health_monitor.UserDBConnector") as mock_db, patch(
+        "spotnet_tracker.health_monitor.CLIENT"
+    ) as mock_client, patch(
+        "spotnet_tracker.health_monitor.HealthRatioMixin"
+    ) as mock_mixin, patch(
+        "spotnet_tracker.health_monitor.time.time", return_value=NOW + 10
+    ), patch(
+        "spotnet_tracker.health_monitor.AlertMixin.flush_notifications",
+        new_callable=AsyncMock,
+    ):
+        mock_db.return_value.get_users_for_notifications.return_value = [
+            (CALM_CONTRACT, "1"),
+            (TOUCHED_CONTRACT, "2"),
+        ]
+        mock_client.get_block_number = AsyncMock(side_effect=[100, 101])
+        mock_client.get_zklend_events = AsyncMock(side_effect=[[event], []])
+        mock_mixin._get_pragma_prices = AsyncMock(return_value=PRICES)
+        mock_mixin.iter_health_ratios_and_tvl = iter_health_ratios
+        monitor = HealthMonitor(state, tiers=TIERS)
+
+        first = await monitor.run()
+        assert state.last_block == 100
+        assert state.positions[TOUCHED_CONTRACT].checked_at == 0
+        second = await monitor.run()
+
+    assert (first["recomputed"], first["failed"]) == (1, 1)
+    assert (second["recomputed"], second["failed"]) == (1, 0)
+    assert recomputed == [TOUCHED_CONTRACT, TOUCHED_CONTRACT]
+    assert state.positions[TOUCHED_CONTRACT].checked_at == NOW + 10
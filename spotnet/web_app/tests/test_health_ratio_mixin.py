@@ -0,0 +1,182 @@
+"""
+Test suite for the batch health ratio engine in web_app.contract_tools.mixins.health_ratio
+"""
+
+import asyncio
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from web_app.contract_tools.constants import TokenParams
+from web_app.contract_tools.mixins.health_ratio import (
+    PRAGMA_PRICE_CACHE,
+    HealthRatioInputs,
+    HealthRatioMixin,
+)
+
+HEALTHY_CONTRACT = "0x1"
+NO_DEBT_CONTRACT = "0x2"
+PRICES = {
+    TokenParams.ETH.name: Decimal("2000"),
+    TokenParams.STRK.name: Decimal("0.5"),
+    TokenParams.kSTRK.name: Decimal("0.5"),
+    TokenParams.USDC.name: Decimal("1"),
+}
+
+
+@pytest.fixture
+def mock_starknet_client():
+    """
+    Mock the StarkNet client: the healthy contract holds 1 zETH and owes
+    1000 USDC, the other contract has no debt.
+    """
+    reserves = {
+        TokenParams.ETH.name: (18, 0xE, 10**27),
+        TokenParams.USDC.name: (6, 0xC, 10**27),
+    }
+
+    async def get_balance(z_address, holder, decimals):
+        return "1" if (z_address, holder) == (0xE, HEALTHY_CONTRACT) else "0"
+
+    async def get_zklend_debt(user, token):
+        if (user, token) == (HEALTHY_CONTRACT, TokenParams.USDC.address):
+            return [1000 * 10**6]
+        return [0]
+
+    with patch("web_app.contract_tools.mixins.health_ratio.CLIENT") as mock:
+        mock.get_z_addresses = AsyncMock(return_value=reserves)
+        mock.get_balance = AsyncMock(side_effect=get_balance)
+        mock.get_zklend_debt = AsyncMock(side_effect=get_zklend_debt)
+        yield mock
+
+
+@pytest.fixture
+def mock_pragma_prices():
+    """
+    Mock the Pragma prices.
+    """
+    with patch.object(
+        HealthRatioMixin, "_get_pragma_prices", new_callable=AsyncMock
+    ) as mock:
+        mock.return_value = PRICES
+        yield mock
+
+
+@pytest.mark.asyncio
+async def test_get_health_ratios_and_tvl(mock_starknet_client, mock_pragma_prices):
+    """
+    Shared inputs are fetched once and every contract gets its own result.
+    """
+    results = await HealthRatioMixin.get_health_ratios_and_tvl(
+        [HEALTHY_CONTRACT, NO_DEBT_CONTRACT]
+    )
+
+    assert results[HEALTHY_CONTRACT] == ("2.00", Decimal("0.50"))
+    assert isinstance(results[NO_DEBT_CONTRACT], IndexError)
+    mock_starknet_client.get_z_addresses.assert_awaited_once()
+    mock_pragma_prices.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_matches_single_contract(mock_starknet_client, mock_pragma_prices):
+    """
+    The batch engine computes the same health ratio as the single contract path.
+    """
+    results = await HealthRatioMixin.get_health_ratios_and_tvl([HEALTHY_CONTRACT])
+    inputs = await HealthRatioMixin._get_health_ratio_inputs(HEALTHY_CONTRACT)
+
+    assert inputs.borrowed_token == TokenParams.USDC.name
+    assert results[HEALTHY_CONTRACT] == HealthRatioMixin._compute_health_ratio_and_tvl(
+        inputs, PRICES
+    )
+
+
+@pytest.mark.asyncio
+async def test_slow_contract_times_out(mock_starknet_client, mock_pragma_prices):
+    """
+    A contract slower than the timeout fails alone without stalling the batch.
+    """
+    get_zklend_debt = mock_starknet_client.get_zklend_debt.side_effect
+
+    async def slow_get_zklend_debt(user, token):
+        if user == NO_DEBT_CONTRACT:
+            await asyncio.sleep(5)
+        return await get_zklend_debt(user, token)
+
+    mock_starknet_client.get_zklend_debt.side_effect = slow_get_zklend_debt
+
+    results = [
+        address
+        async for address, _ in HealthRatioMixin.iter_health_ratios_and_tvl(
+            [NO_DEBT_CONTRACT, HEALTHY_CONTRACT], timeout=0.05
+        )
+    ]
+    health_ratios = await HealthRatioMixin.get_health_ratios_and_tvl(
+        [NO_DEBT_CONTRACT], timeout=0.05
+    )
+
+    assert results == [HEALTHY_CONTRACT, NO_DEBT_CONTRACT]
+    assert isinstance(health_ratios[NO_DEBT_CONTRACT], TimeoutError)
+
+
+@pytest.mark.asyncio
+async def test_pragma_prices_are_shared_within_block() -> None:
+    """
+    Concurrent price reads of a pair share one oracle read, which is reused
+    until a new block is produced.
+    """
+    PRAGMA_PRICE_CACHE.invalidate()
+    block_number = AsyncMock(side_effect=[100, 100, 101])
+
+    with patch.object(PRAGMA_PRICE_CACHE, "get_block_number", block_number), patch(
+        "web_app.contract_tools.mixins.health_ratio.PRAGMA"
+    ) as mock_pragma:
+        mock_pragma.get_spot = AsyncMock(return_value=MagicMock(price=2000 * 10**8))
+
+        prices = await asyncio.gather(
+            HealthRatioMixin._get_pragma_price("ETH"),
+            HealthRatioMixin._get_pragma_price("ETH"),
+        )
+        entry = await HealthRatioMixin.get_pragma_price_entry("ETH")
+        assert mock_pragma.get_spot.await_count == 1
+
+        await HealthRatioMixin._get_pragma_price("ETH")
+        assert mock_pragma.get_spot.await_count == 2
+
+    PRAGMA_PRICE_CACHE.invalidate()
+    assert prices == [Decimal("2000")] * 2
+    assert entry.block_number == 100
+    assert entry.age >= 0
+
+
+@pytest.mark.asyncio
+async def test_record_health_history(mock_starknet_client, mock_pragma_prices):
+    """
+    Samples are stored for the contracts whose health ratio can be computed,
+    a contract without deposits is left out.
+    """
+    inputs = {
+        HEALTHY_CONTRACT: await HealthRatioMixin._get_health_ratio_inputs(
+            HEALTHY_CONTRACT
+        ),
+        "0x3": HealthRatioInputs(
+            deposits={}, borrowed_token=TokenParams.USDC.name, debt_raw=10**6
+        ),
+    }
+
+    with patch(
+        "web_app.contract_tools.mixins.health_ratio.health_history_db_connector"
+    ) as mock_db:
+        assert HealthRatioMixin.record_health_history(inputs, PRICES) == 1
+
+    mock_db.write_samples.assert_called_once_with(
+        {
+            HEALTHY_CONTRACT: {
+                "health_ratio": 2.0,
+                "ltv": 0.5,
+                "collateral_usd": 2000.0,
+                "debt_usd": 1000.0,
+            }
+        }
+    )
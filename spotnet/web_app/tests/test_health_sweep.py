@@ -0,0 +1,170 @@
+"""
+Test cases for the sharded health ratio sweep in spotnet_tracker.tasks
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from spotnet_tracker.tasks import (
+    HEALTH_SWEEP_LOCK_TIMEOUT,
+    aggregate_health_ratio_sweep,
+    check_users_health_ratio,
+    check_users_health_ratio_shard,
+    fail_health_ratio_sweep,
+    split_into_shards,
+)
+from web_app.db.models import TaskRunStatus
+
+USERS_DATA = [("0x1", "1"), ("0x2", "2"), ("0x1", "3"), ("0x3", "4"), ("0x4", "5")]
+
+
+def test_split_into_shards() -> None:
+    """
+    Shards hold at most `shard_size` positions with all their telegram IDs.
+    """
+    assert split_into_shards(USERS_DATA, 2) == [
+        [("0x1", "1"), ("0x1", "3"), ("0x2", "2")],
+        [("0x3", "4"), ("0x4", "5")],
+    ]
+    assert split_into_shards([], 2) == []
+
+
+def test_check_users_health_ratio_dispatches_chord() -> None:
+    """
+    The sweep dispatches one shard task per shard, aggregated by a chord callback.
+    """
+    with patch("spotnet_tracker.tasks.UserDBConnector") as mock_db, patch(
+        "spotnet_tracker.tasks.chord"
+    ) as mock_chord, patch("spotnet_tracker.tasks.HEALTH_SWEEP_SHARD_SIZE", 3), patch(
+        "spotnet_tracker.tasks.TaskLock"
+    ) as mock_lock:
+        mock_db.return_value.get_users_for_notifications.return_value = USERS_DATA
+        mock_lock.return_value.acquire.return_value = True
+        mock_lock.return_value.token = "token"
+        check_users_health_ratio()
+
+    header = list(mock_chord.call_args.args[0])
+    assert [signature.args for signature in header] == [
+        ([("0x1", "1"), ("0x1", "3"), ("0x2", "2"), ("0x3", "4")],),
+        ([("0x4", "5")],),
+    ]
+    callback = mock_chord.return_value.call_args.args[0]
+    assert callback.task == "aggregate_health_ratio_sweep"
+    assert callback.args[1] == "token"
+    (errback,) = callback.options["link_error"]
+    assert errback["task"] == "fail_health_ratio_sweep"
+    assert errback["args"][1] == "token"
+    mock_lock.return_value.release.assert_not_called()
+
+
+def test_check_users_health_ratio_skips_overlapping_sweep() -> None:
+    """
+    No shard is dispatched while the previous sweep holds the lock.
+    """
+    with patch("spotnet_tracker.tasks.UserDBConnector") as mock_db, patch(
+        "spotnet_tracker.tasks.chord"
+    ) as mock_chord, patch("spotnet_tracker.tasks.TaskLock") as mock_lock, patch(
+        "spotnet_tracker.tasks.record_task_run"
+    ) as mock_record:
+        mock_lock.return_value.acquire.return_value = False
+        check_users_health_ratio()
+
+    mock_db.assert_not_called()
+    mock_chord.assert_not_called()
+    assert mock_record.call_args.args[1] == TaskRunStatus.SKIPPED
+
+
+def test_check_users_health_ratio_shard() -> None:
+    """
+    A shard checks its users and reports its duration.
+    """
+    summary = {"positions": 2, "failed": 0, "alerts": 1, "notifications": {}}
+    with patch(
+        "spotnet_tracker.tasks.AlertMixin.check_users_health_ratio_level",
+        new_callable=AsyncMock,
+        return_value=summary,
+    ) as mock_check:
+        result = check_users_health_ratio_shard([["0x1", "1"], ["0x2", "2"]])
+
+    mock_check.assert_awaited_once_with([("0x1", "1"), ("0x2", "2")])
+    assert result["alerts"] == 1
+    assert result["duration"] >= 0
+
+
+def test_check_users_health_ratio_shard_failure() -> None:
+    """
+    A failing shard reports its positions as failed instead of raising.
+    """
+    with patch(
+        "spotnet_tracker.tasks.run_async", MagicMock(side_effect=RuntimeError("down"))
+    ), patch("spotnet_tracker.tasks.AlertMixin"):
+        result = check_users_health_ratio_shard([["0x1", "1"], ["0x1", "2"]])
+
+    assert result["positions"] == 1
+    assert result["failed"] == 1
+    assert result["error"] == "down"
+
+
+def test_aggregate_health_ratio_sweep() -> None:
+    """
+    The results of the shards are summed up.
+    """
+    summaries = [
+        {
+            "positions": 3,
+            "failed": 1,
+            "alerts": 2,
+            "notifications": {"sent": 1, "suppressed": 1},
+            "rpc_calls": 12,
+            "samples": 2,
+            "duration": 1.5,
+        },
+        {
+            "positions": 2,
+            "failed": 2,
+            "alerts": 0,
+            "notifications": {},
+            "error": "down",
+            "duration": 0.5,
+        },
+    ]
+    with patch("spotnet_tracker.tasks.time.time", return_value=110.0), patch(
+        "spotnet_tracker.tasks.TaskLock"
+    ) as mock_lock, patch("spotnet_tracker.tasks.record_task_run") as mock_record:
+        result = aggregate_health_ratio_sweep(summaries, 100.0, "token")
+
+    assert result == {
+        "shards": 2,
+        "failed_shards": 1,
+        "positions": 5,
+        "failed": 3,
+        "alerts": 2,
+        "rpc_calls": 12,
+        "samples": 2,
+        "notifications": {"sent": 1, "suppressed": 1},
+        "slowest_shard": 1.5,
+        "duration": 10.0,
+    }
+    mock_lock.assert_called_once_with(
+        "check_users_health_ratio", HEALTH_SWEEP_LOCK_TIMEOUT, token="token"
+    )
+    mock_lock.return_value.release.assert_called_once()
+    assert mock_record.call_args.kwargs["positions"] == 5
+
+
+def test_fail_health_ratio_sweep() -> None:
+    """
+    A failed chord releases the sweep lock and records a failed run.
+    """
+    with patch("spotnet_tracker.tasks.TaskLock") as mock_lock, patch(
+        "spotnet_tracker.tasks.record_task_run"
+    ) as mock_record:
+        fail_health_ratio_sweep(
+            MagicMock(id="shard"), RuntimeError("worker lost"), None, 100.0, "token"
+        )
+
+    mock_lock.assert_called_once_with(
+        "check_users_health_ratio", HEALTH_SWEEP_LOCK_TIMEOUT, token="token"
+    )
+    mock_lock.return_value.release.assert_called_once()
+    assert mock_record.call_args.args[1] == TaskRunStatus.FAILED
+    assert mock_record.call_args.kwargs["details"] == {"error": "worker lost"}
@@ -0,0 +1,72 @@
+"""
+Test cases for the metrics endpoint in web_app.api.metrics
+"""
+
+from unittest.mock import MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from web_app.api.metrics import router
+from web_app.contract_tools.rpc_retry import RpcMetrics
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
+
+
+def test_get_metrics_returns_rpc_metrics() -> None:
+    """
+    The retry counters and latency histograms of the RPC calls are exposed.
+    """
+    metrics = RpcMetrics()
+    metrics.observe("get_block_number", 0.07, attempts=2, success=True)
+    metrics.observe("get_block_number", 20.0, attempts=3, success=False)
+
+    with patch("web_app.api.metrics.CLIENT", MagicMock(metrics=metrics)), patch(
+        "web_app.api.metrics.get_pool_metrics", return_value={}
+    ):
+        response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    block_number = response.json()["rpc"]["get_block_number"]
+    assert block_number["calls"] == 2
+    assert block_number["retries"] == 3
+    assert block_number["failures"] == 1
+    assert block_number["latency_sum"] == 20.07
+    assert block_number["latency_buckets"]["0.1"] == 1
+    assert block_number["latency_buckets"]["inf"] == 1
+
+
+def test_get_metrics_returns_pool_metrics() -> None:
+    """
+    The usage of the connection pools is exposed without the database passwords.
+    """
+    engine = create_engine(
+        "postgresql://user:secret@db:5432/spotnet", pool_size=5, max_overflow=2
+    )
+
+    with patch(
+        "web_app.api.metrics.CLIENT", MagicMock(metrics=RpcMetrics())
+    ), patch.dict(
+        "web_app.db.database._engines",
+        {"postgresql://user:secret@db:5432/spotnet": engine},
+        clear=True,
+    ):
+        response = client.get("/api/metrics")
+    engine.dispose()
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "rpc": {},
+        "db": {
+            "postgresql://user:***@db:5432/spotnet": {
+                "pool": "QueuePool",
+                "size": 5,
+                "checked_out": 0,
+                "checked_in": 0,
+                "overflow": -5,
+            }
+        },
+    }
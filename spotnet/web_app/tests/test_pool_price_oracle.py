@@ -0,0 +1,85 @@
+"""
+Test cases for the Ekubo pool price oracle in web_app.contract_tools.pool_price_oracle
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from web_app.contract_tools.blockchain_call import StarknetClient
+from web_app.contract_tools.constants import TokenParams
+from web_app.contract_tools.pool_price_oracle import EkuboPriceOracle
+
+POOL_KEY = StarknetClient._build_ekubo_pool_key(
+    TokenParams.ETH.address, TokenParams.USDC.address
+)
+
+
+def make_ekubo_contract(sqrt_ratios: list[int]) -> MagicMock:
+    """
+    Build an Ekubo contract mock answering `get_pool_price` with the given ratios.
+    :param sqrt_ratios: Successive sqrt ratios returned
+    :return: MagicMock
+    """
+    contract = MagicMock()
+    contract.functions["get_pool_price"].call = AsyncMock(
+        side_effect=[[{"sqrt_ratio": sqrt_ratio}] for sqrt_ratio in sqrt_ratios]
+    )
+    return contract
+
+
+@pytest.fixture
+def oracle() -> EkuboPriceOracle:
+    """
+    Create a price oracle on a client that is never connected.
+    :return: EkuboPriceOracle
+    """
+    client = StarknetClient(node_urls=["http://starknet-node"], batch_window=0)
+    return EkuboPriceOracle(client, max_age=60, poll_interval=0)
+
+
+@pytest.mark.asyncio
+async def test_fresh_snapshot_is_served_without_reading(oracle) -> None:
+    """
+    A price read within the freshness bound is served from memory, concurrent
+    callers sharing a single read.
+    """
+    contract = make_ekubo_contract([1, 2])
+
+    results = await asyncio.gather(
+        *[oracle.get_price_data(POOL_KEY, contract) for _ in range(5)]
+    )
+    assert results == [[{"sqrt_ratio": 1}]] * 5
+    assert await oracle.get_price_data(POOL_KEY, contract) == [{"sqrt_ratio": 1}]
+    assert contract.functions["get_pool_price"].call.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_is_read_live(oracle) -> None:
+    """
+    A price older than the freshness bound is read from the chain again.
+    """
+    contract = make_ekubo_contract([1, 2])
+
+    await oracle.get_price_data(POOL_KEY, contract)
+    oracle.max_age = 0
+
+    assert await oracle.get_price_data(POOL_KEY, contract) == [{"sqrt_ratio": 2}]
+
+
+@pytest.mark.asyncio
+async def test_refresh_reads_every_supported_pool(oracle) -> None:
+    """
+    A refresh stores a snapshot of every pool used to open and close positions.
+    """
+    pool_keys = oracle.supported_pool_keys()
+    oracle.ekubo_contract = make_ekubo_contract(range(len(pool_keys)))
+
+    await oracle.refresh()
+
+    assert POOL_KEY in pool_keys
+    assert len(oracle.snapshots) == len(pool_keys)
+    assert oracle.ekubo_contract.functions["get_pool_price"].call.await_count == len(
+        pool_keys
+    )
@@ -0,0 +1,68 @@
+"""
+Test cases for the Ekubo price conversions in web_app.contract_tools.price_math
+"""
+
+import random
+from decimal import Decimal
+from fractions import Fraction
+from math import floor
+
+import pytest
+
+from web_app.contract_tools.price_math import (
+    get_debt_price,
+    sqrt_ratio_to_price,
+    sqrt_ratios_to_prices,
+)
+
+Q128 = 1 << 128
+
+
+@pytest.mark.parametrize(
+    "sqrt_ratio, token0_decimals, token1_decimals, is_token1, expected",
+    [
+        (Q128, 18, 6, False, 10**18),
+        (Q128, 18, 6, True, 10**6),
+        (2 * Q128, 18, 18, False, 4 * 10**18),
+        (2 * Q128, 18, 18, True, Fraction(10**18, 4)),
+        (Decimal(Q128), Decimal("6"), Decimal("18"), False, 10**30),
+    ],
+)
+def test_sqrt_ratio_to_price(
+    sqrt_ratio, token0_decimals, token1_decimals, is_token1, expected
+) -> None:
+    """
+    Prices are converted exactly, whatever the numeric type of the inputs.
+    """
+    assert (
+        sqrt_ratio_to_price(sqrt_ratio, token0_decimals, token1_decimals, is_token1)
+        == expected
+    )
+
+
+def test_batch_conversion_matches_single_conversion() -> None:
+    """
+    The batch conversion gives the floor of the exact price of every pool.
+    """
+    rng = random.Random(0)
+    pools = [
+        (
+            rng.randrange(1 << 100, 1 << 160),
+            *rng.choice([(18, 6), (6, 18), (18, 18)]),
+            rng.random() < 0.5,
+        )
+        for _ in range(200)
+    ]
+
+    assert sqrt_ratios_to_prices(pools) == [
+        floor(sqrt_ratio_to_price(*pool)) for pool in pools
+    ]
+
+
+def test_get_debt_price() -> None:
+    """
+    The debt price is the floored inverse of the supply price.
+    """
+    assert get_debt_price(3, Decimal("24")) == 10**24 // 3
+    with pytest.raises(ZeroDivisionError):
+        get_debt_price(0, 24)
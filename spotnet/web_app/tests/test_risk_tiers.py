@@ -0,0 +1,70 @@
+"""
+Test cases for the risk tiers in spotnet_tracker.risk_tiers
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from spotnet_tracker.risk_tiers import RiskTier, RiskTiers, TierSchedule
+
+SCHEDULES = {
+    RiskTier.CRITICAL: TierSchedule(15, Decimal("0.002")),
+    RiskTier.WATCH: TierSchedule(60, Decimal("0.005")),
+    RiskTier.SAFE: TierSchedule(600, Decimal("0.05")),
+}
+TIERS = RiskTiers(
+    bounds={RiskTier.CRITICAL: 1.25, RiskTier.WATCH: 2},
+    schedules=SCHEDULES,
+    alert_threshold=2.0,
+)
+
+
+@pytest.mark.parametrize(
+    "health_ratio, expected",
+    [
+        ("1.5", RiskTier.CRITICAL),
+        ("2.49", RiskTier.CRITICAL),
+        ("2.5", RiskTier.WATCH),
+        ("3.99", RiskTier.WATCH),
+        ("4", RiskTier.SAFE),
+        ("120.5", RiskTier.SAFE),
+        ("0", RiskTier.SAFE),
+        ("", RiskTier.SAFE),
+    ],
+)
+def test_classify(health_ratio, expected) -> None:
+    """
+    Health ratios are bucketed by their distance from the alert threshold.
+    """
+    assert TIERS.classify(health_ratio) is expected
+
+
+def test_schedule() -> None:
+    """
+    The schedule of a health ratio is the one of its tier.
+    """
+    assert TIERS.schedule("1.5") == SCHEDULES[RiskTier.CRITICAL]
+    assert TIERS.schedule("10") == SCHEDULES[RiskTier.SAFE]
+
+
+def test_from_env(monkeypatch) -> None:
+    """
+    Bounds and schedules default to the environment.
+    """
+    monkeypatch.setenv("HEALTH_TIER_WATCH_BOUND", "3")
+    monkeypatch.setenv("HEALTH_TIER_SAFE_INTERVAL", "900")
+
+    tiers = RiskTiers(alert_threshold=2.0)
+
+    assert tiers.classify("5") is RiskTier.WATCH
+    assert tiers.schedules[RiskTier.SAFE] == TierSchedule(900, Decimal("0.05"))
+    assert tiers.schedules[RiskTier.CRITICAL] == TierSchedule(15, Decimal("0.002"))
+
+
+def test_invalid_bounds() -> None:
+    """
+    The critical tier can't extend beyond the watch tier.
+    """
+    with pytest.raises(ValueError):
+        RiskTiers(bounds={RiskTier.CRITICAL: 3, RiskTier.WATCH: 2}, schedules=SCHEDULES)
@@ -0,0 +1,57 @@
+"""
+Test cases for the RPC record/replay helpers in web_app.contract_tools.rpc_replay
+"""
+
+import pytest
+from starknet_py.net.client_errors import ClientError
+from starknet_py.net.client_models import Call
+from starknet_py.net.full_node_client import FullNodeClient
+
+from web_app.contract_tools.rpc_replay import RpcFixture, use_replay_transport
+
+CALL = Call(to_addr=0x1, selector=0x2, calldata=[0x3])
+CALL_PAYLOAD = {
+    "jsonrpc": "2.0",
+    "id": 7,
+    "method": "starknet_call",
+    "params": {
+        "request": {
+            "contract_address": "0x1",
+            "entry_point_selector": "0x2",
+            "calldata": ["0x3"],
+        },
+        "block_id": "pending",
+    },
+}
+
+
+def test_fixture_round_trip(tmp_path) -> None:
+    """
+    Recorded exchanges are saved and answered with the id of the new request.
+    """
+    fixture = RpcFixture(str(tmp_path / "rpc.json"))
+    fixture.record_exchange(
+        [CALL_PAYLOAD], [{"jsonrpc": "2.0", "id": 7, "result": ["0x5"]}]
+    )
+    fixture.save()
+
+    loaded = RpcFixture(fixture.path)
+    response = loaded.answer([{**CALL_PAYLOAD, "id": 1}])
+
+    assert response == [{"jsonrpc": "2.0", "id": 1, "result": ["0x5"]}]
+
+
+@pytest.mark.asyncio
+async def test_replay_transport_serves_full_node_client(tmp_path) -> None:
+    """
+    A FullNodeClient using the replay transport answers from the fixture.
+    """
+    fixture = RpcFixture(str(tmp_path / "rpc.json"))
+    fixture.record(CALL_PAYLOAD, {"jsonrpc": "2.0", "id": 7, "result": ["0x5"]})
+    client = FullNodeClient(node_url="http://replay")
+    use_replay_transport(client, fixture, latency=0.001)
+
+    assert await client.call_contract(CALL) == [5]
+
+    with pytest.raises(ClientError):
+        await client.call_contract(Call(to_addr=0x9, selector=0x2, calldata=[]))
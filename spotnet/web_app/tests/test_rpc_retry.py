@@ -0,0 +1,126 @@
+"""
+Test cases for the RPC retry policy in web_app.contract_tools.rpc_retry
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from starknet_py.net.client_errors import ClientError
+
+from web_app.contract_tools.rpc_retry import (
+    RetryDeadlineExceeded,
+    RetryPolicy,
+    RpcMetrics,
+    call_with_retry,
+)
+
+FAST_POLICY = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0, deadline=5)
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        (asyncio.TimeoutError(), True),
+        (ConnectionError(), True),
+        (ClientError(code="503", message="Service Unavailable"), True),
+        (ClientError(code="429", message="Too Many Requests"), True),
+        (ClientError(code=-32603, message="Internal error"), True),
+        (ClientError(code=-32005, message="Limit exceeded"), True),
+        (ClientError(code=40, message="Contract error"), False),
+        (ClientError(code=52, message="Invalid transaction nonce"), False),
+        (ClientError(code=55, message="Account validation failed"), False),
+        (ClientError(code="404", message="Not Found"), False),
+        (ValueError(), False),
+    ],
+)
+def test_is_retryable(exc: Exception, expected: bool) -> None:
+    """
+    Transient errors are retried, permanent ones are not.
+    """
+    assert RetryPolicy.is_retryable(exc) is expected
+
+
+def test_get_delay_is_capped() -> None:
+    """
+    The delay grows exponentially up to max_delay and is shortened by jitter.
+    """
+    policy = RetryPolicy(base_delay=1, max_delay=4, jitter=0.5)
+
+    assert 0.5 <= policy.get_delay(1) <= 1
+    assert 1 <= policy.get_delay(2) <= 2
+    assert 2 <= policy.get_delay(10) <= 4
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_recovers_from_transient_error() -> None:
+    """
+    A transient failure is retried and recorded in the metrics.
+    """
+    func = AsyncMock(side_effect=[ConnectionError("reset"), [1]])
+    metrics = RpcMetrics()
+
+    result = await call_with_retry(func, FAST_POLICY, metrics, label="balanceOf")
+
+    assert result == [1]
+    assert func.await_count == 2
+    stats = metrics.snapshot()["balanceOf"]
+    assert (stats["calls"], stats["retries"], stats["failures"]) == (1, 1, 0)
+    assert sum(stats["latency_buckets"].values()) == 1
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_does_not_retry_permanent_error() -> None:
+    """
+    A permanent failure is raised right away.
+    """
+    func = AsyncMock(side_effect=ClientError(code=40, message="Contract error"))
+    metrics = RpcMetrics()
+
+    with pytest.raises(ClientError):
+        await call_with_retry(func, FAST_POLICY, metrics, label="balanceOf")
+
+    assert func.await_count == 1
+    assert metrics.snapshot()["balanceOf"]["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_does_not_retry_starknet_error() -> None:
+    """
+    A Starknet error code starting with 5, such as an invalid nonce,
+    is not mistaken for an HTTP 5xx status.
+    """
+    func = AsyncMock(side_effect=ClientError(code=52, message="Invalid nonce"))
+
+    with pytest.raises(ClientError):
+        await call_with_retry(func, FAST_POLICY, RpcMetrics(), label="get_nonce")
+
+    assert func.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_stops_after_max_attempts() -> None:
+    """
+    The last error is raised once the attempts are exhausted.
+    """
+    func = AsyncMock(side_effect=ConnectionError("reset"))
+
+    with pytest.raises(ConnectionError):
+        await call_with_retry(func, FAST_POLICY, RpcMetrics(), label="balanceOf")
+
+    assert func.await_count == FAST_POLICY.max_attempts
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_respects_deadline() -> None:
+    """
+    A hanging call is cut off at the deadline instead of blocking the caller.
+    """
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    policy = RetryPolicy(max_attempts=5, base_delay=0, max_delay=0, deadline=0.05)
+
+    with pytest.raises((asyncio.TimeoutError, RetryDeadlineExceeded)):
+        await call_with_retry(hang, policy, RpcMetrics(), label="balanceOf")
@@ -0,0 +1,100 @@
+"""
+Test cases for the multi-node RPC router in web_app.contract_tools.rpc_router
+"""
+
+import asyncio
+
+import pytest
+from starknet_py.net.client_errors import ClientError
+
+from web_app.contract_tools.rpc_router import RpcRouter
+
+FAST_NODE = "http://fast-node"
+SLOW_NODE = "http://slow-node"
+
+
+def make_call(delays: dict[str, float], failing: set[str] = frozenset()):
+    """
+    Build a routed call answering with the node URL after a per-node delay.
+    :param delays: Delay in seconds by node URL
+    :param failing: URLs of the nodes failing with a connection error
+    :return: coroutine function
+    """
+
+    async def call(client):
+        await asyncio.sleep(delays.get(client.url, 0))
+        if client.url in failing:
+            raise ConnectionError(f"{client.url} is down")
+        return client.url
+
+    return call
+
+
+@pytest.mark.asyncio
+async def test_routes_to_fastest_node() -> None:
+    """
+    Once latencies are known, calls go to the fastest node.
+    """
+    router = RpcRouter([SLOW_NODE, FAST_NODE], hedge_percentile=0)
+    call = make_call({SLOW_NODE: 0.02, FAST_NODE: 0})
+
+    # Probe both nodes first
+    await router.call(call)
+    await router.call(call)
+
+    assert [await router.call(call) for _ in range(3)] == [FAST_NODE] * 3
+
+
+@pytest.mark.asyncio
+async def test_failing_node_is_ejected_and_readmitted() -> None:
+    """
+    A node failing repeatedly leaves the rotation until its ejection expires.
+    """
+    router = RpcRouter(
+        [SLOW_NODE, FAST_NODE], hedge_percentile=0, eject_after=2, eject_for=60
+    )
+    call = make_call({}, failing={SLOW_NODE})
+    failing_node = router.nodes[0]
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await router._call_node(failing_node, call)
+
+    assert not failing_node.is_healthy
+    assert [node.url for node in router.ranked_nodes()] == [FAST_NODE]
+
+    failing_node.ejected_until = 0
+    assert failing_node in router.ranked_nodes()
+
+
+@pytest.mark.asyncio
+async def test_contract_errors_do_not_eject_node() -> None:
+    """
+    Errors raised by the contract don't count against the node.
+    """
+    router = RpcRouter([FAST_NODE], eject_after=1)
+
+    async def call(_client):
+        raise ClientError(code=40, message="Contract error")
+
+    with pytest.raises(ClientError):
+        await router.call(call)
+
+    assert router.nodes[0].is_healthy
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_on_next_node() -> None:
+    """
+    A call slower than the primary's latency percentile is raced on the next node.
+    """
+    router = RpcRouter([SLOW_NODE, FAST_NODE], hedge_percentile=0.5)
+    primary, backup = router.nodes
+    primary.latencies.extend([0.01] * router.MIN_HEDGE_SAMPLES)
+    backup.latencies.extend([0.05] * router.MIN_HEDGE_SAMPLES)
+
+    result = await asyncio.wait_for(
+        router.call(make_call({SLOW_NODE: 5, FAST_NODE: 0})), timeout=1
+    )
+
+    assert result == FAST_NODE
@@ -1,14 +1,23 @@
 """Test cases for StarknetClient"""
 
+import asyncio
 from decimal import Decimal
-from unittest.mock import AsyncMock, patch
+from fractions import Fraction
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from starknet_py.contract import Contract
+from starknet_py.net.client_errors import ClientError
+from starknet_py.net.client_models import Call
 from starknet_py.net.full_node_client import FullNodeClient
 
-from web_app.contract_tools.blockchain_call import RepayDataException, StarknetClient
+from web_app.contract_tools.blockchain_call import (
+    RepayDataException,
+    RpcCallBatcher,
+    StarknetClient,
+)
 from web_app.contract_tools.constants import TokenParams
+from web_app.contract_tools.rpc_retry import RetryPolicy
 
 CLIENT = StarknetClient()
 
@@ -176,7 +185,7 @@ class TestStarknetClient:
         pool_price = await CLIENT._get_pool_price(pool_key, is_token1, mock_contract)
 
         assert pool_price
-        assert isinstance(pool_price, Decimal)
+        assert isinstance(pool_price, Fraction)
 
     @pytest.mark.asyncio
     @pytest.mark.parametrize(
@@ -374,3 +383,136 @@ class TestStarknetClient:
             assert {"supply_price", "debt_price", "pool_key"}.issubset(
                 repay_data
             ) or not len(repay_data.keys())
+
+    @pytest.mark.asyncio
+    async def test_fetch_portfolios(self) -> None:
+        """
+        Test case for StarknetClient.fetch_portfolios method: reserves are looked up
+        once for the whole batch and every contract gets every z-token balance
+        :return: None
+        """
+        z_addresses = {"ETH": (18, 0x1, 10**27), "USDC": (6, 0x2, 10**27)}
+        contracts = ["0xa", "0xb", "0xc"]
+        with patch.object(
+            CLIENT, "get_z_addresses", AsyncMock(return_value=z_addresses)
+        ) as mock_get_z_addresses, patch.object(
+            CLIENT,
+            "get_balance",
+            AsyncMock(side_effect=lambda token, holder: f"{holder}:{token}"),
+        ):
+            portfolios = await CLIENT.fetch_portfolios(contracts, concurrency=2)
+
+        mock_get_z_addresses.assert_awaited_once()
+        assert portfolios["0xb"] == {
+            "zETH": {"balance": "0xb:1", "decimals": 18},
+            "zUSDC": {"balance": "0xb:2", "decimals": 6},
+        }
+        assert list(portfolios) == contracts
+
+    @pytest.mark.asyncio
+    async def test_block_and_event_reads_are_retried(self) -> None:
+        """
+        Test case for StarknetClient.get_block_number and get_zklend_events methods:
+        transient failures are retried and recorded in the metrics
+        :return: None
+        """
+        client = StarknetClient(
+            node_urls=["http://starknet-node"],
+            batch_window=0,
+            retry_policy=RetryPolicy(base_delay=0, max_delay=0),
+        )
+        chunk = MagicMock(events=["event"])
+        with patch.object(
+            FullNodeClient,
+            "get_block_number",
+            AsyncMock(side_effect=[ConnectionError("reset"), 100]),
+        ), patch.object(
+            FullNodeClient,
+            "get_events",
+            AsyncMock(side_effect=[ClientError(code="503", message="busy"), chunk]),
+        ):
+            assert await client.get_block_number() == 100
+            assert await client.get_zklend_events(["Deposit"], 1, 2) == ["event"]
+
+        metrics = client.metrics.snapshot()
+        assert metrics["get_block_number"]["retries"] == 1
+        assert metrics["get_events"]["retries"] == 1
+
+
+class TestRpcCallBatcher:
+    """
+    Test cases for web_app.contract_tools.blockchain_call.RpcCallBatcher class
+    """
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_sent_as_one_batch(self) -> None:
+        """
+        Calls issued within the window are sent in a single request
+        and each caller receives its own result.
+        """
+        send_batch = AsyncMock(
+            side_effect=lambda payloads: [
+                {"jsonrpc": "2.0", "id": payload["id"], "result": [hex(payload["id"])]}
+                for payload in reversed(payloads)
+            ]
+        )
+        batcher = RpcCallBatcher(send_batch, window=0.01)
+
+        results = await asyncio.gather(
+            *[
+                batcher.call(Call(to_addr=addr, selector=1, calldata=[addr]))
+                for addr in range(3)
+            ]
+        )
+
+        send_batch.assert_awaited_once()
+        payloads = send_batch.await_args.args[0]
+        assert [payload["method"] for payload in payloads] == ["starknet_call"] * 3
+        assert results == [[0], [1], [2]]
+
+    @pytest.mark.asyncio
+    async def test_batch_is_sent_when_max_size_is_reached(self) -> None:
+        """
+        Reaching the max batch size sends the batch without waiting for the window.
+        """
+        send_batch = AsyncMock(
+            side_effect=lambda payloads: [
+                {"id": payload["id"], "result": ["0x1"]} for payload in payloads
+            ]
+        )
+        batcher = RpcCallBatcher(send_batch, window=60, max_batch_size=2)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                batcher.call(Call(to_addr=1, selector=1, calldata=[])),
+                batcher.call(Call(to_addr=2, selector=1, calldata=[])),
+            ),
+            timeout=1,
+        )
+
+        assert results == [[1], [1]]
+
+    @pytest.mark.asyncio
+    async def test_errors_are_fanned_out_to_their_callers(self) -> None:
+        """
+        An error item fails only its own caller, a failed request fails all of them.
+        """
+        send_batch = AsyncMock(
+            return_value=[
+                {"id": 0, "result": ["0x5"]},
+                {"id": 1, "error": {"code": 40, "message": "Contract error"}},
+            ]
+        )
+        batcher = RpcCallBatcher(send_batch, window=0.01)
+
+        results = await asyncio.gather(
+            batcher.call(Call(to_addr=1, selector=1, calldata=[])),
+            batcher.call(Call(to_addr=2, selector=1, calldata=[])),
+            return_exceptions=True,
+        )
+        assert results[0] == [5]
+        assert isinstance(results[1], ClientError)
+
+        send_batch.side_effect = ConnectionError("node is down")
+        with pytest.raises(ConnectionError):
+            await batcher.call(Call(to_addr=1, selector=1, calldata=[]))
@@ -0,0 +1,101 @@
+"""
+Test cases for the price shock stress test in web_app.contract_tools.stress_test
+"""
+
+import random
+from decimal import Decimal
+
+import pytest
+
+from web_app.contract_tools.mixins.health_ratio import HealthRatioInputs
+from web_app.contract_tools.stress_test import StressTest, price_shock_grid
+
+PRICES = {
+    "ETH": Decimal("2000"),
+    "STRK": Decimal("0.5"),
+    "kSTRK": Decimal("0.5"),
+    "USDC": Decimal("1"),
+}
+
+
+def test_eth_drop_liquidates_positions() -> None:
+    """
+    A position is liquidated once its risk adjusted collateral is below its debt.
+    """
+    stress_test = StressTest()
+    # ETH has a 0.8 collateral factor: liquidated below a 37.5% and 25% drop
+    stress_test.add_position({"ETH": 2000}, "USDC", 1000)
+    stress_test.add_position({"ETH": 1000}, "USDC", 600)
+    stress_test.add_position({"ETH": 1000}, "USDC", 0)
+
+    results = stress_test.evaluate([{"ETH": -0.2}, {"ETH": -0.3}, {"ETH": -0.4}])
+
+    assert len(stress_test) == 3
+    assert [result.liquidations for result in results] == [0, 1, 2]
+    assert results[1].collateral_at_risk == pytest.approx(700)
+    assert results[1].debt_at_risk == pytest.approx(600)
+    assert results[2].collateral_at_risk == pytest.approx(1800)
+
+
+def test_evaluate_matches_each_position() -> None:
+    """
+    The grouped evaluation gives the same results as checking every position.
+    """
+    rng = random.Random(0)
+    stress_test = StressTest()
+    for _ in range(500):
+        tokens = rng.sample(["ETH", "STRK", "kSTRK", "USDC"], rng.choice([1, 1, 2]))
+        collateral = {token: rng.uniform(0, 1000) for token in tokens}
+        stress_test.add_position(
+            collateral,
+            rng.choice(["USDC", "ETH"]),
+            sum(collateral.values()) * rng.uniform(0, 1),
+        )
+    scenarios = price_shock_grid(
+        {"ETH": [-1, -0.4, 0, 0.3], "STRK": [-0.5, 0.1], "USDC": [0, 0.05]}
+    )
+
+    for threshold in (1.0, 1.5):
+        expected = stress_test.evaluate_each_position(scenarios, threshold)
+        results = stress_test.evaluate(scenarios, threshold)
+        assert [result.liquidations for result in results] == [
+            result.liquidations for result in expected
+        ]
+        for result, reference in zip(results, expected):
+            assert result.collateral_at_risk == pytest.approx(
+                reference.collateral_at_risk
+            )
+            assert result.debt_at_risk == pytest.approx(reference.debt_at_risk)
+
+
+def test_from_health_inputs() -> None:
+    """
+    The snapshot values deposits and debt at the prices of the batch.
+    """
+    stress_test = StressTest.from_health_inputs(
+        {
+            "0x1": HealthRatioInputs({"ETH": Decimal("1")}, "USDC", 1000 * 10**6),
+            "0x2": HealthRatioInputs(
+                {"ETH": Decimal("0"), "STRK": Decimal("4000")}, "USDC", 1000 * 10**6
+            ),
+        },
+        PRICES,
+    )
+
+    (eth_drop,) = stress_test.evaluate([{"ETH": -0.4}])
+    (strk_drop,) = stress_test.evaluate([{"STRK": -0.2}])
+
+    assert eth_drop.liquidations == 1
+    assert eth_drop.collateral_at_risk == pytest.approx(1200)
+    assert strk_drop.liquidations == 1
+    assert strk_drop.collateral_at_risk == pytest.approx(1600)
+
+
+def test_price_shock_grid() -> None:
+    """
+    Scenarios combine the shocks of every token.
+    """
+    assert price_shock_grid({"ETH": [-0.1, -0.2], "STRK": [0]}) == [
+        {"ETH": -0.1, "STRK": 0},
+        {"ETH": -0.2, "STRK": 0},
+    ]
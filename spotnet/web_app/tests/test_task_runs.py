@@ -0,0 +1,107 @@
+"""
+Test cases for the task locks and run telemetry in spotnet_tracker.task_runs
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from spotnet_tracker.task_runs import TaskLock, run_exclusively
+from web_app.db.models import TaskRunStatus
+
+
+class FakeRedis:
+    """
+    Keeps the keys set with NX in memory and evaluates the release script.
+    """
+
+    def __init__(self):
+        self.keys = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.keys:
+            return None
+        self.keys[key] = value
+        return True
+
+    def eval(self, _script, _numkeys, key, token):
+        if self.keys.get(key) == token:
+            del self.keys[key]
+            return 1
+        return 0
+
+
+@pytest.fixture
+def fake_redis():
+    """
+    Patches the Redis client of the task locks.
+    """
+    redis = FakeRedis()
+    with patch("spotnet_tracker.task_runs.get_lock_redis", return_value=redis):
+        yield redis
+
+
+def test_task_lock(fake_redis) -> None:
+    """
+    A lock is exclusive and only released by the token that took it.
+    """
+    lock = TaskLock("sweep", 60)
+    other = TaskLock("sweep", 60)
+
+    assert lock.acquire()
+    assert not other.acquire()
+    assert not other.release()
+    assert TaskLock("sweep", 60, token=lock.token).release()
+    assert other.acquire()
+
+
+def test_run_exclusively_records_run(fake_redis) -> None:
+    """
+    A run is recorded with the positions processed and the RPC calls made.
+    """
+    mock_client = MagicMock()
+    mock_client.metrics.total_requests.side_effect = [10, 25]
+
+    with patch("spotnet_tracker.task_runs.CLIENT", mock_client), patch(
+        "spotnet_tracker.task_runs.record_task_run"
+    ) as mock_record:
+        summary = run_exclusively("monitor", 60, lambda: {"positions": 3})
+
+    assert summary == {"positions": 3}
+    assert fake_redis.keys == {}
+    args, kwargs = mock_record.call_args
+    assert args[:2] == ("monitor", TaskRunStatus.SUCCEEDED)
+    assert kwargs["positions"] == 3
+    assert kwargs["rpc_calls"] == 15
+
+
+def test_run_exclusively_skips_overlapping_run(fake_redis) -> None:
+    """
+    A run is skipped while another one holds the lock.
+    """
+    TaskLock("monitor", 60).acquire()
+    func = MagicMock()
+
+    with patch("spotnet_tracker.task_runs.record_task_run") as mock_record:
+        assert run_exclusively("monitor", 60, func) is None
+
+    func.assert_not_called()
+    assert mock_record.call_args.args[:2] == ("monitor", TaskRunStatus.SKIPPED)
+
+
+def test_run_exclusively_records_failure(fake_redis) -> None:
+    """
+    A failing run is recorded, releases its lock and raises.
+    """
+
+    def func():
+        raise RuntimeError("node down")
+
+    with patch("spotnet_tracker.task_runs.record_task_run") as mock_record:
+        with pytest.raises(RuntimeError):
+            run_exclusively("monitor", 60, func)
+
+    assert fake_redis.keys == {}
+    args, kwargs = mock_record.call_args
+    assert args[:2] == ("monitor", TaskRunStatus.FAILED)
+    assert kwargs["details"] == {"error": "node down"}
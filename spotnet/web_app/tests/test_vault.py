@@ -12,7 +12,6 @@ from fastapi.testclient import TestClient
 from httpx import AsyncClient
 
 from web_app.api.main import app
-from web_app.db.crud import UserDBConnector
 
 client = TestClient(app)
 
@@ -62,7 +61,7 @@ async def test_deposit_to_vault(
     mock_vault.id = str(uuid.uuid4())
     mock_vault.amount = test_data["amount"]
 
-    with patch.object(UserDBConnector, "__new__", return_value=mock_user_db_connector):
+    with patch("web_app.api.vault.user_db", mock_user_db_connector):
         mock_user_db_connector.get_user_by_wallet_id.return_value = (
             mock_user if test_data["wallet_id"] == "test_wallet" else None
         )